@@ -5,6 +5,12 @@ import datetime
 import uuid
 import random
 import string
+import threading
+import bisect
+from seating import SeatMap, seat_label
+import read_cache as rc
+from database import EVENT_STATS_COLUMNS, DELIVERED_LOGISTICS_STATUSES, LOGISTICS_LINE_TOTAL, rebuild_event_stats
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 
 DATABASE_NAME = 'event_management.db'
 
@@ -16,6 +22,7 @@ def get_db_connection(timeout=10.0):
 
 # --- User Management --- 
 
+@rc.invalidates('users', 'user_metadata')
 def create_user(username, password, role, full_name, college=None):
     """Creates a new user (Head or Member) with optional college association."""
     conn = get_db_connection()
@@ -54,6 +61,8 @@ def create_user(username, password, role, full_name, college=None):
         # Commit the transaction
         conn.commit()
         conn.close()
+        if college:
+            invalidate_booking_catalogue()  # A new college may now be listed
         return user_id
     except sqlite3.IntegrityError:
         conn.rollback()
@@ -93,6 +102,7 @@ def verify_user(username, password):
         conn.close()
         return None
 
+@rc.cached('users', 'user_metadata')
 def get_user_by_id(user_id):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -126,6 +136,7 @@ def get_user_by_id(user_id):
         conn.close()
         return None
 
+@rc.cached('users', 'user_metadata')
 def get_users_with_colleges():
     """Retrieves all users with their associated college information."""
     conn = get_db_connection()
@@ -160,6 +171,7 @@ def get_users_with_colleges():
         conn.close()
         return []
 
+@rc.cached('users', 'user_metadata')
 def get_all_members():
     """Retrieves all users with the 'Member' role, including college info."""
     conn = get_db_connection()
@@ -200,14 +212,15 @@ def get_all_members():
 
 # --- Event Management --- 
 
-def create_event(name, date, location, has_tickets=False, college=None):
-    """Creates a new event with optional college association."""
+@rc.invalidates('events', 'event_metadata')
+def create_event(name, date, location, has_tickets=False, college=None, capacity=None):
+    """Creates a new event with optional college association and ticket capacity (None = unlimited)."""
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
         # First, add the event to the events table
-        cursor.execute("INSERT INTO events (event_name, event_date, event_location, has_tickets) VALUES (?, ?, ?, ?)",
-                       (name, date, location, 1 if has_tickets else 0))
+        cursor.execute("INSERT INTO events (event_name, event_date, event_location, has_tickets, capacity) VALUES (?, ?, ?, ?, ?)",
+                       (name, date, location, 1 if has_tickets else 0, capacity))
         event_id = cursor.lastrowid
         
         # If college information is provided, store it in the event_metadata table
@@ -233,12 +246,14 @@ def create_event(name, date, location, has_tickets=False, college=None):
                 
         conn.commit()
         conn.close()
+        invalidate_booking_catalogue()
         return event_id
     except sqlite3.IntegrityError as e:
         print(f"Error creating event: {e}")
         conn.close()
         return None # Event name might be unique
 
+@rc.cached('events', 'event_metadata')
 def get_events_with_colleges():
     """Retrieves all events with their associated college information."""
     conn = get_db_connection()
@@ -274,6 +289,7 @@ def get_events_with_colleges():
         conn.close()
         return []
 
+@rc.cached('events', 'event_metadata')
 def get_event_by_id(event_id):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -311,18 +327,24 @@ def get_all_events():
     """Retrieves all events with their college information if available."""
     return get_events_with_colleges()
 
+# Tables whose rows belong to one event. SQLite leaves foreign key enforcement off, so their
+# ON DELETE CASCADE clauses never fire and delete_event removes the rows itself.
+EVENT_CHILD_TABLES = ('waitlist', 'tickets', 'seat_maps', 'assignments', 'vendors', 'guests', 'logistics',
+                      'schedule_items', 'chat_read_cursors', 'chat_messages', 'chat_retention_policies',
+                      'event_budgets', 'event_metadata')
+
+@rc.invalidates('events', 'event_metadata', 'assignments', 'chat_messages', 'chat_read_cursors')
 def delete_event(event_id):
-    """Deletes an event from the database based on its ID."""
+    """Deletes an event and every row that belongs to it."""
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
         # Start a transaction
         conn.execute("BEGIN TRANSACTION")
         
-        # Delete from event_metadata first if the table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='event_metadata'")
-        if cursor.fetchone():
-            cursor.execute("DELETE FROM event_metadata WHERE event_id = ?", (event_id,))
+        # Delete the event's rows first (their event_stats triggers still find the rollup row)
+        for table in EVENT_CHILD_TABLES:
+            cursor.execute(f"DELETE FROM {table} WHERE event_id = ?", (event_id,))
         
         # Now delete the event
         cursor.execute("DELETE FROM events WHERE event_id = ?", (event_id,))
@@ -336,10 +358,17 @@ def delete_event(event_id):
         deleted = False
     finally:
         conn.close()
+    if deleted:
+        with _seat_lock:
+            _seat_maps.pop(event_id, None)
+        with _waitlist_lock:
+            _waitlist_index.pop(event_id, None)
+        invalidate_booking_catalogue()
     return deleted
 
 # --- Task & Assignment Management ---
 
+@rc.cached('tasks')
 def get_all_tasks():
     """Retrieves all predefined tasks."""
     conn = get_db_connection()
@@ -349,6 +378,7 @@ def get_all_tasks():
     conn.close()
     return [dict(task) for task in tasks]
 
+@rc.cached('tasks')
 def get_task_by_id(task_id):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -357,6 +387,7 @@ def get_task_by_id(task_id):
     conn.close()
     return dict(task) if task else None
 
+@rc.invalidates('tasks', 'assignments')
 def assign_custom_task(user_id, event_id, task_name, task_description=None):
     """Creates a custom task and assigns it to a user for a specific event.
     
@@ -410,6 +441,7 @@ def assign_custom_task(user_id, event_id, task_name, task_description=None):
     finally:
         conn.close()
 
+@rc.invalidates('assignments')
 def assign_task(user_id, event_id, task_id):
     """Assigns a task to a user for a specific event."""
     conn = get_db_connection()
@@ -471,6 +503,65 @@ def get_event_assignments(event_id):
      conn.close()
      return [dict(assignment) for assignment in assignments]
 
+@rc.cached('users', 'user_metadata', 'events', 'event_metadata', 'assignments', 'tasks')
+def get_navigation_model(user_id):
+    """
+    Builds everything the sidebar needs for a user in one query: the user's college and
+    the events of that college, each with the user's assignments for it.
+
+    Returns:
+        dict: {'college', 'events': [{event_id, event_name, event_date, has_tickets,
+              'assignments': [{assignment_id, event_id, event_name, task_id, task_name,
+              description, status}]}]} with events newest first, or None on error
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    model = {'college': None, 'events': []}
+    try:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='user_metadata'")
+        if not cursor.fetchone():
+            conn.close()
+            return model
+
+        cursor.execute("""
+            SELECT um.value AS college,
+                   e.event_id, e.event_name, e.event_date, e.has_tickets,
+                   a.assignment_id, a.task_id, t.task_name, t.description, a.status
+            FROM user_metadata um
+            LEFT JOIN event_metadata em ON em.key = 'college' AND em.value = um.value
+            LEFT JOIN events e ON e.event_id = em.event_id
+            LEFT JOIN assignments a ON a.event_id = e.event_id AND a.user_id = um.user_id
+            LEFT JOIN tasks t ON t.task_id = a.task_id
+            WHERE um.user_id = ? AND um.key = 'college'
+            ORDER BY e.event_date DESC, e.event_id, t.task_name
+        """, (user_id,))
+        rows = cursor.fetchall()
+        conn.close()
+    except sqlite3.Error as e:
+        print(f"Error building navigation model: {e}")
+        conn.close()
+        return None
+
+    events = {}
+    for row in rows:
+        model['college'] = row['college']
+        if row['event_id'] is None:
+            continue
+        event = events.get(row['event_id'])
+        if event is None:
+            event = {'event_id': row['event_id'], 'event_name': row['event_name'],
+                     'event_date': row['event_date'], 'has_tickets': row['has_tickets'], 'assignments': []}
+            events[row['event_id']] = event
+            model['events'].append(event)
+        if row['assignment_id'] is not None and row['task_name'] is not None:
+            event['assignments'].append({
+                'assignment_id': row['assignment_id'], 'event_id': row['event_id'],
+                'event_name': row['event_name'], 'task_id': row['task_id'],
+                'task_name': row['task_name'], 'description': row['description'], 'status': row['status'],
+            })
+    return model
+
+@rc.invalidates('assignments')
 def update_assignment_status(assignment_id, new_status):
     """Updates the status of a specific task assignment."""
     conn = get_db_connection()
@@ -483,6 +574,52 @@ def update_assignment_status(assignment_id, new_status):
 
 # --- Task-Specific Data Management --- 
 
+# Named column lists for the per-event getters, so callers fetch only what they show:
+# 'grid' is what the editors render (plus row_version), 'report' is a compact read-only
+# view without notes, 'export' is every user-facing column
+COLUMN_PROFILES = {
+    'vendors': {
+        'grid': ['vendor_id', 'name', 'service_type', 'contact_person', 'contact_email', 'contact_phone',
+                 'status', 'notes', 'row_version'],
+        'report': ['vendor_id', 'name', 'service_type', 'contact_person', 'status'],
+        'export': ['vendor_id', 'name', 'service_type', 'contact_person', 'contact_email', 'contact_phone',
+                   'status', 'notes'],
+    },
+    'guests': {
+        'grid': ['guest_id', 'name', 'email', 'phone', 'rsvp_status', 'notes', 'row_version'],
+        'report': ['guest_id', 'name', 'email', 'rsvp_status'],
+        'export': ['guest_id', 'name', 'email', 'phone', 'rsvp_status', 'notes'],
+    },
+    'logistics': {
+        'grid': ['logistics_id', 'item_name', 'category', 'quantity', 'status', 'supplier', 'cost', 'notes',
+                 'row_version'],
+        'report': ['logistics_id', 'item_name', 'category', 'quantity', 'status', 'cost'],
+        'export': ['logistics_id', 'item_name', 'category', 'quantity', 'status', 'supplier', 'cost_minor', 'notes'],
+    },
+    'schedule_items': {
+        'grid': ['item_id', 'item_name', 'start_time', 'end_time', 'location', 'responsible_person', 'status',
+                 'notes', 'row_version'],
+        'report': ['item_id', 'item_name', 'start_time', 'end_time', 'location', 'responsible_person', 'status'],
+        'export': ['item_id', 'item_name', 'start_time', 'end_time', 'location', 'responsible_person', 'status',
+                   'notes'],
+    },
+}
+
+def _projection(table, columns=None, profile=None):
+    """
+    Builds the SELECT list for a per-event getter from a column list or a COLUMN_PROFILES name.
+    With neither, every column is returned.
+    """
+    if profile is not None:
+        columns = COLUMN_PROFILES[table][profile]
+    if columns is None:
+        return "*"
+    known = set(COLUMN_PROFILES[table]['grid']) | set(EDITABLE_TABLES[table]['columns']) | {'event_id'}
+    unknown = [column for column in columns if column not in known]
+    if unknown:
+        raise ValueError(f"Unknown {table} column(s): {', '.join(unknown)}")
+    return ", ".join(columns)
+
 # Vendor Management
 def add_vendor(event_id, name, service_type, contact_person, contact_email, contact_phone, notes):
     conn = get_db_connection()
@@ -496,21 +633,27 @@ def add_vendor(event_id, name, service_type, contact_person, contact_email, cont
     conn.close()
     return vendor_id
 
-def get_vendors_for_event(event_id):
+def get_vendors_for_event(event_id, columns=None, profile=None):
+    """Returns the event's vendors as dicts, limited to `columns` or a COLUMN_PROFILES name when given."""
+    select_list = _projection('vendors', columns, profile)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM vendors WHERE event_id = ? ORDER BY name", (event_id,))
+    cursor.execute(f"SELECT {select_list} FROM vendors WHERE event_id = ? ORDER BY name", (event_id,))
     vendors = cursor.fetchall()
     conn.close()
     return [dict(v) for v in vendors]
 
-def update_vendor(vendor_id, name, service_type, contact_person, contact_email, contact_phone, status, notes):
+def update_vendor(vendor_id, name, service_type, contact_person, contact_email, contact_phone, status, notes,
+                  expected_version=None):
+    """Updates a vendor. With expected_version, only succeeds if nobody has changed the row since it was read."""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        UPDATE vendors SET name=?, service_type=?, contact_person=?, contact_email=?, contact_phone=?, status=?, notes=?
-        WHERE vendor_id=?
-        """, (name, service_type, contact_person, contact_email, contact_phone, status, notes, vendor_id))
+        UPDATE vendors SET name=?, service_type=?, contact_person=?, contact_email=?, contact_phone=?, status=?, notes=?,
+                           row_version = row_version + 1
+        WHERE vendor_id=? AND (? IS NULL OR row_version = ?)
+        """, (name, service_type, contact_person, contact_email, contact_phone, status, notes, vendor_id,
+              expected_version, expected_version))
     conn.commit()
     updated = cursor.rowcount > 0
     conn.close()
@@ -538,21 +681,24 @@ def add_guest(event_id, name, email, phone, notes):
     conn.close()
     return guest_id
 
-def get_guests_for_event(event_id):
+def get_guests_for_event(event_id, columns=None, profile=None):
+    """Returns the event's guests as dicts, limited to `columns` or a COLUMN_PROFILES name when given."""
+    select_list = _projection('guests', columns, profile)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM guests WHERE event_id = ? ORDER BY name", (event_id,))
+    cursor.execute(f"SELECT {select_list} FROM guests WHERE event_id = ? ORDER BY name", (event_id,))
     guests = cursor.fetchall()
     conn.close()
     return [dict(g) for g in guests]
 
-def update_guest(guest_id, name, email, phone, rsvp_status, notes):
+def update_guest(guest_id, name, email, phone, rsvp_status, notes, expected_version=None):
+    """Updates a guest. With expected_version, only succeeds if nobody has changed the row since it was read."""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        UPDATE guests SET name=?, email=?, phone=?, rsvp_status=?, notes=?
-        WHERE guest_id=?
-        """, (name, email, phone, rsvp_status, notes, guest_id))
+        UPDATE guests SET name=?, email=?, phone=?, rsvp_status=?, notes=?, row_version = row_version + 1
+        WHERE guest_id=? AND (? IS NULL OR row_version = ?)
+        """, (name, email, phone, rsvp_status, notes, guest_id, expected_version, expected_version))
     conn.commit()
     updated = cursor.rowcount > 0
     conn.close()
@@ -568,46 +714,120 @@ def delete_guest(guest_id):
     return deleted
 
 # Logistics Management
+# Line total in cents, the same formula the event_stats triggers use
+_LOGISTICS_LINE_TOTAL = LOGISTICS_LINE_TOTAL.format(r='logistics')
+
 def add_logistics_item(event_id, item_name, category, quantity, supplier, cost, notes):
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO logistics (event_id, item_name, category, quantity, status, supplier, cost, notes)
-        VALUES (?, ?, ?, ?, 'Required', ?, ?, ?)
-    """, (event_id, item_name, category, quantity, supplier, cost, notes))
-    conn.commit()
-    logistics_id = cursor.lastrowid
-    conn.close()
-    return logistics_id
+    try:
+        cost_minor = to_minor_units(cost)
+        cursor.execute("""
+            INSERT INTO logistics (event_id, item_name, category, quantity, status, supplier, cost, cost_minor, notes)
+            VALUES (?, ?, ?, ?, 'Required', ?, ?, ?, ?)
+        """, (event_id, item_name, category, quantity, supplier, from_minor_units(cost_minor), cost_minor, notes))
+        logistics_id = cursor.lastrowid
+        conn.commit()
+        return logistics_id
+    except sqlite3.Error as e:
+        print(f"Error adding logistics item: {e}")
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
 
-def get_logistics_for_event(event_id):
+def get_logistics_for_event(event_id, columns=None, profile=None):
+    """Returns the event's logistics as dicts, limited to `columns` or a COLUMN_PROFILES name when given."""
+    select_list = _projection('logistics', columns, profile)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM logistics WHERE event_id = ? ORDER BY category, item_name", (event_id,))
+    cursor.execute(f"SELECT {select_list} FROM logistics WHERE event_id = ? ORDER BY category, item_name", (event_id,))
     logistics = cursor.fetchall()
     conn.close()
     return [dict(l) for l in logistics]
 
-def update_logistics_item(logistics_id, item_name, category, quantity, status, supplier, cost, notes):
+def update_logistics_item(logistics_id, item_name, category, quantity, status, supplier, cost, notes,
+                          expected_version=None):
+    """Updates a logistics item. With expected_version, only succeeds if nobody has changed the row since it was read."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE logistics SET item_name=?, category=?, quantity=?, status=?, supplier=?, cost=?, notes=?
-        WHERE logistics_id=?
-        """, (item_name, category, quantity, status, supplier, cost, notes, logistics_id))
-    conn.commit()
-    updated = cursor.rowcount > 0
-    conn.close()
-    return updated
+    try:
+        cost_minor = to_minor_units(cost)
+        cursor.execute("""
+            UPDATE logistics SET item_name=?, category=?, quantity=?, status=?, supplier=?, cost=?, cost_minor=?, notes=?,
+                                 row_version = row_version + 1
+            WHERE logistics_id=? AND (? IS NULL OR row_version = ?)
+            """, (item_name, category, quantity, status, supplier, from_minor_units(cost_minor), cost_minor, notes,
+                  logistics_id, expected_version, expected_version))
+        updated = cursor.rowcount > 0
+        conn.commit()
+        return updated
+    except sqlite3.Error as e:
+        print(f"Error updating logistics item: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
 
 def delete_logistics_item(logistics_id):
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM logistics WHERE logistics_id=?", (logistics_id,))
-    conn.commit()
-    deleted = cursor.rowcount > 0
+    try:
+        cursor.execute("DELETE FROM logistics WHERE logistics_id=?", (logistics_id,))
+        deleted = cursor.rowcount > 0
+        conn.commit()
+        return deleted
+    except sqlite3.Error as e:
+        print(f"Error deleting logistics item: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+# Budgets
+def set_event_budget(event_id, budget):
+    """Sets an event's logistics budget (in currency units, e.g. 1500.50)."""
+    budget_minor = to_minor_units(budget)
+    if budget_minor is None or budget_minor < 0:
+        return False
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("INSERT OR IGNORE INTO event_budgets (event_id) VALUES (?)", (event_id,))
+        cursor.execute("UPDATE event_budgets SET budget_minor = ? WHERE event_id = ?", (budget_minor, event_id))
+        conn.commit()
+        return True
+    except sqlite3.Error as e:
+        print(f"Error setting event budget: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+def get_event_budget(event_id):
+    """
+    Returns an event's budget (from event_budgets) and its logistics totals (from the
+    trigger-maintained event_stats row, so they always match the logistics table).
+
+    Returns:
+        dict: 'budget', 'committed', 'delivered' and 'remaining' (budget - committed) in cents,
+              each under a '_minor' key, plus the same values in currency units
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT budget_minor FROM event_budgets WHERE event_id = ?", (event_id,))
+    row = cursor.fetchone()
     conn.close()
-    return deleted
+    stats = get_event_stats(event_id)
+    budget = {
+        'budget_minor': row['budget_minor'] if row else 0,
+        'committed_minor': stats['logistics_cost_minor'],
+        'delivered_minor': sum(stats[f"logistics_{status.lower()}_cost_minor"] for status in DELIVERED_LOGISTICS_STATUSES),
+    }
+    budget['remaining_minor'] = budget['budget_minor'] - budget['committed_minor']
+    for key in ('budget', 'committed', 'delivered', 'remaining'):
+        budget[key] = from_minor_units(budget[f"{key}_minor"])
+    return budget
 
 # Schedule Coordination
 def add_schedule_item(event_id, item_name, start_time, end_time, location, responsible_person, notes):
@@ -622,22 +842,28 @@ def add_schedule_item(event_id, item_name, start_time, end_time, location, respo
     conn.close()
     return item_id
 
-def get_schedule_for_event(event_id):
+def get_schedule_for_event(event_id, columns=None, profile=None):
+    """Returns the event's schedule items as dicts, limited to `columns` or a COLUMN_PROFILES name when given."""
+    select_list = _projection('schedule_items', columns, profile)
     conn = get_db_connection()
     cursor = conn.cursor()
     # Assuming start_time is stored in a sortable format (e.g., 'YYYY-MM-DD HH:MM')
-    cursor.execute("SELECT * FROM schedule_items WHERE event_id = ? ORDER BY start_time, item_name", (event_id,))
+    cursor.execute(f"SELECT {select_list} FROM schedule_items WHERE event_id = ? ORDER BY start_time, item_name", (event_id,))
     schedule = cursor.fetchall()
     conn.close()
     return [dict(s) for s in schedule]
 
-def update_schedule_item(item_id, item_name, start_time, end_time, location, responsible_person, status, notes):
+def update_schedule_item(item_id, item_name, start_time, end_time, location, responsible_person, status, notes,
+                         expected_version=None):
+    """Updates a schedule item. With expected_version, only succeeds if nobody has changed the row since it was read."""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        UPDATE schedule_items SET item_name=?, start_time=?, end_time=?, location=?, responsible_person=?, status=?, notes=?
-        WHERE item_id=?
-        """, (item_name, start_time, end_time, location, responsible_person, status, notes, item_id))
+        UPDATE schedule_items SET item_name=?, start_time=?, end_time=?, location=?, responsible_person=?, status=?, notes=?,
+                                  row_version = row_version + 1
+        WHERE item_id=? AND (? IS NULL OR row_version = ?)
+        """, (item_name, start_time, end_time, location, responsible_person, status, notes, item_id,
+              expected_version, expected_version))
     conn.commit()
     updated = cursor.rowcount > 0
     conn.close()
@@ -652,36 +878,555 @@ def delete_schedule_item(item_id):
     conn.close()
     return deleted
 
+# Batched Editor Changes
+def _prepare_logistics_row(row):
+    """Stores a logistics cost as integer cents, with the REAL column as its display mirror."""
+    if 'cost' in row:
+        row['cost_minor'] = to_minor_units(row['cost'])
+        row['cost'] = from_minor_units(row['cost_minor'])
+    return row
+
+# Table -> id column, editable columns, status set on insert, optional row preparation and
+# the text columns searched by get_table_page
+EDITABLE_TABLES = {
+    'vendors': {
+        'id': 'vendor_id',
+        'columns': ['name', 'service_type', 'contact_person', 'contact_email', 'contact_phone', 'status', 'notes'],
+        'status': ('status', 'Pending'),
+        'search': ['name', 'service_type', 'contact_person', 'contact_email'],
+    },
+    'guests': {
+        'id': 'guest_id',
+        'columns': ['name', 'email', 'phone', 'rsvp_status', 'notes'],
+        'status': ('rsvp_status', 'Pending'),
+        'search': ['name', 'email', 'phone'],
+    },
+    'logistics': {
+        'id': 'logistics_id',
+        'columns': ['item_name', 'category', 'quantity', 'status', 'supplier', 'cost', 'cost_minor', 'notes'],
+        'status': ('status', 'Required'),
+        'prepare': _prepare_logistics_row,
+        'search': ['item_name', 'category', 'supplier'],
+    },
+    'schedule_items': {
+        'id': 'item_id',
+        'columns': ['item_name', 'start_time', 'end_time', 'location', 'responsible_person', 'status', 'notes'],
+        'status': ('status', 'Planned'),
+        'search': ['item_name', 'location', 'responsible_person'],
+    },
+}
+
+def get_table_page(table, event_id, page=1, page_size=50, filters=None, search=None,
+                   sort_by=None, descending=False, columns=None, profile=None):
+    """
+    Returns one page of an editable table for an event, with filtering and sorting done in SQL.
+
+    Args:
+        table (str): One of EDITABLE_TABLES
+        page (int): 1-based page number (clamped to the last page)
+        filters (dict, optional): Column -> value exact matches, e.g. {'rsvp_status': 'Attending'}
+        search (str, optional): Case-insensitive substring matched against the table's search columns
+        sort_by (str, optional): Column to order by (defaults to the id column)
+        descending (bool): Reverse the sort order
+        columns / profile: Limit the returned columns (see COLUMN_PROFILES)
+
+    Returns:
+        dict: 'rows' (list of dicts), 'total' (matching rows), 'page', 'page_size' and 'pages'
+    """
+    spec = EDITABLE_TABLES[table]
+    id_column = spec['id']
+    allowed_columns = {id_column, 'row_version'} | set(spec['columns'])
+    if sort_by not in allowed_columns:
+        sort_by = id_column
+
+    conditions, params = ["event_id = ?"], [event_id]
+    for column, value in (filters or {}).items():
+        if column not in allowed_columns:
+            raise ValueError(f"Cannot filter {table} by '{column}'")
+        conditions.append(f"{column} = ?")
+        params.append(value)
+    if search:
+        pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        conditions.append("(" + " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for column in spec['search']) + ")")
+        params.extend([pattern] * len(spec['search']))
+    where = " AND ".join(conditions)
+    direction = "DESC" if descending else "ASC"
+    select_list = _projection(table, columns, profile)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params)
+    total = cursor.fetchone()[0]
+    pages = max(1, -(-total // page_size))
+    page = min(max(1, page), pages)
+    # The id tie-breaker keeps the order stable across pages when sort values repeat
+    cursor.execute(f"""
+        SELECT {select_list} FROM {table} WHERE {where}
+        ORDER BY {sort_by} {direction}, {id_column} {direction}
+        LIMIT ? OFFSET ?
+    """, params + [page_size, (page - 1) * page_size])
+    rows = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return {'rows': rows, 'total': total, 'page': page, 'page_size': page_size, 'pages': pages}
+
+def _chunks(values, size=500):
+    """Splits a list into pieces small enough for an SQL IN (...) list."""
+    values = list(values)
+    return [values[start:start + size] for start in range(0, len(values), size)]
+
+def _current_rows(cursor, table, ids, event_id=None):
+    """Returns {id: row dict} for the ids present in a table (and in the event, when one is given)."""
+    id_column = EDITABLE_TABLES[table]['id']
+    event_filter = " AND event_id = ?" if event_id is not None else ""
+    found = {}
+    for chunk in _chunks(ids):
+        params = list(chunk) + ([event_id] if event_id is not None else [])
+        cursor.execute(f"SELECT * FROM {table} WHERE {id_column} IN ({', '.join('?' * len(chunk))}){event_filter}",
+                       params)
+        found.update((row[id_column], dict(row)) for row in cursor.fetchall())
+    return found
+
+def _same_value(a, b):
+    """Compares cell values loosely enough for editor round trips (3 == 3.0 == '3', None == '')."""
+    if a in (None, '') or b in (None, ''):
+        return a in (None, '') and b in (None, '')
+    if a == b:
+        return True
+    try:
+        return float(a) == float(b)
+    except (TypeError, ValueError):
+        return False
+
+def _merge_update(row, current, id_column):
+    """
+    Decides what a versioned update may write when the row changed after the editor read it.
+
+    A column is written when the other writer left it alone (current value == the editor's
+    'base' value); it is a conflict when both sides changed it to different values.
+
+    Returns:
+        tuple: (columns/values to write, conflicting column names)
+    """
+    base = row.get('_base') or {}
+    changes = {c: v for c, v in row.items() if c not in (id_column, 'row_version', '_base')}
+    if row.get('row_version') is None or row['row_version'] == current['row_version']:
+        return changes, []
+    to_write, conflicts = {}, []
+    for column, value in changes.items():
+        if _same_value(current.get(column), value):
+            continue  # Both sides made the same change
+        if column in base and _same_value(current.get(column), base[column]):
+            to_write[column] = value
+        else:
+            conflicts.append(column)
+    return to_write, conflicts
+
+def _bulk_write(cursor, table, event_id, inserts=(), updates=(), deletes=()):
+    """
+    Writes a batch of rows with one executemany per statement kind, on the caller's transaction
+    (which must hold the write lock so new AUTOINCREMENT ids are consecutive). Columns
+    missing from an inserted row are stored as NULL; updates only set the columns given.
+
+    An update that carries 'row_version' is a compare-and-swap against that version. If the
+    row has moved on, its non-conflicting column changes are merged (see _merge_update) and
+    the conflicting ones are reported instead of written.
+
+    Returns:
+        dict: 'inserted_ids' (in input order), 'updated_ids', 'deleted_ids', 'found_ids' (update
+              targets that exist) and 'conflicts' (dicts with 'id', 'columns', 'current', 'row_version')
+    """
+    spec = EDITABLE_TABLES[table]
+    id_column = spec['id']
+    prepare = spec.get('prepare', lambda row: row)
+    status_column, default_status = spec['status']
+    columns = spec['columns']
+
+    current_rows = _current_rows(cursor, table, [row[id_column] for row in updates], event_id)
+    planned_updates, conflicts = [], []
+    for row in updates:
+        current = current_rows.get(row[id_column])
+        if current is None:
+            continue
+        to_write, conflicting = _merge_update(row, current, id_column)
+        if conflicting:
+            conflicts.append({'id': row[id_column], 'columns': conflicting, 'row_version': current['row_version'],
+                              'current': {c: current.get(c) for c in conflicting}})
+        if to_write:
+            planned_updates.append((row[id_column], current['row_version'], prepare(to_write)))
+    update_ids = {row_id for row_id, _, _ in planned_updates}
+    delete_ids = set(_current_rows(cursor, table, deletes, event_id))
+
+    if delete_ids:
+        cursor.executemany(f"DELETE FROM {table} WHERE {id_column} = ?", [(row_id,) for row_id in delete_ids])
+
+    # Rows may carry different column sets, so group them by the columns they set
+    update_groups = {}
+    for row_id, version, values in planned_updates:
+        update_groups.setdefault(tuple(c for c in columns if c in values), []).append((row_id, version, values))
+    for update_columns, rows in update_groups.items():
+        assignments = "".join(f"{c} = ?, " for c in update_columns)
+        cursor.executemany(f"UPDATE {table} SET {assignments}row_version = row_version + 1 "
+                           f"WHERE {id_column} = ? AND row_version = ?",
+                           [tuple(values[c] for c in update_columns) + (row_id, version) for row_id, version, values in rows])
+
+    inserted_ids = []
+    if inserts:
+        rows = []
+        for row in inserts:
+            row = prepare(dict(row))
+            row[status_column] = row.get(status_column) or default_status
+            rows.append(row)
+        insert_columns = ['event_id'] + columns
+        cursor.execute("SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0)", (table,))
+        first_id = cursor.fetchone()[0] + 1
+        cursor.executemany(f"INSERT INTO {table} ({', '.join(insert_columns)}) VALUES ({', '.join('?' * len(insert_columns))})",
+                           [(event_id,) + tuple(row.get(c) for c in columns) for row in rows])
+        inserted_ids = list(range(first_id, first_id + len(rows)))
+
+    return {'inserted_ids': inserted_ids, 'updated_ids': update_ids, 'deleted_ids': delete_ids,
+            'found_ids': set(current_rows), 'conflicts': conflicts}
+
+def apply_table_changes(table, event_id, inserts=(), updates=(), deletes=()):
+    """
+    Applies a batch of rows edited in the UI to one table in a single transaction.
+
+    Args:
+        table (str): One of EDITABLE_TABLES
+        event_id (int): Event the rows belong to; updates/deletes outside it are ignored
+        inserts (list): Dicts of column values for new rows
+        updates (list): Dicts of column values that include the table's id column
+        deletes (list): Ids of rows to delete
+
+        Updates may carry 'row_version' and '_base' (the values the editor started from) for
+        compare-and-swap with column merging; see _bulk_write.
+
+    Returns:
+        dict: Counts of 'inserted', 'updated' and 'deleted' rows plus the list of 'conflicts',
+              or None on error
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        written = _bulk_write(cursor, table, event_id, inserts, updates, deletes)
+        conn.commit()
+        return {'inserted': len(written['inserted_ids']), 'updated': len(written['updated_ids']),
+                'deleted': len(written['deleted_ids']), 'conflicts': written['conflicts']}
+    except sqlite3.Error as e:
+        print(f"Error applying changes to {table}: {e}")
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+
+def _bulk_upsert(table, event_id, rows):
+    """
+    Inserts rows without an id and updates rows with one, in a single transaction.
+
+    Returns:
+        dict: 'ids' (new ids, in input order) and 'outcomes' (one dict per input row with
+              'id' and 'outcome': 'inserted', 'updated', 'conflict', 'unchanged' or 'not_found'),
+              or None on error. Rows with 'row_version' are compare-and-swap updates; a
+              'conflict' outcome also carries the conflicting 'columns' and 'current' values.
+    """
+    id_column = EDITABLE_TABLES[table]['id']
+    inserts = [row for row in rows if row.get(id_column) is None]
+    updates = [row for row in rows if row.get(id_column) is not None]
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        written = _bulk_write(cursor, table, event_id, inserts=inserts, updates=updates)
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Error upserting {table}: {e}")
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+
+    new_ids = iter(written['inserted_ids'])
+    conflicts = {conflict['id']: conflict for conflict in written['conflicts']}
+    outcomes = []
+    for row in rows:
+        row_id = row.get(id_column)
+        if row_id is None:
+            outcomes.append({'id': next(new_ids), 'outcome': 'inserted'})
+        elif row_id in conflicts:
+            outcomes.append({'outcome': 'conflict', **conflicts[row_id]})
+        elif row_id in written['updated_ids']:
+            outcomes.append({'id': row_id, 'outcome': 'updated'})
+        elif row_id in written['found_ids']:
+            outcomes.append({'id': row_id, 'outcome': 'unchanged'})
+        else:
+            outcomes.append({'id': row_id, 'outcome': 'not_found'})
+    return {'ids': written['inserted_ids'], 'outcomes': outcomes}
+
+def _bulk_delete(table, ids):
+    """
+    Deletes rows by id in a single transaction.
+
+    Returns:
+        list: One dict per id with 'id' and 'outcome' ('deleted' or 'not_found'), or None on error
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        deleted_ids = _bulk_write(cursor, table, None, deletes=ids)['deleted_ids']
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Error deleting from {table}: {e}")
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+    return [{'id': row_id, 'outcome': 'deleted' if row_id in deleted_ids else 'not_found'} for row_id in ids]
+
+def bulk_upsert_vendors(event_id, rows):
+    """Adds vendors without a 'vendor_id' and updates those with one. See _bulk_upsert."""
+    return _bulk_upsert('vendors', event_id, rows)
+
+def bulk_delete_vendors(vendor_ids):
+    """Deletes several vendors at once. See _bulk_delete."""
+    return _bulk_delete('vendors', vendor_ids)
+
+def bulk_upsert_guests(event_id, rows):
+    """Adds guests without a 'guest_id' and updates those with one. See _bulk_upsert."""
+    return _bulk_upsert('guests', event_id, rows)
+
+def bulk_delete_guests(guest_ids):
+    """Deletes several guests at once. See _bulk_delete."""
+    return _bulk_delete('guests', guest_ids)
+
+def bulk_upsert_logistics(event_id, rows):
+    """Adds logistics items without a 'logistics_id' and updates those with one. See _bulk_upsert."""
+    return _bulk_upsert('logistics', event_id, rows)
+
+def bulk_delete_logistics(logistics_ids):
+    """Deletes several logistics items at once (budget totals follow). See _bulk_delete."""
+    return _bulk_delete('logistics', logistics_ids)
+
+def bulk_upsert_schedule_items(event_id, rows):
+    """Adds schedule items without an 'item_id' and updates those with one. See _bulk_upsert."""
+    return _bulk_upsert('schedule_items', event_id, rows)
+
+def bulk_delete_schedule_items(item_ids):
+    """Deletes several schedule items at once. See _bulk_delete."""
+    return _bulk_delete('schedule_items', item_ids)
+
+# --- Money Helpers ---
+# Amounts are stored as integer cents ("minor units") so totals add up exactly
+
+def to_minor_units(amount):
+    """
+    Converts an amount such as 12.5, "12.50" or Decimal("12.5") to integer cents (half-up).
+    Returns None for empty or non-numeric input.
+    """
+    if amount is None or (isinstance(amount, float) and pd.isna(amount)):
+        return None
+    try:
+        return int((Decimal(str(amount).strip()) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError):
+        return None
+
+def from_minor_units(minor):
+    """Converts integer cents back to a currency amount (float), keeping None as None."""
+    return None if minor is None else minor / 100
+
+def to_decimal_amount(minor):
+    """Converts integer cents to an exact Decimal amount, e.g. 1250 -> Decimal('12.50'), keeping None as None."""
+    return None if minor is None else Decimal(minor).scaleb(-2)
+
+def format_money(minor):
+    """Formats integer cents for display, e.g. 123456 -> '$1,234.56'."""
+    sign = "-" if minor < 0 else ""
+    return f"{sign}${abs(minor) // 100:,}.{abs(minor) % 100:02d}"
+
 # --- Reporting --- 
 
+# Counters maintained by triggers in event_stats (see database.EVENT_STATS_COLUMNS)
+_RSVP_STATS = [('Pending', 'guests_pending'), ('Attending', 'guests_attending'),
+               ('Declined', 'guests_declined'), ('Maybe', 'guests_maybe')]
+_LOGISTICS_STATUSES = ['Required', 'Sourced', 'Delivered', 'Setup', 'Returned']
+
+def get_event_stats(event_id):
+    """
+    Returns the rollup counters for an event as a single dictionary (one row read).
+    Every column in database.EVENT_STATS_COLUMNS is present; events with no data get zeros.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM event_stats WHERE event_id = ?", (event_id,))
+    row = cursor.fetchone()
+    conn.close()
+    if row:
+        return dict(row)
+    stats = {name: 0 for columns in EVENT_STATS_COLUMNS.values() for name, _ in columns}
+    stats['event_id'] = event_id
+    return stats
+
+def check_event_stats(repair=False):
+    """
+    Compares the event_stats rollups with a from-scratch recomputation.
+
+    Args:
+        repair (bool): Rebuild every rollup row when a mismatch is found
+
+    Returns:
+        list: Mismatches as dicts with 'event_id', 'column', 'stored' and 'expected'
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        conn.execute("BEGIN IMMEDIATE")  # Hold writers off so both sides see the same data
+        cursor.execute("SELECT * FROM event_stats")
+        stored = {row['event_id']: dict(row) for row in cursor.fetchall()}
+
+        mismatches = []
+        seen = set()
+        for table, columns in EVENT_STATS_COLUMNS.items():
+            sums = ", ".join(f"COALESCE(SUM({expr.format(r=table)}), 0) AS {name}" for name, expr in columns)
+            # Only rows of events that still exist; leftovers of a deleted event have no rollup
+            cursor.execute(f"""
+                SELECT {table}.event_id, {sums} FROM {table}
+                JOIN events ON events.event_id = {table}.event_id
+                GROUP BY {table}.event_id
+            """)
+            for row in cursor.fetchall():
+                seen.add(row['event_id'])
+                stored_row = stored.get(row['event_id'], {})
+                for name, _ in columns:
+                    if abs((stored_row.get(name) or 0) - row[name]) > 1e-6:
+                        mismatches.append({'event_id': row['event_id'], 'column': name,
+                                           'stored': stored_row.get(name), 'expected': row[name]})
+        # Rows with counts but no remaining source rows should be all zeros
+        for event_id, stored_row in stored.items():
+            if event_id in seen:
+                continue
+            for name, value in stored_row.items():
+                if name != 'event_id' and value:
+                    mismatches.append({'event_id': event_id, 'column': name, 'stored': value, 'expected': 0})
+
+        if mismatches and repair:
+            rebuild_event_stats(cursor)
+        conn.commit()
+        return mismatches
+    except sqlite3.Error as e:
+        print(f"Error checking event stats: {e}")
+        conn.rollback()
+        return []
+    finally:
+        conn.close()
+
 def get_guest_report(event_id):
-    """Generates a report on guest RSVP status for an event."""
-    guests = get_guests_for_event(event_id)
-    if not guests:
-        return pd.DataFrame(columns=['RSVP Status', 'Count'])
-    df = pd.DataFrame(guests)
-    report = df['rsvp_status'].value_counts().reset_index()
-    report.columns = ['RSVP Status', 'Count']
-    return report
+    """Generates a report on guest RSVP status for an event from the event_stats rollup."""
+    stats = get_event_stats(event_id)
+    rows = [(status, stats[column]) for status, column in _RSVP_STATS if stats[column]]
+    rows.sort(key=lambda r: -r[1])
+    return pd.DataFrame(rows, columns=['RSVP Status', 'Count'])
 
 def get_logistics_report(event_id):
-    """Generates a report on logistics status and cost for an event."""
-    logistics = get_logistics_for_event(event_id)
-    if not logistics:
-        return pd.DataFrame(columns=['Status', 'Count', 'Total Cost'])
-    df = pd.DataFrame(logistics)
-    # Ensure 'cost' is numeric, coercing errors to NaN and filling with 0
-    df['cost'] = pd.to_numeric(df['cost'], errors='coerce').fillna(0)
-
-    report = df.groupby('status').agg(
-        Count=('logistics_id', 'size'),
-        Total_Cost=('cost', 'sum')
-    ).reset_index()
-    report.columns = ['Status', 'Count', 'Total Cost']
-    return report
+    """Generates a report on logistics status and cost (cost x quantity) for an event from the event_stats rollup."""
+    stats = get_event_stats(event_id)
+    rows = [(status, stats[f"logistics_{status.lower()}_items"], from_minor_units(stats[f"logistics_{status.lower()}_cost_minor"]))
+            for status in _LOGISTICS_STATUSES if stats[f"logistics_{status.lower()}_items"]]
+    return pd.DataFrame(rows, columns=['Status', 'Count', 'Total Cost'])
+
+def get_logistics_category_report(event_id):
+    """Generates per-category item count, quantity and cost (cost x quantity) totals for an event."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT COALESCE(category, 'Uncategorized') AS category,
+               COUNT(*) AS items,
+               SUM(COALESCE(CAST(quantity AS INTEGER), 0)) AS quantity,
+               SUM({_LOGISTICS_LINE_TOTAL}) / 100.0 AS total_cost
+        FROM logistics
+        WHERE event_id = ?
+        GROUP BY COALESCE(category, 'Uncategorized')
+        ORDER BY total_cost DESC
+    """, (event_id,))
+    rows = cursor.fetchall()
+    conn.close()
+    return pd.DataFrame([tuple(row) for row in rows], columns=['Category', 'Items', 'Quantity', 'Total Cost'])
+
+def get_logistics_cost_total(event_id):
+    """Returns the overall logistics cost (sum of cost x quantity) for an event."""
+    return from_minor_units(get_event_stats(event_id)['logistics_cost_minor'])
+
+def _ratio(numerator, denominator):
+    """Element-wise numerator / denominator, NaN where the denominator is 0 or missing."""
+    denominator = denominator.astype(float)
+    return numerator.astype(float).div(denominator.where(denominator > 0))
+
+def get_college_analytics(college):
+    """
+    Builds cross-event analytics for every event of a college.
+
+    All per-event numbers come from one events/event_stats join and ticket sales
+    from one grouped query; KPIs, monthly trends and rankings are then computed
+    column-wise in pandas, so the cost does not grow with per-event round trips.
+
+    Returns:
+        dict: 'events' (one row per event with KPI and rank columns), 'monthly'
+              (totals per event month) and 'ticket_sales' (tickets booked per day)
+    """
+    stat_columns = [name for columns in EVENT_STATS_COLUMNS.values() for name, _ in columns]
+    conn = get_db_connection()
+    events_df = pd.read_sql_query(f"""
+        SELECT e.event_id, e.event_name, e.event_date, e.event_location, e.capacity,
+               {", ".join(f"COALESCE(s.{name}, 0) AS {name}" for name in stat_columns)}
+        FROM events e
+        JOIN event_metadata m ON m.event_id = e.event_id AND m.key = 'college'
+        LEFT JOIN event_stats s ON s.event_id = e.event_id
+        WHERE m.value = ?
+        ORDER BY e.event_date
+    """, conn, params=(college,))
+    ticket_sales_df = pd.read_sql_query("""
+        SELECT DATE(t.booking_timestamp) AS booking_date, COUNT(*) AS tickets
+        FROM tickets t
+        JOIN event_metadata m ON m.event_id = t.event_id AND m.key = 'college'
+        WHERE m.value = ?
+        GROUP BY DATE(t.booking_timestamp)
+        ORDER BY booking_date
+    """, conn, params=(college,))
+    conn.close()
+
+    if events_df.empty:
+        return {'events': events_df, 'monthly': pd.DataFrame(), 'ticket_sales': ticket_sales_df}
+
+    # --- Per-event KPIs (vectorized over all events) ---
+    events_df['event_date'] = pd.to_datetime(events_df['event_date'], errors='coerce')
+    events_df['logistics_cost_total'] = events_df['logistics_cost_minor'] / 100
+    events_df['attendance_rate'] = _ratio(events_df['guests_attending'], events_df['guests_total'])
+    events_df['sell_through'] = _ratio(events_df['tickets_sold'], events_df['capacity'])
+    events_df['task_completion'] = _ratio(events_df['assignments_completed'], events_df['assignments_total'])
+    events_df['vendor_booking_rate'] = _ratio(events_df['vendors_booked'], events_df['vendors_total'])
+    events_df['cost_per_attendee'] = _ratio(events_df['logistics_cost_total'],
+                                            events_df['guests_attending'] + events_df['tickets_sold'])
+
+    # --- Rankings (1 = best; events without data for a KPI are left unranked) ---
+    events_df['rank_attendance'] = events_df['attendance_rate'].rank(ascending=False, method='min')
+    events_df['rank_tickets'] = events_df['tickets_sold'].rank(ascending=False, method='min')
+    events_df['rank_cost_per_attendee'] = events_df['cost_per_attendee'].rank(ascending=True, method='min')
+
+    # --- Monthly trend ---
+    monthly_df = (events_df
+                  .assign(month=events_df['event_date'].dt.to_period('M').dt.to_timestamp())
+                  .groupby('month')
+                  .agg(events=('event_id', 'size'),
+                       guests_attending=('guests_attending', 'sum'),
+                       tickets_sold=('tickets_sold', 'sum'),
+                       logistics_cost_total=('logistics_cost_total', 'sum')))
+    monthly_df['cost_per_attendee'] = _ratio(monthly_df['logistics_cost_total'],
+                                             monthly_df['guests_attending'] + monthly_df['tickets_sold'])
+
+    return {'events': events_df, 'monthly': monthly_df, 'ticket_sales': ticket_sales_df}
 
 # --- Chat Functions ---
 
+@rc.invalidates('chat_messages')
 def add_chat_message(event_id, user_id, message_text):
     """
     Adds a message to the team chat for an event.
@@ -714,13 +1459,46 @@ def add_chat_message(event_id, user_id, message_text):
         conn.close()
         return None
 
-def get_chat_messages(event_id, limit=50):
+@rc.invalidates('chat_messages')
+def add_chat_messages(messages):
+    """
+    Adds several team chat messages in a single transaction.
+    
+    Args:
+        messages (list): (event_id, user_id, message_text, timestamp) tuples
+        
+    Returns:
+        list: The message IDs in the same order if successful, None otherwise
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        message_ids = []
+        for message in messages:
+            cursor.execute(
+                "INSERT INTO chat_messages (event_id, user_id, message_text, timestamp) VALUES (?, ?, ?, ?)",
+                message
+            )
+            message_ids.append(cursor.lastrowid)
+        conn.commit()
+        conn.close()
+        return message_ids
+    except sqlite3.Error as e:
+        print(f"Error adding chat messages: {e}")
+        conn.rollback()
+        conn.close()
+        return None
+
+def get_chat_messages(event_id, limit=50, after_id=None):
     """
     Retrieves chat messages for an event.
     
     Args:
         event_id (int): The ID of the event
         limit (int): Maximum number of messages to return (most recent first)
+        after_id (int): Only return messages newer than this message ID (oldest of them first),
+                        for appending to a transcript the caller already has
         
     Returns:
         list: List of message dictionaries with sender details
@@ -728,7 +1506,11 @@ def get_chat_messages(event_id, limit=50):
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    query = """
+    if after_id is None:
+        where, order, params = "m.event_id = ?", "m.timestamp DESC", (event_id, limit)
+    else:
+        where, order, params = "m.event_id = ? AND m.message_id > ?", "m.message_id", (event_id, after_id, limit)
+    query = f"""
         SELECT 
             m.message_id,
             m.user_id,
@@ -738,19 +1520,20 @@ def get_chat_messages(event_id, limit=50):
             m.timestamp
         FROM chat_messages m
         JOIN users u ON m.user_id = u.user_id
-        WHERE m.event_id = ?
-        ORDER BY m.timestamp DESC
+        WHERE {where}
+        ORDER BY {order}
         LIMIT ?
     """
     
     try:
-        cursor.execute(query, (event_id, limit))
+        cursor.execute(query, params)
         messages = cursor.fetchall()
         conn.close()
         
-        # Convert to list of dicts and reverse to show oldest first
+        # Convert to list of dicts and, for the latest messages, reverse to show oldest first
         result = [dict(m) for m in messages]
-        result.reverse()  # Show in chronological order
+        if after_id is None:
+            result.reverse()  # Show in chronological order
         
         return result
     except sqlite3.Error as e:
@@ -758,6 +1541,172 @@ def get_chat_messages(event_id, limit=50):
         conn.close()
         return [] 
 
+def mark_chat_read(user_id, event_id, message_id):
+    """
+    Moves the user's read cursor for an event's chat forward to `message_id`.
+    The cursor never moves backwards. Returns True if it moved.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO chat_read_cursors (user_id, event_id, last_read_message_id) VALUES (?, ?, ?)
+            ON CONFLICT (user_id, event_id) DO UPDATE SET last_read_message_id = excluded.last_read_message_id
+            WHERE excluded.last_read_message_id > chat_read_cursors.last_read_message_id
+        """, (user_id, event_id, message_id))
+        conn.commit()
+        moved = cursor.rowcount > 0
+    except sqlite3.Error as e:
+        print(f"Error updating chat read cursor: {e}")
+        conn.close()
+        return False
+    conn.close()
+    if moved:
+        rc.bump('chat_read_cursors')
+    return moved
+
+@rc.cached('chat_messages', 'chat_read_cursors')
+def get_unread_chat_counts(user_id, event_ids):
+    """
+    Counts the messages after the user's read cursor in each event's chat, without
+    reading any message rows: each event is one range scan of idx_chat_messages_event.
+
+    Args:
+        user_id (int): The reader
+        event_ids (tuple): Events to count (a tuple so the result can be cached)
+
+    Returns:
+        dict: event_id -> unread count (events with none are omitted)
+    """
+    event_ids = tuple(event_ids)
+    if not event_ids:
+        return {}
+    placeholders = ", ".join("(?)" for _ in event_ids)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+            WITH chats (event_id) AS (VALUES {placeholders}),
+                 cursors AS (
+                     SELECT chats.event_id, COALESCE(c.last_read_message_id, 0) AS last_read
+                     FROM chats
+                     LEFT JOIN chat_read_cursors c ON c.user_id = ? AND c.event_id = chats.event_id
+                 )
+            SELECT cursors.event_id, COUNT(*) AS unread
+            FROM cursors
+            CROSS JOIN chat_messages m ON m.event_id = cursors.event_id AND m.message_id > cursors.last_read
+            GROUP BY cursors.event_id
+        """, (*event_ids, user_id))
+        counts = {row['event_id']: row['unread'] for row in cursor.fetchall()}
+    except sqlite3.Error as e:
+        print(f"Error counting unread chat messages: {e}")
+        counts = None
+    conn.close()
+    return counts
+
+CHAT_HOT_DAYS_DEFAULT = 30  # Days after the event date before its chat is archived, unless set per event
+
+def get_chat_retention_days(event_id):
+    """Returns how many days after the event date its chat stays in the main database."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT hot_days FROM chat_retention_policies WHERE event_id = ?", (event_id,))
+        row = cursor.fetchone()
+        return row['hot_days'] if row else CHAT_HOT_DAYS_DEFAULT
+    except sqlite3.Error as e:
+        print(f"Error fetching chat retention policy: {e}")
+        return CHAT_HOT_DAYS_DEFAULT
+    finally:
+        conn.close()
+
+def set_chat_retention_days(event_id, hot_days):
+    """
+    Sets how many days after the event date its chat stays in the main database
+    before the archiver moves it to the chat archive.
+
+    Returns:
+        bool: True if saved
+    """
+    if hot_days < 0:
+        raise ValueError("Retention must be zero or more days")
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO chat_retention_policies (event_id, hot_days) VALUES (?, ?)
+            ON CONFLICT (event_id) DO UPDATE SET hot_days = excluded.hot_days
+        """, (event_id, int(hot_days)))
+        conn.commit()
+        return True
+    except sqlite3.Error as e:
+        print(f"Error saving chat retention policy: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+# --- Public Booking Catalogue ---
+
+# Shared by every session in this process; rebuilt only after a catalogue change
+_catalogue_lock = threading.Lock()
+_catalogue_cache = {'catalogue': None, 'built_on': None}
+
+def invalidate_booking_catalogue():
+    """Drops the cached booking catalogue so the next reader rebuilds it."""
+    with _catalogue_lock:
+        _catalogue_cache['catalogue'] = None
+
+def get_booking_catalogue():
+    """
+    Returns the read-only catalogue used by the anonymous booking page.
+
+    Returns:
+        dict: College name -> list of ticketed upcoming event dictionaries
+              (event_id, event_name, event_date, event_location, and
+              seats_per_row which is None for unseated events).
+              The result is shared between sessions and must not be modified.
+    """
+    today = datetime.date.today().isoformat()
+    with _catalogue_lock:
+        # Rebuild at day rollover too, so events drop off once their date has passed
+        if _catalogue_cache['catalogue'] is not None and _catalogue_cache['built_on'] == today:
+            return _catalogue_cache['catalogue']
+
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        catalogue = {}
+        try:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='user_metadata'")
+            if cursor.fetchone():
+                cursor.execute("SELECT DISTINCT value FROM user_metadata WHERE key = 'college' AND value IS NOT NULL AND value != ''")
+                for row in cursor.fetchall():
+                    catalogue[row['value']] = []
+
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='event_metadata'")
+            if cursor.fetchone():
+                cursor.execute("""
+                    SELECT e.event_id, e.event_name, e.event_date, e.event_location, s.seats_per_row,
+                           m.value AS college
+                    FROM events e
+                    JOIN event_metadata m ON e.event_id = m.event_id AND m.key = 'college'
+                    LEFT JOIN seat_maps s ON e.event_id = s.event_id
+                    WHERE e.has_tickets = 1 AND e.event_date >= ?
+                    ORDER BY e.event_date
+                """, (today,))
+                for row in cursor.fetchall():
+                    event = dict(row)
+                    catalogue.setdefault(event.pop('college'), []).append(event)
+        except sqlite3.Error as e:
+            print(f"Error building booking catalogue: {e}")
+            conn.close()
+            return {}
+        conn.close()
+
+        _catalogue_cache['catalogue'] = catalogue
+        _catalogue_cache['built_on'] = today
+        return catalogue
+
 # --- Ticket Management Functions ---
 
 def get_ticketed_events():
@@ -776,51 +1725,235 @@ def generate_ticket_code():
     code_part = ''.join(random.choice(chars) for _ in range(8))
     return f"EVT-{code_part[:4]}-{code_part[4:]}"
 
-def book_ticket(event_id, user_name, user_class, user_roll_number, user_address):
-    """Books a ticket for an event and returns the ticket code."""
+def _insert_ticket(cursor, event_id, user_name, user_class, user_roll_number, user_address, idempotency_key=None, seat=None):
+    """
+    Inserts a ticket on the caller's open transaction and returns its code.
+    Shared by book_ticket and waitlist promotion; retries only on a ticket code collision.
+    `seat` is an optional (row, start, count) block for seated events.
+    """
+    booking_timestamp = datetime.datetime.now().isoformat()
+    seat_row, seat_start, seat_count = seat if seat else (None, None, None)
+    while True:
+        ticket_code = generate_ticket_code()
+        try:
+            cursor.execute("""
+                INSERT INTO tickets 
+                (event_id, ticket_code, user_name, user_class, user_roll_number, user_address, booking_timestamp,
+                 idempotency_key, seat_row, seat_start, seat_count) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, 
+                (event_id, ticket_code, user_name, user_class, user_roll_number, user_address, booking_timestamp,
+                 idempotency_key, seat_row, seat_start, seat_count)
+            )
+            return ticket_code
+        except sqlite3.IntegrityError as e:
+            if "UNIQUE constraint failed: tickets.ticket_code" not in str(e):
+                raise
+
+def _has_free_capacity(cursor, event_id):
+    """
+    Checks whether an event can take another ticket: a free seat on seated events,
+    and below capacity when one is set (NULL = unlimited). Caller holds _seat_lock.
+    """
+    cursor.execute("SELECT capacity FROM events WHERE event_id = ?", (event_id,))
+    event = cursor.fetchone()
+    if not event:
+        return False
+    seat_map = _get_seat_map(cursor, event_id)
+    if seat_map and seat_map.seats_free == 0:
+        return False
+    if event['capacity'] is None:
+        return True
+    cursor.execute("SELECT COUNT(*) AS sold FROM tickets WHERE event_id = ?", (event_id,))
+    return cursor.fetchone()['sold'] < event['capacity']
+
+def book_ticket(event_id, user_name, user_class, user_roll_number, user_address, idempotency_key=None, seat_count=1):
+    """
+    Books a ticket for an event.
+
+    For seated events the ticket holds `seat_count` adjacent seats. A repeated call
+    with the same idempotency_key returns the original ticket code instead of booking
+    again.
+
+    Returns:
+        tuple: (True, ticket_code) if booked, or (False, message) if the event is not
+               bookable, is sold out (or has no block of seats that large), the roll
+               number already holds a ticket for this event, or the booking failed
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Check if event exists and has ticketing enabled
-    cursor.execute("SELECT has_tickets FROM events WHERE event_id = ?", (event_id,))
-    event = cursor.fetchone()
-    
-    if not event or not event['has_tickets']:
-        conn.close()
+    # Seat lock first, then the database write lock (same order everywhere)
+    with _seat_lock:
+        try:
+            # Take the write lock up front so the replay, capacity and insert steps are atomic
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Replayed submission (rerun or double click) - hand back the original ticket
+            if idempotency_key:
+                cursor.execute("SELECT ticket_code FROM tickets WHERE event_id = ? AND idempotency_key = ?",
+                               (event_id, idempotency_key))
+                existing = cursor.fetchone()
+                if existing:
+                    conn.rollback()
+                    return True, existing['ticket_code']
+            
+            # Check if event exists and has ticketing enabled
+            cursor.execute("SELECT has_tickets FROM events WHERE event_id = ?", (event_id,))
+            event = cursor.fetchone()
+            
+            if not event or not event['has_tickets']:
+                conn.rollback()
+                return False, "This event is not open for booking."
+            cursor.execute("SELECT 1 FROM tickets WHERE event_id = ? AND user_roll_number = ?", (event_id, user_roll_number))
+            if cursor.fetchone():
+                conn.rollback()
+                return False, "A ticket has already been booked for this event with this Roll Number."
+            if not _has_free_capacity(cursor, event_id):
+                conn.rollback()
+                return False, "This event is sold out."
+
+            seat = None
+            seat_map = _get_seat_map(cursor, event_id)
+            if seat_map:
+                block = seat_map.allocate(seat_count)
+                if not block:
+                    conn.rollback()
+                    return False, f"There is no longer a block of {seat_count} seats together. Please try a smaller group."
+                seat = (block[0], block[1], seat_count)
+            
+            ticket_code = _insert_ticket(cursor, event_id, user_name, user_class, user_roll_number, user_address,
+                                         idempotency_key, seat)
+            conn.commit()
+            return True, ticket_code
+        except sqlite3.Error as e:
+            print(f"Error booking ticket: {e}")
+            conn.rollback()
+            _seat_maps.pop(event_id, None)  # Seats taken in memory were not saved; reload from the database
+            return False, "Failed to book ticket. Please try again later."
+        except ValueError as e:
+            # The in-memory seat map disagreed with the tickets table; rebuild it on the next booking
+            print(f"Error booking ticket: {e}")
+            conn.rollback()
+            _seat_maps.pop(event_id, None)
+            return False, "The seating plan changed while booking. Please try again."
+        finally:
+            conn.close()
+
+def is_roll_number_booked(event_id, user_roll_number):
+    """Checks whether a roll number already holds a ticket for an event (index lookup)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM tickets WHERE event_id = ? AND user_roll_number = ?", (event_id, user_roll_number))
+    booked = cursor.fetchone() is not None
+    conn.close()
+    return booked
+
+def get_event_availability(event_id):
+    """
+    Returns ticket availability for an event.
+
+    Returns:
+        dict: 'capacity' (None = unlimited), 'tickets_sold', 'remaining'
+              (None = unlimited, free seats count on seated events) and 'waitlist_length'
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT e.capacity,
+               (SELECT COUNT(*) FROM tickets t WHERE t.event_id = e.event_id) AS tickets_sold,
+               (SELECT COUNT(*) FROM waitlist w WHERE w.event_id = e.event_id AND w.status = 'Waiting') AS waitlist_length
+        FROM events e
+        WHERE e.event_id = ?
+        """, (event_id,))
+    row = cursor.fetchone()
+    conn.close()
+    if not row:
         return None
-    
-    # Generate a unique ticket code
-    ticket_code = generate_ticket_code()
-    
-    # Set booking timestamp to current date/time
-    booking_timestamp = datetime.datetime.now().isoformat()
-    
+    availability = dict(row)
+    capacity = availability['capacity']
+    availability['remaining'] = None if capacity is None else max(0, capacity - availability['tickets_sold'])
+    # Seated events are also limited by free seats
+    seat_summary = get_seat_map_summary(event_id)
+    if seat_summary:
+        remaining = availability['remaining']
+        availability['remaining'] = seat_summary['seats_free'] if remaining is None else min(remaining, seat_summary['seats_free'])
+    return availability
+
+@rc.invalidates('events')
+def update_event_capacity(event_id, capacity):
+    """Sets an event's ticket capacity (None = unlimited) and promotes waitlisted bookings into any new room."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
     try:
-        cursor.execute("""
-            INSERT INTO tickets 
-            (event_id, ticket_code, user_name, user_class, user_roll_number, user_address, booking_timestamp) 
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, 
-            (event_id, ticket_code, user_name, user_class, user_roll_number, user_address, booking_timestamp)
-        )
-        conn.commit()
+        with _seat_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor.execute("UPDATE events SET capacity = ? WHERE event_id = ?", (capacity, event_id))
+            updated = cursor.rowcount > 0
+            try:
+                removed_ids = _promote_from_waitlist(cursor, event_id) if updated else []
+                conn.commit()
+            except (sqlite3.Error, ValueError):
+                _seat_maps.pop(event_id, None)
+                raise
+    except (sqlite3.Error, ValueError) as e:
+        print(f"Error updating event capacity: {e}")
+        conn.rollback()
+        return False
+    finally:
         conn.close()
-        return ticket_code
+    _drop_from_waitlist_index(event_id, removed_ids)
+    return updated
+
+def cancel_ticket(ticket_id):
+    """
+    Cancels a ticket and, in the same transaction, promotes the head of the event's waitlist.
+
+    Returns:
+        tuple: (True, message) if cancelled, (False, message) otherwise
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        with _seat_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT event_id, seat_row, seat_start, seat_count FROM tickets WHERE ticket_id = ?", (ticket_id,))
+            ticket = cursor.fetchone()
+            if not ticket:
+                conn.rollback()
+                return False, "Ticket not found."
+            event_id = ticket['event_id']
+            try:
+                seat_map = _get_seat_map(cursor, event_id)  # Before the delete, so a fresh load includes these seats
+                cursor.execute("DELETE FROM tickets WHERE ticket_id = ?", (ticket_id,))
+                if seat_map and ticket['seat_row'] is not None:
+                    seat_map.release(ticket['seat_row'], ticket['seat_start'], ticket['seat_count'])
+                removed_ids = _promote_from_waitlist(cursor, event_id)
+                conn.commit()
+            except (sqlite3.Error, ValueError):
+                _seat_maps.pop(event_id, None)  # Reload seats from the database next time
+                raise
     except sqlite3.Error as e:
-        print(f"Error booking ticket: {e}")
+        print(f"Error cancelling ticket: {e}")
+        conn.rollback()
+        return False, "Failed to cancel ticket."
+    except ValueError as e:
+        # The in-memory seat map disagreed with the tickets table
+        print(f"Error cancelling ticket: {e}")
         conn.rollback()
+        return False, "The seating plan is out of date. Please try again."
+    finally:
         conn.close()
-        # If there was a unique constraint error with the ticket code, try again with a new code
-        if "UNIQUE constraint failed: tickets.ticket_code" in str(e):
-            return book_ticket(event_id, user_name, user_class, user_roll_number, user_address)
-        return None
+    _drop_from_waitlist_index(event_id, removed_ids)
+    return True, "Ticket cancelled."
 
 def get_tickets_for_event(event_id):
     """Retrieves all tickets for a specific event."""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT ticket_id, ticket_code, user_name, user_class, user_roll_number, user_address, booking_timestamp 
+        SELECT ticket_id, ticket_code, user_name, user_class, user_roll_number, user_address, booking_timestamp,
+               seat_row, seat_start, seat_count
         FROM tickets 
         WHERE event_id = ? 
         ORDER BY booking_timestamp DESC
@@ -829,7 +1962,11 @@ def get_tickets_for_event(event_id):
     )
     tickets = cursor.fetchall()
     conn.close()
-    return [dict(ticket) for ticket in tickets]
+    tickets = [dict(ticket) for ticket in tickets]
+    for ticket in tickets:
+        ticket['seats'] = (seat_label(ticket['seat_row'], ticket['seat_start'], ticket['seat_count'])
+                           if ticket['seat_row'] is not None else None)
+    return tickets
 
 def validate_ticket(ticket_code):
     """Validates if a ticket code exists and returns the ticket details."""
@@ -848,6 +1985,241 @@ def validate_ticket(ticket_code):
     conn.close()
     return dict(ticket) if ticket else None 
 
+# --- Seat Allocation ---
+
+# One SeatMap per seated event, rebuilt from the tickets table on first use.
+# Writers take _seat_lock before BEGIN IMMEDIATE so memory and database move together.
+_seat_lock = threading.RLock()
+_seat_maps = {}
+
+def _get_seat_map(cursor, event_id):
+    """Returns the event's SeatMap (None for unseated events), loading it if needed. Caller holds _seat_lock."""
+    if event_id in _seat_maps:
+        return _seat_maps[event_id]
+    cursor.execute("SELECT seat_rows, seats_per_row FROM seat_maps WHERE event_id = ?", (event_id,))
+    layout = cursor.fetchone()
+    seat_map = None
+    if layout:
+        seat_map = SeatMap(layout['seat_rows'], layout['seats_per_row'])
+        cursor.execute("SELECT seat_row, seat_start, seat_count FROM tickets WHERE event_id = ? AND seat_row IS NOT NULL", (event_id,))
+        for ticket in cursor.fetchall():
+            seat_map.occupy(ticket['seat_row'], ticket['seat_start'], ticket['seat_count'])
+    _seat_maps[event_id] = seat_map
+    return seat_map
+
+def set_seat_map(event_id, seat_rows, seats_per_row):
+    """
+    Enables numbered seating for an event with the given layout.
+    Refused once seats have been booked, since existing blocks might no longer fit.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    with _seat_lock:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT 1 FROM tickets WHERE event_id = ? AND seat_row IS NOT NULL LIMIT 1", (event_id,))
+            if cursor.fetchone():
+                conn.rollback()
+                return False
+            cursor.execute("INSERT OR REPLACE INTO seat_maps (event_id, seat_rows, seats_per_row) VALUES (?, ?, ?)",
+                           (event_id, seat_rows, seats_per_row))
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error setting seat map: {e}")
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+        _seat_maps.pop(event_id, None)
+    invalidate_booking_catalogue()  # The booking page shows a seat count for seated events
+    return True
+
+def get_seat_map_summary(event_id):
+    """
+    Returns the seating layout and usage for an event.
+
+    Returns:
+        dict or None: 'seat_rows', 'seats_per_row', 'capacity', 'seats_taken',
+                      'seats_free' and 'largest_block'; None for unseated events
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        with _seat_lock:
+            seat_map = _get_seat_map(cursor, event_id)
+            if not seat_map:
+                return None
+            return {
+                'seat_rows': seat_map.rows,
+                'seats_per_row': seat_map.seats_per_row,
+                'capacity': seat_map.capacity,
+                'seats_taken': seat_map.seats_taken,
+                'seats_free': seat_map.seats_free,
+                'largest_block': seat_map.largest_block,
+            }
+    finally:
+        conn.close()
+
+# --- Waitlist Functions ---
+
+# Sorted ids of 'Waiting' entries per event, so a position is a binary search (O(log n)).
+# Loaded lazily from SQLite and kept in step by the functions below after they commit.
+_waitlist_lock = threading.Lock()
+_waitlist_index = {}
+
+def _load_waitlist_index(cursor, event_id):
+    """Returns the sorted waiting ids for an event, loading them on first use. Caller holds _waitlist_lock."""
+    if event_id not in _waitlist_index:
+        cursor.execute("SELECT waitlist_id FROM waitlist WHERE event_id = ? AND status = 'Waiting' ORDER BY waitlist_id", (event_id,))
+        _waitlist_index[event_id] = [row['waitlist_id'] for row in cursor.fetchall()]
+    return _waitlist_index[event_id]
+
+def _drop_from_waitlist_index(event_id, waitlist_ids):
+    """Removes promoted or skipped entries from the in-memory index."""
+    if not waitlist_ids:
+        return
+    with _waitlist_lock:
+        ids = _waitlist_index.get(event_id)
+        if ids is None:
+            return
+        for waitlist_id in waitlist_ids:
+            pos = bisect.bisect_left(ids, waitlist_id)
+            if pos < len(ids) and ids[pos] == waitlist_id:
+                del ids[pos]
+
+def _promote_from_waitlist(cursor, event_id):
+    """
+    Issues tickets to the head of the waitlist while the event has room.
+    Runs inside the caller's transaction (holding _seat_lock) and returns the ids
+    that left the queue. On seated events each promotion takes a single seat.
+    """
+    removed_ids = []
+    seat_map = _get_seat_map(cursor, event_id)
+    while _has_free_capacity(cursor, event_id):
+        cursor.execute("""
+            SELECT waitlist_id, user_name, user_class, user_roll_number, user_address
+            FROM waitlist
+            WHERE event_id = ? AND status = 'Waiting'
+            ORDER BY waitlist_id
+            LIMIT 1
+            """, (event_id,))
+        entry = cursor.fetchone()
+        if not entry:
+            break
+        seat = None
+        if seat_map:
+            block = seat_map.allocate(1)
+            seat = (block[0], block[1], 1)
+        try:
+            ticket_code = _insert_ticket(cursor, event_id, entry['user_name'], entry['user_class'],
+                                         entry['user_roll_number'], entry['user_address'], seat=seat)
+            cursor.execute("UPDATE waitlist SET status = 'Promoted', ticket_code = ? WHERE waitlist_id = ?",
+                           (ticket_code, entry['waitlist_id']))
+        except sqlite3.IntegrityError:
+            # The roll number already holds a ticket for this event
+            if seat:
+                seat_map.release(*seat)
+            cursor.execute("UPDATE waitlist SET status = 'Skipped' WHERE waitlist_id = ?", (entry['waitlist_id'],))
+        removed_ids.append(entry['waitlist_id'])
+    return removed_ids
+
+def join_waitlist(event_id, user_name, user_class, user_roll_number, user_address):
+    """
+    Adds a booking request to the waitlist of a sold-out ticketed event.
+
+    Returns:
+        str or None: A waitlist code (WL-XXXX-XXXX) used to check the position later,
+                     or None if the event has room, is not ticketed, or the roll number
+                     already holds a ticket or a waitlist place
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    with _seat_lock:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT has_tickets FROM events WHERE event_id = ?", (event_id,))
+            event = cursor.fetchone()
+            if not event or not event['has_tickets'] or _has_free_capacity(cursor, event_id):
+                conn.rollback()
+                return None
+            cursor.execute("SELECT 1 FROM tickets WHERE event_id = ? AND user_roll_number = ?", (event_id, user_roll_number))
+            if cursor.fetchone():
+                conn.rollback()
+                return None
+
+            joined_timestamp = datetime.datetime.now().isoformat()
+            while True:
+                waitlist_code = "WL-" + generate_ticket_code()[4:]
+                try:
+                    cursor.execute("""
+                        INSERT INTO waitlist
+                        (event_id, waitlist_code, user_name, user_class, user_roll_number, user_address, joined_timestamp)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (event_id, waitlist_code, user_name, user_class, user_roll_number, user_address, joined_timestamp)
+                    )
+                    break
+                except sqlite3.IntegrityError as e:
+                    if "UNIQUE constraint failed: waitlist.waitlist_code" not in str(e):
+                        raise
+            waitlist_id = cursor.lastrowid
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error joining waitlist: {e}")
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+
+    # Ids only grow, so the new entry always belongs at the end
+    with _waitlist_lock:
+        if event_id in _waitlist_index:
+            _waitlist_index[event_id].append(waitlist_id)
+    return waitlist_code
+
+def get_waitlist_status(waitlist_code):
+    """
+    Looks up a waitlist entry by its code.
+
+    Returns:
+        dict or None: 'event_id', 'status', 'position' (1-based while waiting)
+                      and 'ticket_code' once promoted
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT waitlist_id, event_id, status, ticket_code FROM waitlist WHERE waitlist_code = ?", (waitlist_code,))
+        entry = cursor.fetchone()
+        if not entry:
+            return None
+        status = dict(entry)
+        status['position'] = None
+        if entry['status'] == 'Waiting':
+            with _waitlist_lock:
+                ids = _load_waitlist_index(cursor, entry['event_id'])
+                status['position'] = bisect.bisect_left(ids, entry['waitlist_id']) + 1
+        del status['waitlist_id']
+        return status
+    finally:
+        conn.close()
+
+def get_waitlist_for_event(event_id):
+    """Retrieves the waiting entries for an event in queue order, with their positions."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT waitlist_id, waitlist_code, user_name, user_class, user_roll_number, joined_timestamp
+        FROM waitlist
+        WHERE event_id = ? AND status = 'Waiting'
+        ORDER BY waitlist_id
+        """,
+        (event_id,)
+    )
+    entries = cursor.fetchall()
+    conn.close()
+    return [{'position': pos, **dict(entry)} for pos, entry in enumerate(entries, start=1)]
+
+@rc.invalidates('users', 'user_metadata')
 def update_user_profile(user_id, update_data):
     """Updates a user's profile information.
     
@@ -919,6 +2291,8 @@ def update_user_profile(user_id, update_data):
         
         # Commit all changes
         conn.commit()
+        if 'college' in update_data:
+            invalidate_booking_catalogue()
         return True
         
     except sqlite3.Error as e:
@@ -928,6 +2302,7 @@ def update_user_profile(user_id, update_data):
     finally:
         conn.close() 
 
+@rc.cached('user_metadata')
 def get_all_college_options():
     """Retrieves a list of all unique college names from user_metadata."""
     conn = get_db_connection()
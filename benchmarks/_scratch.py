@@ -0,0 +1,31 @@
+"""
+Shared setup for the benchmark scripts. Each benchmark runs against an empty database
+in a new temporary directory, so it never touches the app's own event_management.db.
+
+Run a benchmark from the repository root, e.g. `python benchmarks/bench_waitlist_promotion.py`.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+def scratch_database():
+    """Switches to a new temporary directory and creates an empty app database there."""
+    workdir = tempfile.mkdtemp(prefix="eventease-bench-")
+    os.chdir(workdir)
+    import database
+    database.initialize_database()
+    return workdir
+
+def measure(func, repeat):
+    """Calls func() `repeat` times and returns (median, max) wall time in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
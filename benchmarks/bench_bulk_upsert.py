@@ -0,0 +1,60 @@
+"""
+Bulk writes against one call per row (user-037).
+
+Times bulk_upsert_guests for 10,000 new guests, the same call updating all of them,
+and bulk_delete_guests removing them, then 10,000 logistics inserts (which also keep
+the event budget up to date). For comparison, times add_guest / update_guest /
+delete_guest called once per row on a smaller sample.
+"""
+import _scratch
+
+ROWS = 10_000
+SINGLE_ROWS = 200
+
+def guest_row(i, **extra):
+    return {'name': f"Guest {i}", 'email': f"guest{i}@example.com", 'phone': f"555-{i:05d}",
+            'notes': "", **extra}
+
+def main():
+    _scratch.scratch_database()
+    import backend as be
+    event_id = be.create_event("Bulk Import", "2030-01-01", "Hall", True, college="Bench")
+
+    result = {}
+    insert_ms = _scratch.measure(lambda: result.update(be.bulk_upsert_guests(event_id, [guest_row(i) for i in range(ROWS)])), 1)[0]
+    guest_ids = result['ids']
+    assert len(guest_ids) == ROWS
+    updates = [guest_row(i, guest_id=guest_id, rsvp_status='Confirmed') for i, guest_id in enumerate(guest_ids)]
+    update_ms = _scratch.measure(lambda: result.update(be.bulk_upsert_guests(event_id, updates)), 1)[0]
+    assert all(outcome['outcome'] == 'updated' for outcome in result['outcomes'])
+    deleted = []
+    delete_ms = _scratch.measure(lambda: deleted.extend(be.bulk_delete_guests(guest_ids)), 1)[0]
+    assert all(outcome['outcome'] == 'deleted' for outcome in deleted)
+
+    items = [{'item_name': f"Item {i}", 'category': "Furniture", 'quantity': "4", 'supplier': "Bench",
+              'cost': 12.5, 'notes': ""} for i in range(ROWS)]
+    logistics_ms = _scratch.measure(lambda: be.bulk_upsert_logistics(event_id, items), 1)[0]
+    assert be.get_event_budget(event_id)['committed_minor'] == ROWS * 4 * 1250
+
+    single_ids = []
+    single_insert_ms = _scratch.measure(lambda: single_ids.extend(
+        be.add_guest(event_id, f"Guest {i}", f"guest{i}@example.com", "", "") for i in range(SINGLE_ROWS)), 1)[0]
+    single_update_ms = _scratch.measure(lambda: [
+        be.update_guest(guest_id, f"Guest {i}", "", "", 'Confirmed', "") for i, guest_id in enumerate(single_ids)], 1)[0]
+    single_delete_ms = _scratch.measure(lambda: [be.delete_guest(guest_id) for guest_id in single_ids], 1)[0]
+
+    def per_row(total_ms, rows):
+        return f"{total_ms:.0f} ms ({total_ms * 1000 / rows:.0f} us/row)"
+
+    print(f"Bulk calls, {ROWS:,} rows each")
+    print(f"  bulk_upsert_guests insert: {per_row(insert_ms, ROWS)}")
+    print(f"  bulk_upsert_guests update: {per_row(update_ms, ROWS)}")
+    print(f"  bulk_delete_guests:        {per_row(delete_ms, ROWS)}")
+    print(f"  bulk_upsert_logistics insert with budget tracking: {per_row(logistics_ms, ROWS)}")
+    print(f"One call per row, {SINGLE_ROWS} rows")
+    print(f"  add_guest:    {per_row(single_insert_ms, SINGLE_ROWS)}")
+    print(f"  update_guest: {per_row(single_update_ms, SINGLE_ROWS)}")
+    print(f"  delete_guest: {per_row(single_delete_ms, SINGLE_ROWS)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Column profiles against SELECT * (user-040).
+
+Loads 5,000 schedule items with 4 KB notes each and reads them back with
+get_schedule_for_event using every column, the 'grid' profile (keeps notes for the
+editor) and the 'report' profile (leaves notes out). Reports the read time and the
+pickled size of the result, which is roughly what Streamlit caches and sends on.
+"""
+import pickle
+import _scratch
+
+ITEMS = 5_000
+NOTE_BYTES = 4_000
+REPEAT = 5
+
+def main():
+    _scratch.scratch_database()
+    import backend as be
+    event_id = be.create_event("Festival", "2030-01-01", "Grounds", True, college="Bench")
+    be.bulk_upsert_schedule_items(event_id, [
+        {'item_name': f"Item {i}", 'start_time': "2030-01-01 10:00", 'end_time': "2030-01-01 11:00",
+         'location': "Hall", 'responsible_person': "Crew", 'notes': "n" * NOTE_BYTES}
+        for i in range(ITEMS)])
+
+    print(f"get_schedule_for_event, {ITEMS:,} items with {NOTE_BYTES:,}-byte notes (median of {REPEAT})")
+    for profile in (None, 'grid', 'report'):
+        rows = be.get_schedule_for_event(event_id, profile=profile)
+        assert len(rows) == ITEMS
+        read_ms = _scratch.measure(lambda: be.get_schedule_for_event(event_id, profile=profile), REPEAT)[0]
+        size_mb = len(pickle.dumps(rows)) / 1_000_000
+        label = "SELECT *" if profile is None else f"'{profile}'"
+        print(f"  {label:<9} {len(rows[0])} columns: {read_ms:6.1f} ms, {size_mb:6.2f} MB pickled")
+
+if __name__ == "__main__":
+    main()
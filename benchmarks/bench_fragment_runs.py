@@ -0,0 +1,83 @@
+"""
+In-script run times of the full page against the fragments (user-044).
+
+Drives frontend.py with Streamlit's AppTest as a Member on a custom task page with
+Developer Mode on, and collects the timings ui.render_run_timing prints for the full
+script and for the status update fragment. Also times the Head dashboard overview
+over 31 events and the first run (imports and database initialisation included).
+
+AppTest reruns the whole script for every interaction, so these are the times spent
+inside each region, not end-to-end latency in a browser.
+"""
+import os
+import re
+import statistics
+import time
+import _scratch
+
+RUNS = 20
+EVENTS = 31
+
+def run_timings(at):
+    """Returns {label: ms} from the Developer Mode timing captions of the last run."""
+    timings = {}
+    for caption in at.caption:
+        match = re.match(r"⏱ (.+): ([\d.]+) ms", caption.value)
+        if match:
+            timings[match.group(1)] = float(match.group(2))
+    return timings
+
+def summary(samples):
+    return f"median {statistics.median(samples):.1f} ms, max {max(samples):.1f} ms ({len(samples)} runs)"
+
+def new_app(user_id, role, username, full_name):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(_scratch.REPO_DIR, "frontend.py"), default_timeout=100)
+    at.session_state['logged_in'] = True
+    at.session_state['user_info'] = {'user_id': user_id, 'role': role, 'username': username, 'full_name': full_name}
+    at.session_state['login_time'] = time.time()
+    at.session_state['dev_mode'] = True
+    return at
+
+def main():
+    _scratch.scratch_database()
+    import backend as be
+    member_id = be.create_user("member", "Passw0rd!x", "Member", "Member One", college="Bench")
+    head_id = be.create_user("head", "Passw0rd!x", "Head", "Head One", college="Bench")
+    event_id = be.create_event("Festival", "2030-01-01", "Hall", college="Bench")
+    for i in range(EVENTS - 1):
+        be.create_event(f"Past Event {i}", "2020-01-01", "Hall", college="Bench")
+    be.assign_custom_task(member_id, event_id, "Decorations")
+
+    at = new_app(member_id, 'Member', "member", "Member One")
+    started = time.perf_counter()
+    at.run()
+    first_run_ms = (time.perf_counter() - started) * 1000
+    at.sidebar.radio(key="member_area_select").set_value("Event Tasks").run()
+    event_select = at.sidebar.radio(key="member_event_select")
+    event_select.set_value(event_select.options[0]).run()
+    assert not at.exception, [e.value for e in at.exception]
+
+    full_runs, status_runs = [], []
+    for i in range(RUNS):
+        at.run()
+        full_runs.append(run_timings(at)["Full script run"])
+        status = next(s for s in at.selectbox if s.key and s.key.startswith('status_'))
+        status.set_value('Completed' if i % 2 else 'In Progress')
+        next(b for b in at.button if b.key and b.key.startswith('update_status_')).click().run()
+        assert not at.exception, [e.value for e in at.exception]
+        status_runs.append(run_timings(at)["Status update"])
+
+    head = new_app(head_id, 'Head', "head", "Head One")
+    dashboard_runs = []
+    for _ in range(RUNS):
+        head.run()
+        dashboard_runs.append(run_timings(head)["Dashboard overview"])
+
+    print(f"First run (imports, database initialisation): {first_run_ms:.0f} ms")
+    print(f"Member task page, full script run: {summary(full_runs)}")
+    print(f"Status update fragment: {summary(status_runs)}")
+    print(f"Head dashboard overview over {EVENTS} events: {summary(dashboard_runs)}")
+
+if __name__ == "__main__":
+    main()
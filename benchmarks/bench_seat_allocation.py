@@ -0,0 +1,68 @@
+"""
+Seat allocation in a 20,000-seat venue (user-030).
+
+1. SeatMap alone: fills a 200 x 100 venue with random group sizes (1-6 adjacent seats),
+   then frees and re-books random blocks, timing each allocate/release.
+2. End to end: book_ticket on a seated event of the same size, including the
+   transaction, and the time to rebuild the seat map from the tickets table.
+"""
+import random
+import _scratch
+
+ROWS, SEATS_PER_ROW = 200, 100
+BOOKINGS = 2_000
+
+def bench_seat_map():
+    from seating import SeatMap
+    rng = random.Random(30)
+    seat_map = SeatMap(ROWS, SEATS_PER_ROW)
+    blocks, allocate_ms = [], []
+    while seat_map.seats_free:
+        count = min(rng.randint(1, 6), seat_map.largest_block)
+        block = []
+        allocate_ms.append(_scratch.measure(lambda: block.append(seat_map.allocate(count)), 1)[0])
+        blocks.append((*block[0], count))
+
+    release_ms, rebook_ms = [], []
+    for _ in range(5_000):
+        row, start, count = blocks.pop(rng.randrange(len(blocks)))
+        release_ms.append(_scratch.measure(lambda: seat_map.release(row, start, count), 1)[0])
+        block = []
+        rebook_ms.append(_scratch.measure(lambda: block.append(seat_map.allocate(count)), 1)[0])
+        blocks.append((*block[0], count))
+
+    def summary(samples):
+        samples = sorted(samples)
+        return f"median {samples[len(samples) // 2] * 1000:.1f} us, max {samples[-1] * 1000:.1f} us"
+
+    print(f"SeatMap {ROWS} x {SEATS_PER_ROW} ({ROWS * SEATS_PER_ROW:,} seats)")
+    print(f"  fill with {len(allocate_ms):,} groups: total {sum(allocate_ms):.1f} ms, allocate {summary(allocate_ms)}")
+    print(f"  release {summary(release_ms)}; re-book the freed block {summary(rebook_ms)}")
+
+def bench_book_ticket():
+    _scratch.scratch_database()
+    import backend as be
+    rng = random.Random(30)
+    event_id = be.create_event("Arena", "2030-01-01", "Arena", True, college="Bench")
+    be.set_seat_map(event_id, ROWS, SEATS_PER_ROW)
+
+    samples = []
+    for i in range(BOOKINGS):
+        count = rng.randint(1, 6)
+        result = []
+        samples.append(_scratch.measure(
+            lambda: result.append(be.book_ticket(event_id, f"Guest {i}", "FE", f"R{i}", "", seat_count=count)), 1)[0])
+        assert result[0][0], result[0]
+    samples.sort()
+
+    be._seat_maps.clear()
+    reload_ms = _scratch.measure(lambda: be.get_seat_map_summary(event_id), 1)[0]
+    summary = be.get_seat_map_summary(event_id)
+
+    print(f"book_ticket on a {ROWS * SEATS_PER_ROW:,}-seat event ({BOOKINGS:,} group bookings)")
+    print(f"  median {samples[len(samples) // 2]:.2f} ms, p95 {samples[int(len(samples) * 0.95)]:.2f} ms, max {samples[-1]:.2f} ms")
+    print(f"  seat map rebuilt from {BOOKINGS:,} tickets in {reload_ms:.1f} ms ({summary['seats_taken']:,} seats taken)")
+
+if __name__ == "__main__":
+    bench_seat_map()
+    bench_book_ticket()
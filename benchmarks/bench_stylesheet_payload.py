@@ -0,0 +1,62 @@
+"""
+Theme stylesheet payload per rerun (user-045).
+
+1. Runs the login page with AppTest and measures the stylesheet markdown element that
+   every rerun sends (ui.STYLESHEET_TAG), against sending static/eventease.css inline
+   as a <style> block.
+2. Starts a headless `streamlit run frontend.py` and fetches the static URL from the tag,
+   to check the file is served once, as text/css with caching headers.
+"""
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+import _scratch
+
+PORT = 8599
+
+def rerun_payload():
+    from streamlit.testing.v1 import AppTest
+    import ui_components as ui
+    at = AppTest.from_file(os.path.join(_scratch.REPO_DIR, "frontend.py"), default_timeout=100)
+    at.run()
+    assert not at.exception, [e.value for e in at.exception]
+    sent = [m for m in at.markdown if m.value == ui.STYLESHEET_TAG]
+    assert len(sent) == 1, "stylesheet tag not rendered exactly once"
+    with open(ui.STYLESHEET_FILE, encoding='utf-8') as css_file:
+        inline = f"<style>{css_file.read()}</style>"
+    print("Stylesheet payload per rerun")
+    print(f"  inline <style> block: {len(inline.encode('utf-8')):,} bytes")
+    print(f"  STYLESHEET_TAG:       {len(ui.STYLESHEET_TAG.encode('utf-8')):,} bytes ({ui.STYLESHEET_TAG})")
+    return ui.STYLESHEET_TAG.split('"')[1]
+
+def fetch_static(url_path):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.join(_scratch.REPO_DIR, "frontend.py"),
+         "--server.headless", "true", "--server.port", str(PORT), "--server.enableStaticServing", "true"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f"http://localhost:{PORT}/"
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(base + "_stcore/health", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.2)
+        with urllib.request.urlopen(base + url_path, timeout=5) as response:
+            body = response.read()
+            print(f"GET /{url_path}")
+            print(f"  {response.status} {response.headers['Content-Type']}, {len(body):,} bytes, "
+                  f"ETag {response.headers['ETag']}, Last-Modified {response.headers['Last-Modified']}")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    _scratch.scratch_database()
+    url_path = rerun_payload()
+    fetch_static(url_path)
+
+if __name__ == "__main__":
+    main()
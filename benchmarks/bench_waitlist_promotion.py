@@ -0,0 +1,57 @@
+"""
+Waitlist promotion latency with a long queue (user-029).
+
+Fills a sold-out event's waitlist with 50,000 entries, then repeatedly cancels the
+event's only ticket. Each cancel promotes the head of the queue in the same transaction.
+Also times get_waitlist_status for an entry in the middle of the queue.
+"""
+import datetime
+import _scratch
+
+WAITING = 50_000
+CANCELS = 200
+
+def main():
+    _scratch.scratch_database()
+    import backend as be
+
+    event_id = be.create_event("Sold Out Show", "2030-01-01", "Hall", True, college="Bench", capacity=1)
+    assert be.book_ticket(event_id, "First", "FE", "R0", "")[0]
+
+    conn = be.get_db_connection()
+    joined = datetime.datetime.now().isoformat()
+    conn.executemany("""
+        INSERT INTO waitlist (event_id, waitlist_code, user_name, user_class, user_roll_number, user_address, joined_timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [(event_id, f"WL-{i:09d}", f"Waiting {i}", "FE", f"W{i}", "", joined) for i in range(WAITING)])
+    conn.commit()
+    conn.close()
+    middle_code = f"WL-{WAITING // 2:09d}"
+
+    def current_ticket_id():
+        conn = be.get_db_connection()
+        ticket_id = conn.execute("SELECT ticket_id FROM tickets WHERE event_id = ?", (event_id,)).fetchone()[0]
+        conn.close()
+        return ticket_id
+
+    first_status = _scratch.measure(lambda: be.get_waitlist_status(middle_code), 1)[0]
+    status_median, status_max = _scratch.measure(lambda: be.get_waitlist_status(middle_code), 1000)
+
+    samples = []
+    for _ in range(CANCELS):
+        ticket_id = current_ticket_id()
+        samples.append(_scratch.measure(lambda: be.cancel_ticket(ticket_id), 1)[0])
+    samples.sort()
+
+    status = be.get_waitlist_status(middle_code)
+    assert status['status'] == 'Waiting' and status['position'] == WAITING // 2 + 1 - CANCELS, status
+    assert be.get_event_availability(event_id)['waitlist_length'] == WAITING - CANCELS
+
+    print(f"Waitlist of {WAITING:,} entries")
+    print(f"  cancel + promote head: median {samples[len(samples) // 2]:.2f} ms, "
+          f"p95 {samples[int(len(samples) * 0.95)]:.2f} ms, max {samples[-1]:.2f} ms ({CANCELS} cancels)")
+    print(f"  position lookup: first call {first_status:.1f} ms (loads the index), "
+          f"then median {status_median * 1000:.1f} us, max {status_max:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Constants
+BOOKING_CONCURRENCY_LIMIT = 25  # Sessions allowed on the booking form at the same time
+ADMISSION_TTL = 5 * 60  # Seconds an admitted session may hold its slot without booking
+WAITING_TTL = 60  # Seconds a waiting session keeps its place without checking back
+_EWMA_WEIGHT = 0.2  # Smoothing factor for the wait/hold time averages
+
+# The queue lives in process memory so every Streamlit session shares it
+_lock = threading.Lock()
+_waiting = OrderedDict()  # token -> {'seq', 'joined', 'last_seen'}
+_admitted = {}  # token -> {'admitted_at', 'last_seen'}
+_state = {
+    'limit': BOOKING_CONCURRENCY_LIMIT,
+    'next_seq': 0,
+    'served_seq': 0,
+}
+_metrics = {
+    'total_joined': 0,
+    'total_admitted': 0,
+    'total_released': 0,
+    'total_expired': 0,
+    'total_shed': 0,
+    'avg_wait_seconds': 0.0,
+    'max_wait_seconds': 0.0,
+    'avg_hold_seconds': 0.0,
+}
+
+def _ewma(previous, sample, count):
+    """Running average that starts from the first sample."""
+    if count <= 1:
+        return float(sample)
+    return previous + _EWMA_WEIGHT * (sample - previous)
+
+def _expire(now):
+    """Drop admitted and waiting tokens whose sessions have gone quiet. Caller holds _lock."""
+    for token in [t for t, a in _admitted.items() if now - a['last_seen'] > ADMISSION_TTL]:
+        del _admitted[token]
+        _metrics['total_expired'] += 1
+    for token in [t for t, w in _waiting.items() if now - w['last_seen'] > WAITING_TTL]:
+        del _waiting[token]
+        _metrics['total_expired'] += 1
+
+def _admit_waiting(now):
+    """Move tokens from the head of the queue into free slots, oldest first. Caller holds _lock."""
+    while _waiting and len(_admitted) < _state['limit']:
+        token, entry = _waiting.popitem(last=False)
+        _admitted[token] = {'admitted_at': now, 'last_seen': now}
+        _state['served_seq'] = entry['seq']
+        wait = now - entry['joined']
+        _metrics['total_admitted'] += 1
+        _metrics['avg_wait_seconds'] = _ewma(_metrics['avg_wait_seconds'], wait, _metrics['total_admitted'])
+        _metrics['max_wait_seconds'] = max(_metrics['max_wait_seconds'], wait)
+
+def set_concurrency_limit(limit):
+    """Changes how many sessions may use the booking form at once."""
+    if limit < 1:
+        raise ValueError("Concurrency limit must be at least 1")
+    with _lock:
+        _state['limit'] = int(limit)
+        _admit_waiting(time.time())
+
+def request_admission(token=None):
+    """
+    Joins the booking queue, or checks back in with an existing token.
+
+    Args:
+        token (str, optional): The token returned by a previous call
+
+    Returns:
+        dict: 'token', 'admitted', and for waiting sessions an estimated
+              'position' and 'estimated_wait' in seconds
+    """
+    now = time.time()
+    with _lock:
+        _expire(now)
+
+        if token in _admitted:
+            _admitted[token]['last_seen'] = now
+            return {'token': token, 'admitted': True, 'position': 0, 'estimated_wait': 0}
+
+        if token not in _waiting:
+            token = uuid.uuid4().hex
+            _state['next_seq'] += 1
+            _waiting[token] = {'seq': _state['next_seq'], 'joined': now, 'last_seen': now}
+            _metrics['total_joined'] += 1
+        else:
+            _waiting[token]['last_seen'] = now
+
+        _admit_waiting(now)
+
+        if token in _admitted:
+            return {'token': token, 'admitted': True, 'position': 0, 'estimated_wait': 0}
+
+        # Sequence numbers give an O(1) estimate; it may overcount sessions that left the queue
+        position = max(1, _waiting[token]['seq'] - _state['served_seq'])
+        estimated_wait = position * _metrics['avg_hold_seconds'] / _state['limit']
+        _metrics['total_shed'] += 1
+        return {'token': token, 'admitted': False, 'position': position, 'estimated_wait': estimated_wait}
+
+def release_admission(token):
+    """Frees a booking slot (after a booking or when the visitor leaves) and admits the next in line."""
+    if not token:
+        return
+    now = time.time()
+    with _lock:
+        if token in _admitted:
+            hold = now - _admitted.pop(token)['admitted_at']
+            _metrics['total_released'] += 1
+            _metrics['avg_hold_seconds'] = _ewma(_metrics['avg_hold_seconds'], hold, _metrics['total_released'])
+        else:
+            _waiting.pop(token, None)
+        _admit_waiting(now)
+
+def get_queue_metrics():
+    """Returns a snapshot of queue depth, slot usage and wait-time statistics."""
+    with _lock:
+        _expire(time.time())
+        metrics = dict(_metrics)
+        metrics['queue_depth'] = len(_waiting)
+        metrics['active_sessions'] = len(_admitted)
+        metrics['concurrency_limit'] = _state['limit']
+        return metrics
@@ -0,0 +1,243 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.request
+import zlib
+import backend as be
+import read_cache as rc
+
+# Constants
+ARCHIVE_DATABASE_NAME = 'chat_archive.db'  # Kept next to be.DATABASE_NAME
+ARCHIVE_BATCH_SIZE = 200  # Messages moved per transaction (one compressed block)
+ARCHIVE_BATCH_PAUSE = 0.05  # Seconds between batches, so other writers get the lock in between
+ARCHIVE_INTERVAL = 60 * 60  # Seconds between archive passes of the background thread
+ARCHIVE_COMPRESSION_LEVEL = 6
+
+# Old chat leaves the main database in blocks: up to ARCHIVE_BATCH_SIZE consecutive messages
+# of one event, stored as zlib-compressed JSON in a separate database file that is ATTACHed
+# while archiving or searching. Copying a block and deleting its rows is one transaction
+# across both files, so a message is never in both places or neither.
+_ARCHIVE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS archive.chat_archive_blocks (
+        block_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        event_id INTEGER NOT NULL,
+        first_message_id INTEGER NOT NULL UNIQUE,
+        last_message_id INTEGER NOT NULL,
+        first_timestamp TEXT NOT NULL,
+        last_timestamp TEXT NOT NULL,
+        message_count INTEGER NOT NULL,
+        payload BLOB NOT NULL -- zlib(JSON list of [message_id, user_id, timestamp, message_text])
+    );
+    CREATE INDEX IF NOT EXISTS archive.idx_chat_archive_blocks_event
+        ON chat_archive_blocks (event_id, first_message_id);
+"""
+
+_lock = threading.Lock()  # One archive pass at a time
+_lock_metrics = threading.Lock()
+_state = {'thread': None, 'stop': threading.Event()}
+_metrics = {
+    'total_archived': 0,
+    'total_batches': 0,
+    'bytes_before': 0,
+    'bytes_after': 0,
+    'max_lock_ms': 0.0,
+    'last_pass_at': None,
+    'last_pass_archived': 0,
+}
+
+def _connect():
+    """Connection to the main database with the archive attached as `archive`."""
+    conn = be.get_db_connection()
+    conn.execute("ATTACH DATABASE ? AS archive", (ARCHIVE_DATABASE_NAME,))
+    conn.executescript(_ARCHIVE_SCHEMA)
+    return conn
+
+def _connect_readonly():
+    """
+    Like _connect, but attaches the archive read-only and never creates it or its schema.
+    Returns None when nothing has been archived yet.
+    """
+    if not os.path.exists(ARCHIVE_DATABASE_NAME):
+        return None
+    uri = f"file:{urllib.request.pathname2url(os.path.abspath(ARCHIVE_DATABASE_NAME))}?mode=ro"
+    conn = be.get_db_connection()
+    try:
+        conn.execute("ATTACH DATABASE ? AS archive", (uri,))
+        cursor = conn.execute("SELECT 1 FROM archive.sqlite_master WHERE type = 'table' AND name = 'chat_archive_blocks'")
+        if cursor.fetchone() is None:
+            conn.close()
+            return None
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+def _events_due(cursor):
+    """Event IDs whose retention period (days after the event date) has passed and that still have hot chat."""
+    cursor.execute("""
+        SELECT e.event_id
+        FROM events e
+        LEFT JOIN chat_retention_policies p ON p.event_id = e.event_id
+        WHERE e.event_date IS NOT NULL
+          AND date(e.event_date, '+' || COALESCE(p.hot_days, ?) || ' days') < date('now')
+          AND EXISTS (SELECT 1 FROM chat_messages m WHERE m.event_id = e.event_id)
+        ORDER BY e.event_id
+    """, (be.CHAT_HOT_DAYS_DEFAULT,))
+    return [row['event_id'] for row in cursor.fetchall()]
+
+def _archive_batch(conn, event_id):
+    """
+    Moves an event's oldest ARCHIVE_BATCH_SIZE messages into one archive block.
+    Reading and compressing happen before the write lock is taken.
+
+    Returns:
+        int: Messages moved (0 when the event has none left)
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT message_id, user_id, timestamp, message_text
+        FROM chat_messages WHERE event_id = ?
+        ORDER BY message_id LIMIT ?
+    """, (event_id, ARCHIVE_BATCH_SIZE))
+    rows = [tuple(row) for row in cursor.fetchall()]
+    if not rows:
+        return 0
+    raw = json.dumps(rows, separators=(',', ':')).encode('utf-8')
+    payload = zlib.compress(raw, ARCHIVE_COMPRESSION_LEVEL)
+    first_id, last_id = rows[0][0], rows[-1][0]
+
+    started = time.perf_counter()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("""
+            INSERT INTO archive.chat_archive_blocks
+                (event_id, first_message_id, last_message_id, first_timestamp, last_timestamp, message_count, payload)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (event_id, first_id, last_id, rows[0][2], rows[-1][2], len(rows), payload))
+        # New messages only ever get higher IDs, so this range is exactly the rows read above
+        cursor.execute("DELETE FROM chat_messages WHERE event_id = ? AND message_id BETWEEN ? AND ?",
+                       (event_id, first_id, last_id))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    lock_ms = (time.perf_counter() - started) * 1000
+
+    with _lock_metrics:
+        _metrics['total_archived'] += len(rows)
+        _metrics['total_batches'] += 1
+        _metrics['bytes_before'] += len(raw)
+        _metrics['bytes_after'] += len(payload)
+        _metrics['max_lock_ms'] = max(_metrics['max_lock_ms'], lock_ms)
+    rc.bump('chat_messages')
+    return len(rows)
+
+def run_archive_pass(pause=ARCHIVE_BATCH_PAUSE):
+    """
+    Archives the chat of every event past its retention period, one batch per
+    transaction with a pause in between. Also drops archived chat of deleted events.
+
+    Returns:
+        int: Messages archived in this pass
+    """
+    archived = 0
+    with _lock:
+        conn = None
+        try:
+            conn = _connect()
+            for event_id in _events_due(conn.cursor()):
+                while not _state['stop'].is_set():
+                    moved = _archive_batch(conn, event_id)
+                    archived += moved
+                    if moved < ARCHIVE_BATCH_SIZE:
+                        break
+                    time.sleep(pause)
+            conn.execute("DELETE FROM archive.chat_archive_blocks WHERE event_id NOT IN (SELECT event_id FROM main.events)")
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error archiving chat messages: {e}")
+        finally:
+            if conn is not None:
+                conn.close()
+    with _lock_metrics:
+        _metrics['last_pass_at'] = time.time()
+        _metrics['last_pass_archived'] = archived
+    return archived
+
+def _run_archiver():
+    while not _state['stop'].is_set():
+        run_archive_pass()
+        _state['stop'].wait(ARCHIVE_INTERVAL)
+
+def start_archiver():
+    """Starts the background archive thread (once per process). Returns the thread."""
+    with _lock_metrics:
+        thread = _state['thread']
+        if thread is None or not thread.is_alive():
+            _state['stop'].clear()
+            thread = threading.Thread(target=_run_archiver, name="chat-archiver", daemon=True)
+            _state['thread'] = thread
+            thread.start()
+    return thread
+
+def stop_archiver():
+    """Asks the background thread to stop after its current batch."""
+    _state['stop'].set()
+
+def search_archived_chat(event_id, query=None, limit=200):
+    """
+    Reads an event's archived chat, newest first, optionally keeping only messages
+    containing `query` (case-insensitive). Blocks are decompressed on demand.
+
+    Returns:
+        list: dicts shaped like be.get_chat_messages rows (message_id, user_id,
+              message_text, timestamp, full_name, role)
+    """
+    needle = query.casefold() if query else None
+    conn = None
+    messages = []
+    try:
+        conn = _connect_readonly()
+        if conn is None:
+            return []
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT payload FROM archive.chat_archive_blocks
+            WHERE event_id = ? ORDER BY first_message_id DESC
+        """, (event_id,))
+        for (payload,) in cursor:
+            for message_id, user_id, timestamp, text in reversed(json.loads(zlib.decompress(payload))):
+                if needle is None or needle in text.casefold():
+                    messages.append({'message_id': message_id, 'user_id': user_id,
+                                     'message_text': text, 'timestamp': timestamp})
+                    if len(messages) >= limit:
+                        break
+            if len(messages) >= limit:
+                break
+        users = {}
+        user_ids = sorted({m['user_id'] for m in messages})
+        if user_ids:
+            placeholders = ", ".join("?" for _ in user_ids)
+            cursor.execute(f"SELECT user_id, full_name, role FROM main.users WHERE user_id IN ({placeholders})", user_ids)
+            users = {row['user_id']: row for row in cursor.fetchall()}
+        for message in messages:
+            user = users.get(message['user_id'])
+            message['full_name'] = user['full_name'] if user else "Unknown"
+            message['role'] = user['role'] if user else ""
+    except sqlite3.Error as e:
+        print(f"Error searching archived chat: {e}")
+        messages = []
+    finally:
+        if conn is not None:
+            conn.close()
+    return messages
+
+def get_archive_metrics():
+    """Returns counters for archived messages, batches, compression and write-lock time."""
+    with _lock_metrics:
+        metrics = dict(_metrics)
+    metrics['compression_ratio'] = metrics['bytes_before'] / metrics['bytes_after'] if metrics['bytes_after'] else 0.0
+    metrics['running'] = bool(_state['thread'] and _state['thread'].is_alive())
+    return metrics
@@ -0,0 +1,126 @@
+import threading
+import time
+from datetime import datetime
+import backend as be
+
+# Constants
+CHAT_BURST = 5  # Messages a user may send back to back
+CHAT_REFILL_PER_SECOND = 0.5  # Sustained rate once the burst is used up (one message every 2 s)
+COALESCE_WINDOW = 0.005  # Seconds a batch stays open for other sends before it is written
+_BUCKET_PRUNE_SIZE = 256  # Drop idle (full) buckets once this many users are tracked
+
+# Shared by every Streamlit session in this process
+_lock = threading.Lock()
+_buckets = {}  # user_id -> {'tokens', 'updated'}
+_pending = []  # sends waiting for the next batch
+_state = {'leader': False}
+_metrics = {
+    'total_sent': 0,
+    'total_rejected': 0,
+    'total_failed': 0,
+    'total_batches': 0,
+    'total_coalesced': 0,
+    'max_batch_size': 0,
+}
+
+def _take_token(user_id, now):
+    """
+    Token bucket per user. Returns 0 if the send may go ahead, otherwise the
+    seconds until the next token. Caller holds _lock.
+    """
+    if len(_buckets) > _BUCKET_PRUNE_SIZE:
+        full_after = CHAT_BURST / CHAT_REFILL_PER_SECOND
+        for idle in [u for u, b in _buckets.items() if now - b['updated'] >= full_after]:
+            del _buckets[idle]
+
+    bucket = _buckets.setdefault(user_id, {'tokens': float(CHAT_BURST), 'updated': now})
+    bucket['tokens'] = min(CHAT_BURST, bucket['tokens'] + (now - bucket['updated']) * CHAT_REFILL_PER_SECOND)
+    bucket['updated'] = now
+    if bucket['tokens'] >= 1:
+        bucket['tokens'] -= 1
+        return 0
+    return (1 - bucket['tokens']) / CHAT_REFILL_PER_SECOND
+
+def _write_batches():
+    """
+    Runs on the thread that opened the current batch: waits out the coalescing window,
+    writes everything queued in one transaction, and repeats until the queue is empty.
+    """
+    batch = []
+    try:
+        while True:
+            time.sleep(COALESCE_WINDOW)
+            with _lock:
+                batch = _pending[:]
+                _pending.clear()
+                if not batch:
+                    _state['leader'] = False
+                    return
+            try:
+                message_ids = be.add_chat_messages([send['message'] for send in batch])
+            except Exception as e:
+                print(f"Error writing chat batch: {e}")
+                message_ids = None
+            with _lock:
+                _metrics['total_batches'] += 1
+                _metrics['max_batch_size'] = max(_metrics['max_batch_size'], len(batch))
+                if message_ids is None:
+                    _metrics['total_failed'] += len(batch)
+                else:
+                    _metrics['total_sent'] += len(batch)
+                    if len(batch) > 1:
+                        _metrics['total_coalesced'] += len(batch)
+            for i, send in enumerate(batch):
+                send['message_id'] = message_ids[i] if message_ids else None
+                send['done'].set()
+            batch = []
+    except BaseException:
+        # Never leave waiting sends (or the leader flag) behind
+        with _lock:
+            stranded = _pending[:]
+            _pending.clear()
+            _state['leader'] = False
+        for send in batch + stranded:
+            send['done'].set()
+        raise
+
+def send_chat_message(event_id, user_id, message_text):
+    """
+    Rate-limits a team chat message and writes it together with any other
+    messages sent within COALESCE_WINDOW.
+
+    Returns:
+        dict: 'status' ('sent', 'rate_limited' or 'failed'), 'message_id' when sent,
+              and 'retry_after' in seconds when rate limited
+    """
+    now = time.monotonic()
+    send = {
+        'message': (event_id, user_id, message_text, datetime.now().isoformat()),
+        'message_id': None,
+        'done': threading.Event(),
+    }
+    with _lock:
+        retry_after = _take_token(user_id, now)
+        if retry_after:
+            _metrics['total_rejected'] += 1
+            return {'status': 'rate_limited', 'message_id': None, 'retry_after': retry_after}
+        _pending.append(send)
+        lead = not _state['leader']
+        _state['leader'] = True
+
+    if lead:
+        _write_batches()
+    send['done'].wait()
+
+    if send['message_id'] is None:
+        return {'status': 'failed', 'message_id': None, 'retry_after': 0}
+    return {'status': 'sent', 'message_id': send['message_id'], 'retry_after': 0}
+
+def get_writer_metrics():
+    """Returns counters for sent, rejected, failed and coalesced chat messages."""
+    with _lock:
+        metrics = dict(_metrics)
+        metrics['tracked_users'] = len(_buckets)
+    batches = metrics['total_batches']
+    metrics['avg_batch_size'] = (metrics['total_sent'] + metrics['total_failed']) / batches if batches else 0.0
+    return metrics
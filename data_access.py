@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import backend as be
 import security as sec
+import event_snapshot as es
 
 def check_user_college_access(user_id, event_id):
     """
@@ -13,13 +14,13 @@ def check_user_college_access(user_id, event_id):
     if not user or 'college' not in user or not user['college']:
         return False
     
-    # Get event's college
-    event = be.get_event_by_id(event_id)
-    if not event or 'college' not in event or not event['college']:
+    # Get event's college (from the cached event snapshot the page is about to use anyway)
+    snapshot = es.get_event_snapshot(event_id)
+    if not snapshot or not snapshot.college:
         return False
     
     # Check if they match
-    return user['college'] == event['college']
+    return user['college'] == snapshot.college
 
 def check_assignment_access(user_id, assignment_id):
     """
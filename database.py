@@ -2,6 +2,93 @@ import sqlite3
 
 DATABASE_NAME = 'event_management.db'
 
+# --- Event Stats Rollup Definition ---
+# Each event_stats column is the sum, over one source table's rows for the event,
+# of an SQL expression. '{r}' stands for the row (NEW/OLD in triggers, the table
+# name when rebuilding). 'IS' comparisons yield 0/1 and never NULL. Money columns
+# end in '_minor' and hold integer cents.
+# Logistics line total in cents (backend budgets use it too); a missing cost or
+# non-numeric quantity counts as 0
+LOGISTICS_LINE_TOTAL = "COALESCE({r}.cost_minor, 0) * COALESCE(CAST({r}.quantity AS INTEGER), 0)"
+
+# Logistics statuses whose cost counts as delivered in an event's budget
+DELIVERED_LOGISTICS_STATUSES = ('Delivered', 'Setup', 'Returned')
+
+EVENT_STATS_COLUMNS = {
+    'guests': [
+        ('guests_total', "1"),
+        ('guests_pending', "{r}.rsvp_status IS 'Pending'"),
+        ('guests_attending', "{r}.rsvp_status IS 'Attending'"),
+        ('guests_declined', "{r}.rsvp_status IS 'Declined'"),
+        ('guests_maybe', "{r}.rsvp_status IS 'Maybe'"),
+    ],
+    'logistics': [('logistics_items', "1"), ('logistics_cost_minor', LOGISTICS_LINE_TOTAL)] + [
+        column
+        for status in ('Required', 'Sourced', 'Delivered', 'Setup', 'Returned')
+        for column in (
+            (f"logistics_{status.lower()}_items", f"{{r}}.status IS '{status}'"),
+            (f"logistics_{status.lower()}_cost_minor", f"({{r}}.status IS '{status}') * {LOGISTICS_LINE_TOTAL}"),
+        )
+    ],
+    'tickets': [
+        ('tickets_sold', "1"),
+    ],
+    'vendors': [
+        ('vendors_total', "1"),
+        ('vendors_pending', "{r}.status IS 'Pending'"),
+        ('vendors_contacted', "{r}.status IS 'Contacted'"),
+        ('vendors_booked', "{r}.status IS 'Booked'"),
+        ('vendors_rejected', "{r}.status IS 'Rejected'"),
+    ],
+    'assignments': [
+        ('assignments_total', "1"),
+        ('assignments_assigned', "{r}.status IS 'Assigned'"),
+        ('assignments_in_progress', "{r}.status IS 'In Progress'"),
+        ('assignments_completed', "{r}.status IS 'Completed'"),
+    ],
+}
+
+def _event_stats_triggers(table, columns):
+    """Builds the INSERT/UPDATE/DELETE trigger statements that keep event_stats exact for one table."""
+    def apply(row, sign):
+        updates = ", ".join(f"{name} = {name} {sign} ({expr.format(r=row)})" for name, expr in columns)
+        return (f"INSERT OR IGNORE INTO event_stats (event_id) VALUES ({row}.event_id);\n"
+                f"        UPDATE event_stats SET {updates} WHERE event_id = {row}.event_id;")
+    return {
+        f"trg_event_stats_{table}_insert": f"AFTER INSERT ON {table} BEGIN\n        {apply('NEW', '+')}\n    END",
+        f"trg_event_stats_{table}_delete": f"AFTER DELETE ON {table} BEGIN\n        {apply('OLD', '-')}\n    END",
+        f"trg_event_stats_{table}_update": (f"AFTER UPDATE ON {table} BEGIN\n        {apply('OLD', '-')}\n"
+                                            f"        {apply('NEW', '+')}\n    END"),
+    }
+
+def rebuild_event_stats(cursor):
+    """Recomputes every event_stats row from the base tables (runs on the caller's transaction)."""
+    cursor.execute("DELETE FROM event_stats")
+    # One row per existing event; source rows left behind by a deleted event are not counted
+    cursor.execute("INSERT INTO event_stats (event_id) SELECT event_id FROM events")
+    for table, columns in EVENT_STATS_COLUMNS.items():
+        names = ", ".join(name for name, _ in columns)
+        sums = ", ".join(f"COALESCE(SUM({expr.format(r=table)}), 0)" for _, expr in columns)
+        cursor.execute(f"UPDATE event_stats SET ({names}) = (SELECT {sums} FROM {table} WHERE {table}.event_id = event_stats.event_id)")
+
+# --- Event Versions ---
+# Tables read into an event snapshot; every insert, update or delete on them bumps
+# event_versions.version for the row's event (in the writer's own transaction)
+EVENT_VERSION_TABLES = ('events', 'event_metadata', 'schedule_items')
+
+def _event_version_triggers(table):
+    """Builds the INSERT/UPDATE/DELETE trigger statements that bump event_versions for one table."""
+    def bump(row):
+        return (f"INSERT INTO event_versions (event_id, version) VALUES ({row}.event_id, 1) "
+                f"ON CONFLICT (event_id) DO UPDATE SET version = version + 1;")
+    return {
+        f"trg_event_version_{table}_insert": f"AFTER INSERT ON {table} BEGIN\n        {bump('NEW')}\n    END",
+        f"trg_event_version_{table}_delete": f"AFTER DELETE ON {table} BEGIN\n        {bump('OLD')}\n    END",
+        # OLD and NEW differ only if a row moves between events; bumping both covers that
+        f"trg_event_version_{table}_update": (f"AFTER UPDATE ON {table} BEGIN\n        {bump('OLD')}\n"
+                                              f"        {bump('NEW')}\n    END"),
+    }
+
 def initialize_database():
     """Initializes the SQLite database and creates tables if they don't exist."""
     conn = sqlite3.connect(DATABASE_NAME)
@@ -14,7 +101,8 @@ def initialize_database():
         event_name TEXT NOT NULL,
         event_date TEXT,
         event_location TEXT,
-        has_tickets BOOLEAN DEFAULT 0
+        has_tickets BOOLEAN DEFAULT 0,
+        capacity INTEGER -- Maximum tickets for the event, NULL means unlimited
     )
     """)
 
@@ -25,6 +113,9 @@ def initialize_database():
         if 'has_tickets' not in columns:
             cursor.execute("ALTER TABLE events ADD COLUMN has_tickets BOOLEAN DEFAULT 0")
             print("Added 'has_tickets' column to 'events' table.")
+        if 'capacity' not in columns:
+            cursor.execute("ALTER TABLE events ADD COLUMN capacity INTEGER")
+            print("Added 'capacity' column to 'events' table.")
     except sqlite3.Error as e:
         print(f"Error checking/altering events table: {e}")
     # --- End column check/add ---
@@ -103,6 +194,7 @@ def initialize_database():
         contact_phone TEXT,
         status TEXT DEFAULT 'Pending', -- e.g., 'Pending', 'Contacted', 'Booked', 'Rejected'
         notes TEXT,
+        row_version INTEGER NOT NULL DEFAULT 1, -- Bumped on every update, for compare-and-swap edits
         FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
     )
     """)
@@ -117,6 +209,7 @@ def initialize_database():
         phone TEXT,
         rsvp_status TEXT DEFAULT 'Pending', -- e.g., 'Pending', 'Attending', 'Declined', 'Maybe'
         notes TEXT,
+        row_version INTEGER NOT NULL DEFAULT 1, -- Bumped on every update, for compare-and-swap edits
         FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
     )
     """)
@@ -131,8 +224,10 @@ def initialize_database():
         quantity INTEGER DEFAULT 1,
         status TEXT DEFAULT 'Required', -- e.g., 'Required', 'Sourced', 'Delivered', 'Setup', 'Returned'
         supplier TEXT,
-        cost REAL,
+        cost REAL, -- Per-item cost for display; cost_minor is authoritative
         notes TEXT,
+        cost_minor INTEGER, -- Per-item cost in integer cents
+        row_version INTEGER NOT NULL DEFAULT 1, -- Bumped on every update, for compare-and-swap edits
         FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
     )
     """)
@@ -149,6 +244,7 @@ def initialize_database():
             responsible_person TEXT,
             status TEXT DEFAULT 'Planned', -- e.g., 'Planned', 'Confirmed', 'Ongoing', 'Completed'
             notes TEXT,
+            row_version INTEGER NOT NULL DEFAULT 1, -- Bumped on every update, for compare-and-swap edits
             FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
         )
         """)
@@ -165,6 +261,30 @@ def initialize_database():
             FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
         )
     """)
+    # Rows within an event are kept in message_id order, so "messages after id N" is a range scan
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_event ON chat_messages (event_id)")
+
+    # Chat Read Cursors Table (newest message each user has seen in each event's chat)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chat_read_cursors (
+            user_id INTEGER NOT NULL,
+            event_id INTEGER NOT NULL,
+            last_read_message_id INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, event_id),
+            FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
+            FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
+        )
+    """)
+
+    # Chat Retention Policies Table (days an event's chat stays in this database after the event date;
+    # older messages are moved to the chat archive, see chat_archive.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chat_retention_policies (
+            event_id INTEGER PRIMARY KEY,
+            hot_days INTEGER NOT NULL,
+            FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
+        )
+    """)
 
     # Tickets Table
     cursor.execute("""
@@ -177,9 +297,171 @@ def initialize_database():
         user_roll_number TEXT,
         user_address TEXT,
         booking_timestamp TEXT NOT NULL,
+        idempotency_key TEXT, -- Client token so a replayed submit returns the original ticket
+        seat_row INTEGER, -- Seated events only: 0-based row of the booked block
+        seat_start INTEGER, -- Seated events only: 0-based first seat of the block
+        seat_count INTEGER, -- Seated events only: number of adjacent seats
+        FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
+    )
+    """)
+
+    # Add idempotency_key column if it doesn't exist (for backward compatibility)
+    try:
+        cursor.execute("PRAGMA table_info(tickets)")
+        columns = [column[1] for column in cursor.fetchall()]
+        if 'idempotency_key' not in columns:
+            cursor.execute("ALTER TABLE tickets ADD COLUMN idempotency_key TEXT")
+            print("Added 'idempotency_key' column to 'tickets' table.")
+        for seat_column in ('seat_row', 'seat_start', 'seat_count'):
+            if seat_column not in columns:
+                cursor.execute(f"ALTER TABLE tickets ADD COLUMN {seat_column} INTEGER")
+                print(f"Added '{seat_column}' column to 'tickets' table.")
+    except sqlite3.Error as e:
+        print(f"Error checking/altering tickets table: {e}")
+    # --- End column check/add ---
+
+    # One ticket per roll number per event, and one ticket per idempotency key within an event
+    try:
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tickets_event_roll ON tickets (event_id, user_roll_number)")
+    except sqlite3.IntegrityError as e:
+        # Existing duplicate bookings must be cleaned up before the index can be built
+        print(f"Could not create unique roll number index on 'tickets': {e}")
+    cursor.execute("DROP INDEX IF EXISTS idx_tickets_idempotency_key")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tickets_event_idempotency_key ON tickets (event_id, idempotency_key)")
+
+    # Add cost_minor column to logistics if it doesn't exist, converting existing REAL costs to cents
+    cursor.execute("PRAGMA table_info(logistics)")
+    logistics_columns = [column[1] for column in cursor.fetchall()]
+    if 'cost_minor' not in logistics_columns:
+        cursor.execute("ALTER TABLE logistics ADD COLUMN cost_minor INTEGER")
+        cursor.execute("""
+            UPDATE logistics SET cost_minor = CAST(ROUND(CAST(cost AS REAL) * 100) AS INTEGER)
+            WHERE cost IS NOT NULL AND TRIM(cost) != ''
+        """)
+        print("Added 'cost_minor' column to 'logistics' table and converted existing costs.")
+
+    # Add row_version column to the editable tables if it doesn't exist
+    for versioned_table in ('vendors', 'guests', 'logistics', 'schedule_items'):
+        cursor.execute(f"PRAGMA table_info({versioned_table})")
+        if 'row_version' not in [column[1] for column in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {versioned_table} ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1")
+            print(f"Added 'row_version' column to '{versioned_table}' table.")
+
+    # Indexes for the paged, filtered and sorted editor queries
+    for index_table, status_column, name_column in (('vendors', 'status', 'name'), ('guests', 'rsvp_status', 'name'),
+                                                    ('logistics', 'status', 'item_name'),
+                                                    ('schedule_items', 'status', 'item_name')):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{index_table}_event_status ON {index_table} (event_id, {status_column})")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{index_table}_event_name ON {index_table} (event_id, {name_column})")
+
+    # Event Budgets Table (budget limit in cents; committed and delivered totals come from event_stats)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS event_budgets (
+        event_id INTEGER PRIMARY KEY,
+        budget_minor INTEGER NOT NULL DEFAULT 0,
         FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
     )
     """)
+    # Drop the running totals older databases kept here
+    cursor.execute("PRAGMA table_info(event_budgets)")
+    budget_columns = [column[1] for column in cursor.fetchall()]
+    for legacy_column in ('committed_minor', 'delivered_minor'):
+        if legacy_column in budget_columns:
+            cursor.execute(f"ALTER TABLE event_budgets DROP COLUMN {legacy_column}")
+
+    # Seat Maps Table (optional numbered seating for an event)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS seat_maps (
+        event_id INTEGER PRIMARY KEY,
+        seat_rows INTEGER NOT NULL CHECK(seat_rows > 0),
+        seats_per_row INTEGER NOT NULL CHECK(seats_per_row > 0),
+        FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
+    )
+    """)
+
+    # Waitlist Table (queued demand for sold-out ticketed events)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS waitlist (
+        waitlist_id INTEGER PRIMARY KEY AUTOINCREMENT, -- Increasing id doubles as FIFO order
+        event_id INTEGER NOT NULL,
+        waitlist_code TEXT NOT NULL UNIQUE,
+        user_name TEXT NOT NULL,
+        user_class TEXT,
+        user_roll_number TEXT,
+        user_address TEXT,
+        joined_timestamp TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'Waiting', -- 'Waiting', 'Promoted', 'Skipped'
+        ticket_code TEXT, -- Set when the entry is promoted to a ticket
+        FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_waitlist_event_status ON waitlist (event_id, status, waitlist_id)")
+    # One waiting place per roll number per event; promoted or skipped entries don't block a rejoin
+    cursor.execute("DROP INDEX IF EXISTS idx_waitlist_event_roll")
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_waitlist_event_roll_waiting
+        ON waitlist (event_id, user_roll_number) WHERE status = 'Waiting'
+    """)
+
+    # Event Stats Rollup Table (one row per event, kept exact by triggers)
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='event_stats'")
+    stats_needs_rebuild = cursor.fetchone() is None
+    cursor.execute("CREATE TABLE IF NOT EXISTS event_stats (event_id INTEGER PRIMARY KEY)")
+    cursor.execute("PRAGMA table_info(event_stats)")
+    existing_stats_columns = {column[1] for column in cursor.fetchall()} - {'event_id'}
+    stats_column_names = {name for columns in EVENT_STATS_COLUMNS.values() for name, _ in columns}
+    if existing_stats_columns - stats_column_names:
+        # A rollup column was renamed or removed; the table is derived data, so start over
+        cursor.execute("DROP TABLE event_stats")
+        cursor.execute("CREATE TABLE event_stats (event_id INTEGER PRIMARY KEY)")
+        existing_stats_columns = set()
+    for columns in EVENT_STATS_COLUMNS.values():
+        for name, expr in columns:
+            if name not in existing_stats_columns:
+                cursor.execute(f"ALTER TABLE event_stats ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0")
+                stats_needs_rebuild = True
+
+    # Triggers are recreated on every start so definition changes take effect
+    for table, columns in EVENT_STATS_COLUMNS.items():
+        for trigger_name, body in _event_stats_triggers(table, columns).items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+            cursor.execute(f"CREATE TRIGGER {trigger_name} {body}")
+    cursor.execute("DROP TRIGGER IF EXISTS trg_event_stats_events_delete")
+    cursor.execute("CREATE TRIGGER trg_event_stats_events_delete AFTER DELETE ON events BEGIN "
+                   "DELETE FROM event_stats WHERE event_id = OLD.event_id; END")
+
+    if stats_needs_rebuild:
+        rebuild_event_stats(cursor)
+        print("Rebuilt 'event_stats' rollup table.")
+
+    # Event Metadata Table (key/value pairs such as the event's college)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS event_metadata (
+        metadata_id INTEGER PRIMARY KEY,
+        event_id INTEGER NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT,
+        FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE,
+        UNIQUE (event_id, key)
+    )
+    """)
+
+    # Event Versions Table (per-event change counter used to validate cached snapshots).
+    # A deleted event keeps its row so a cached snapshot of it is never mistaken for current.
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS event_versions (
+        event_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    for table in EVENT_VERSION_TABLES:
+        for trigger_name, body in _event_version_triggers(table).items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+            cursor.execute(f"CREATE TRIGGER {trigger_name} {body}")
+    # Snapshots no longer hold vendor, guest or logistics rows, so writes there don't bump the version
+    for table in ('vendors', 'guests', 'logistics'):
+        for trigger_name in _event_version_triggers(table):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
 
     # Add Ticket Management to predefined tasks if it doesn't exist
     cursor.execute("INSERT OR IGNORE INTO tasks (task_name, description) VALUES (?, ?)",
@@ -0,0 +1,111 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+import backend as be
+
+# Constants
+SNAPSHOT_CACHE_SIZE = 16  # Events whose snapshots are kept in memory (per process, shared by sessions)
+
+# Snapshot attribute -> (table, ORDER BY, COLUMN_PROFILES name) for the per-event tables. Each is
+# stored in the narrowest projection its readers need: the schedule's only reader is the schedule
+# editor ('grid'); the Reports page reads its own 'report' projection. Vendors, guests and
+# logistics are left out: their pages read them a page at a time.
+SNAPSHOT_TABLES = {
+    'schedule': ('schedule_items', 'start_time, item_name', 'grid'),
+}
+
+class EventSnapshot:
+    """
+    What every event page reads about one event: the event itself (with its college)
+    and the rows of its schedule, as the schedule editor shows them.
+
+    Both parts are read in one transaction and stamped with the event's version from
+    event_versions, which triggers bump on every write to those tables. Snapshots are
+    shared between sessions and must not be modified.
+    """
+
+    def __init__(self, event, version, schedule):
+        self.event = event
+        self.version = version
+        self.schedule = schedule
+
+    @property
+    def event_id(self):
+        return self.event['event_id']
+
+    @property
+    def college(self):
+        return self.event.get('college')
+
+_snapshot_lock = threading.Lock()
+_snapshots = OrderedDict()  # event_id -> EventSnapshot, least recently used first
+
+def _read_version(cursor, event_id):
+    cursor.execute("SELECT version FROM event_versions WHERE event_id = ?", (event_id,))
+    row = cursor.fetchone()
+    return row['version'] if row else 0
+
+def _load_snapshot(cursor, event_id, version):
+    """Reads an event's snapshot on the caller's transaction. Returns None if the event does not exist."""
+    cursor.execute("""
+        SELECT e.event_id, e.event_name, e.event_date, e.event_location, e.has_tickets, m.value AS college
+        FROM events e
+        LEFT JOIN event_metadata m ON m.event_id = e.event_id AND m.key = 'college'
+        WHERE e.event_id = ?
+    """, (event_id,))
+    event = cursor.fetchone()
+    if not event:
+        return None
+    tables = {}
+    for name, (table, order_by, profile) in SNAPSHOT_TABLES.items():
+        columns = be._projection(table, profile=profile)
+        cursor.execute(f"SELECT {columns} FROM {table} WHERE event_id = ? ORDER BY {order_by}", (event_id,))
+        tables[name] = [dict(row) for row in cursor.fetchall()]
+    return EventSnapshot(dict(event), version, **tables)
+
+def get_event_snapshot(event_id):
+    """
+    Returns the snapshot of an event, reusing the cached one while the event's version is unchanged.
+
+    Both the version check and (on a miss) the full load run in a single connection and
+    read transaction, so a hit costs one indexed lookup.
+
+    Returns:
+        EventSnapshot or None if the event does not exist or could not be read
+    """
+    conn = be.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        conn.execute("BEGIN")  # Version and rows come from the same database state
+        version = _read_version(cursor, event_id)
+        with _snapshot_lock:
+            cached = _snapshots.get(event_id)
+            if cached is not None and cached.version == version:
+                _snapshots.move_to_end(event_id)
+                conn.rollback()
+                return cached
+        snapshot = _load_snapshot(cursor, event_id, version)
+        conn.rollback()  # Read-only; nothing to commit
+    except sqlite3.Error as e:
+        print(f"Error loading event snapshot: {e}")
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+
+    if snapshot is None:
+        return None
+    with _snapshot_lock:
+        current = _snapshots.get(event_id)
+        # Another session may have stored a newer snapshot while this one was loading
+        if current is None or current.version <= snapshot.version:
+            _snapshots[event_id] = snapshot
+            _snapshots.move_to_end(event_id)
+        while len(_snapshots) > SNAPSHOT_CACHE_SIZE:
+            _snapshots.popitem(last=False)
+    return snapshot
+
+def invalidate_event_snapshots():
+    """Drops every cached snapshot (e.g. after the database file was replaced)."""
+    with _snapshot_lock:
+        _snapshots.clear()
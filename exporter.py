@@ -0,0 +1,230 @@
+import argparse
+import csv
+import io
+import json
+import tempfile
+import backend as be
+
+# Parquet support is optional; CSV and JSON Lines work without pyarrow
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Constants
+EXPORT_CHUNK_SIZE = 5000  # Rows fetched from SQLite (and held in memory) at a time
+
+# Dataset name -> source table (used for Parquet column types)
+EXPORT_TABLES = {'tickets': 'tickets', 'guests': 'guests', 'logistics': 'logistics',
+                 'vendors': 'vendors', 'schedule': 'schedule_items'}
+
+# Dataset name -> query returning that dataset for one event (parameter: event_id).
+# The editable tables export their backend.COLUMN_PROFILES 'export' columns; tickets have no profile.
+EXPORT_QUERIES = {
+    'tickets': """
+        SELECT ticket_id, ticket_code, user_name, user_class, user_roll_number, user_address,
+               booking_timestamp, seat_row, seat_start, seat_count
+        FROM tickets WHERE event_id = ? ORDER BY ticket_id
+    """,
+    **{dataset: f"SELECT {be._projection(table, profile='export')} FROM {table} "
+                f"WHERE event_id = ? ORDER BY {be.EDITABLE_TABLES[table]['id']}"
+       for dataset, table in EXPORT_TABLES.items() if table in be.COLUMN_PROFILES},
+}
+
+# Columns holding integer cents are exported as exact decimal amounts, named without the suffix
+# (logistics cost_minor -> cost), so exports never carry float rounding errors
+MINOR_UNITS_SUFFIX = '_minor'
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'jsonl': ('application/x-ndjson', '.jsonl'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+}
+
+def iter_export_chunks(dataset, event_id, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Streams a dataset for an event from SQLite in bounded chunks.
+
+    Yields:
+        tuple: (column names, list of row tuples) with at most `chunk_size` rows
+    """
+    if dataset not in EXPORT_QUERIES:
+        raise ValueError(f"Unknown dataset '{dataset}'. Choose from: {', '.join(EXPORT_QUERIES)}")
+    conn = be.get_db_connection()
+    conn.row_factory = None  # Plain tuples; no need for sqlite3.Row per exported row
+    try:
+        cursor = conn.cursor()
+        cursor.execute(EXPORT_QUERIES[dataset], (event_id,))
+        columns = [description[0] for description in cursor.description]
+        money = _money_indexes(columns)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            if money:
+                rows = [tuple(be.to_decimal_amount(value) if i in money else value for i, value in enumerate(row))
+                        for row in rows]
+            yield _export_names(columns), rows
+    finally:
+        conn.close()
+
+def _money_indexes(columns):
+    """Positions of the integer-cents columns in a query's column list."""
+    return {i for i, column in enumerate(columns) if column.endswith(MINOR_UNITS_SUFFIX)}
+
+def _export_names(columns):
+    """Column names as exported (cents columns lose their suffix)."""
+    return [column[:-len(MINOR_UNITS_SUFFIX)] if column.endswith(MINOR_UNITS_SUFFIX) else column
+            for column in columns]
+
+def _columns_for(dataset):
+    """Column names of a dataset's query (before _export_names), for headers/schemas of empty exports."""
+    conn = be.get_db_connection()
+    try:
+        cursor = conn.execute(f"SELECT * FROM ({EXPORT_QUERIES[dataset]}) LIMIT 0", (None,))
+        return [description[0] for description in cursor.description]
+    finally:
+        conn.close()
+
+def write_csv(dataset, event_id, out, chunk_size=EXPORT_CHUNK_SIZE):
+    """Writes a dataset as CSV to a text stream. Returns the number of rows written."""
+    writer = csv.writer(out)
+    written = 0
+    for columns, rows in iter_export_chunks(dataset, event_id, chunk_size):
+        if written == 0:
+            writer.writerow(columns)
+        writer.writerows(rows)
+        written += len(rows)
+    if written == 0:
+        writer.writerow(_export_names(_columns_for(dataset)))
+    return written
+
+def write_jsonl(dataset, event_id, out, chunk_size=EXPORT_CHUNK_SIZE):
+    """Writes a dataset as JSON Lines (one object per row) to a text stream. Returns the number of rows written."""
+    written = 0
+    for columns, rows in iter_export_chunks(dataset, event_id, chunk_size):
+        # Decimal amounts are written as strings ("12.50") so they stay exact
+        out.write("".join(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + "\n" for row in rows))
+        written += len(rows)
+    return written
+
+def _parquet_schema(dataset, columns):
+    """
+    Parquet schema from the declared SQLite column types (INTEGER -> int64, REAL -> float64,
+    anything else -> string), so every chunk is written with the same schema. Cents columns
+    become decimal128 amounts with two places.
+    """
+    conn = be.get_db_connection()
+    try:
+        declared = {row['name']: (row['type'] or '').upper()
+                    for row in conn.execute(f"PRAGMA table_info({EXPORT_TABLES[dataset]})")}
+    finally:
+        conn.close()
+    type_map = {'INTEGER': pa.int64(), 'REAL': pa.float64()}
+    money = _money_indexes(columns)
+    return pa.schema([(export_name, pa.decimal128(18, 2) if i in money else type_map.get(declared.get(name), pa.string()))
+                      for i, (name, export_name) in enumerate(zip(columns, _export_names(columns)))])
+
+def _parquet_value(value, arrow_type):
+    """Coerces a SQLite value to the column's Parquet type; values that do not convert become null."""
+    if value is None or pa.types.is_decimal(arrow_type):
+        return value
+    try:
+        if arrow_type == pa.int64():
+            return int(value)
+        if arrow_type == pa.float64():
+            return float(value)
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+def write_parquet(dataset, event_id, out, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Writes a dataset as Parquet to a binary stream, one row group per chunk.
+    Requires pyarrow. Returns the number of rows written.
+    """
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("Parquet export requires the 'pyarrow' package")
+    schema = _parquet_schema(dataset, _columns_for(dataset))
+    written = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        for _, rows in iter_export_chunks(dataset, event_id, chunk_size):
+            arrays = [pa.array([_parquet_value(row[i], field.type) for row in rows], type=field.type)
+                      for i, field in enumerate(schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            written += len(rows)
+    return written
+
+def export_dataset(dataset, event_id, fmt, out, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Streams a dataset to a binary stream in the chosen format.
+
+    Args:
+        dataset (str): One of EXPORT_QUERIES
+        event_id (int): The event to export
+        fmt (str): 'csv', 'jsonl' or 'parquet'
+        out: A binary file-like object opened for writing
+
+    Returns:
+        int: Number of rows written
+    """
+    if fmt == 'parquet':
+        return write_parquet(dataset, event_id, out, chunk_size)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Choose from: {', '.join(EXPORT_FORMATS)}")
+    text_out = io.TextIOWrapper(out, encoding='utf-8', newline='')
+    try:
+        if fmt == 'csv':
+            return write_csv(dataset, event_id, text_out, chunk_size)
+        return write_jsonl(dataset, event_id, text_out, chunk_size)
+    finally:
+        text_out.flush()
+        text_out.detach()  # Leave `out` open for the caller
+
+def export_to_tempfile(dataset, event_id, fmt):
+    """
+    Exports a dataset to a temporary file (spilled to disk, not kept in memory).
+    Returns the file rewound to the start; it is deleted when closed.
+    """
+    temp_file = tempfile.TemporaryFile()
+    export_dataset(dataset, event_id, fmt, temp_file)
+    temp_file.seek(0)
+    return temp_file
+
+def export_to_bytes(dataset, event_id, fmt):
+    """
+    Exports a dataset for a download button. The rows still stream through a temporary
+    file, but the finished export is returned in memory (Streamlit holds it while serving
+    the download), so memory grows with the export size. Use the CLI for very large exports.
+    """
+    with export_to_tempfile(dataset, event_id, fmt) as temp_file:
+        return temp_file.read()
+
+def available_formats():
+    """Formats that can be exported in this environment."""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or PARQUET_AVAILABLE]
+
+def main(argv=None):
+    """Command line entry point: python exporter.py tickets 3 --format csv -o tickets.csv"""
+    parser = argparse.ArgumentParser(description="Export event data to CSV, JSON Lines or Parquet.")
+    parser.add_argument('dataset', choices=list(EXPORT_QUERIES))
+    parser.add_argument('event_id', type=int)
+    parser.add_argument('-f', '--format', dest='fmt', choices=list(EXPORT_FORMATS), default='csv')
+    parser.add_argument('-o', '--output', help="Output file (default: <dataset>_<event_id><extension>)")
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+    parser.add_argument('--database', default=be.DATABASE_NAME, help="SQLite database file")
+    args = parser.parse_args(argv)
+
+    be.DATABASE_NAME = args.database
+    output = args.output or f"{args.dataset}_{args.event_id}{EXPORT_FORMATS[args.fmt][1]}"
+    try:
+        with open(output, 'wb') as out:
+            written = export_dataset(args.dataset, args.event_id, args.fmt, out, args.chunk_size)
+    except RuntimeError as e:
+        parser.error(str(e))
+    print(f"Exported {written} {args.dataset} rows to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ import time as time_module  # Import time module with a different name
 from datetime import time  # Import time class from datetime
 import re
 import html
+import uuid
+import hashlib
 
 # Import backend functions
 import backend as be
@@ -13,315 +15,36 @@ from database import initialize_database
 # Import our new security modules
 import security as sec
 import data_access as da
+import event_snapshot as es
 import ui_components as ui
+import booking_queue as bq
+import chat_writer as cw
+import presence as pr
+import chat_archive as ca
+import exporter
+
+_script_started = time_module.perf_counter()  # Developer Mode run timing
 
 # --- Database Initialization ---
-# Ensure the database and tables are created when the app starts
-initialize_database()
+# Ensure the database and tables are created when the app starts.
+# Cached as a resource so it runs once per server process, not on every rerun.
+@st.cache_resource(show_spinner=False)
+def initialize_database_once():
+    initialize_database()
+    return True
+
+initialize_database_once()
+
+# One background thread per server process moves old chat into the archive database
+@st.cache_resource(show_spinner=False)
+def start_chat_archiver_once():
+    return ca.start_archiver()
+
+start_chat_archiver_once()
 
 # --- Page Configuration ---
 st.set_page_config(page_icon="📅",page_title="EventEase", layout="wide")
 
-# --- Custom CSS ---
-# Add Content-Security-Policy to prevent XSS attacks
-custom_css = """
-<style>
-    /* Apply purple-navy-blue gradient to the app */
-    .stApp {
-        background-image: linear-gradient(111.6deg, rgba(207,25,233,1) 0.3%, rgba(52,66,101,1) 51.8%, rgba(28,123,241,1) 100.2%) !important;
-        background-attachment: fixed !important;
-        background-size: cover !important;
-        background-position: center center !important;
-        min-height: 100vh !important;
-    }
-    
-    /* Animation Keyframes */
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(20px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    @keyframes slideInLeft {
-        from { opacity: 0; transform: translateX(-30px); }
-        to { opacity: 1; transform: translateX(0); }
-    }
-    
-    @keyframes pulse {
-        0% { transform: scale(1); }
-        50% { transform: scale(1.05); }
-        100% { transform: scale(1); }
-    }
-    
-    @keyframes shimmer {
-        0% { background-position: -1000px 0; }
-        100% { background-position: 1000px 0; }
-    }
-    
-    /* New animations for glow effects */
-    @keyframes textGlow {
-        0% { text-shadow: 0 0 5px rgba(255, 255, 255, 0.3), 0 0 10px rgba(255, 255, 255, 0.2); }
-        50% { text-shadow: 0 0 15px rgba(102, 204, 255, 0.8), 0 0 20px rgba(102, 204, 255, 0.5); }
-        100% { text-shadow: 0 0 5px rgba(255, 255, 255, 0.3), 0 0 10px rgba(255, 255, 255, 0.2); }
-    }
-    
-    @keyframes buttonLight {
-        0% { background-position: -100% 0; }
-        100% { background-position: 200% 0; }
-    }
-    
-    @keyframes neonPulse {
-        0% { box-shadow: 0 0 5px rgba(255, 255, 255, 0.5), 0 0 10px rgba(161, 103, 221, 0.5); }
-        50% { box-shadow: 0 0 15px rgba(161, 103, 221, 0.8), 0 0 20px rgba(161, 103, 221, 0.8); }
-        100% { box-shadow: 0 0 5px rgba(255, 255, 255, 0.5), 0 0 10px rgba(161, 103, 221, 0.5); }
-    }
-    
-    /* Apply animations to main content blocks */
-    .main .block-container {
-        animation: fadeIn 0.6s ease-out forwards;
-    }
-    
-    /* Title text animation with glow */
-    h1 {
-        animation: slideInLeft 0.5s ease-out forwards, textGlow 3s ease-in-out infinite;
-        text-shadow: 0 0 10px rgba(255, 255, 255, 0.5), 0 0 15px rgba(102, 204, 255, 0.5);
-    }
-    
-    h2, h3 {
-        animation: slideInLeft 0.5s ease-out forwards;
-        text-shadow: 0 0 5px rgba(255, 255, 255, 0.5);
-    }
-    
-    /* Add glow effect to header text */
-    .stMarkdown h1, .stMarkdown h2, .stMarkdown h3 {
-        text-shadow: 0 0 10px rgba(255, 255, 255, 0.5), 0 0 15px rgba(102, 204, 255, 0.5);
-    }
-    
-    /* Make sidebar items appear with delay */
-    [data-testid="stSidebar"] .block-container {
-        animation: fadeIn 0.4s ease-out forwards;
-    }
-    
-    /* Card animations with glow */
-    div[data-testid="stExpander"], div.stForm {
-        transition: all 0.3s ease;
-        animation: fadeIn 0.6s ease-out forwards;
-        box-shadow: 0 0 5px rgba(255, 255, 255, 0.2);
-    }
-    
-    div[data-testid="stExpander"]:hover, div.stForm:hover {
-        animation: neonPulse 2s infinite;
-    }
-    
-    /* Button animations with light effect */
-    .stButton > button, div[data-testid="stForm"] button[kind="primary"], button {
-        background-color: rgba(255, 255, 255, 0.15) !important;
-        color: white !important;
-        border: 1px solid rgba(255, 255, 255, 0.3) !important;
-        transition: all 0.3s ease !important;
-        position: relative;
-        overflow: hidden;
-        z-index: 1;
-    }
-    
-    /* Light animation behind buttons */
-    .stButton > button::before, 
-    div[data-testid="stForm"] button[kind="primary"]::before, 
-    button::before {
-        content: "";
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 200%;
-        height: 100%;
-        background: linear-gradient(to right, 
-            rgba(255, 255, 255, 0) 0%, 
-            rgba(255, 255, 255, 0.3) 50%, 
-            rgba(255, 255, 255, 0) 100%);
-        z-index: -1;
-        animation: buttonLight 3s infinite linear;
-        transform: translateX(-100%);
-    }
-    
-    /* Button hover effects */
-    .stButton > button:hover, div[data-testid="stForm"] button[kind="primary"]:hover, button:hover {
-        background-color: rgba(255, 255, 255, 0.25) !important;
-        border-color: rgba(255, 255, 255, 0.5) !important;
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(255, 255, 255, 0.3), 0 0 15px rgba(161, 103, 221, 0.8);
-        text-shadow: 0 0 5px rgba(255, 255, 255, 0.7);
-    }
-    
-    /* Button active effect */
-    .stButton > button:active, .stButton > button:focus,
-    div[data-testid="stForm"] button[kind="primary"]:active, div[data-testid="stForm"] button[kind="primary"]:focus,
-    button:active, button:focus {
-        background-color: rgba(255, 255, 255, 0.35) !important;
-        box-shadow: 0 0 0 2px rgba(255, 255, 255, 0.5), 0 0 10px rgba(161, 103, 221, 0.8) !important;
-        transform: translateY(1px);
-    }
-    
-    /* Success message animation */
-    div[data-baseweb="notification"] {
-        animation: slideInLeft 0.4s ease-out forwards, pulse 2s ease-in-out 1;
-        box-shadow: 0 0 15px rgba(102, 204, 255, 0.7);
-    }
-    
-    /* Form field focus animation */
-    input:focus, select:focus, textarea:focus, 
-    div.stTextInput>div>div>input:focus, 
-    div.stNumberInput>div>div>input:focus,
-    div.stTextArea>div>div>textarea:focus {
-        transform: translateY(-2px);
-        transition: transform 0.3s ease;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1), 0 0 10px rgba(161, 103, 221, 0.6) !important;
-    }
-    
-    /* Dataframe hover effect */
-    div[data-testid="stDataFrame"] tr:hover {
-        background-color: rgba(255, 255, 255, 0.1) !important;
-        transition: background-color 0.3s ease;
-    }
-    
-    /* Chat message animation */
-    div[data-testid="stChatMessage"] {
-        animation: fadeIn 0.5s ease-out forwards;
-    }
-    
-    /* Loading animation */
-    div[data-testid="stSpinner"] {
-        animation: pulse 1.5s infinite ease-in-out;
-        filter: drop-shadow(0 0 10px rgba(161, 103, 221, 0.8));
-    }
-    
-    /* Event card hover effects */
-    .main .block-container > div:has(div[data-testid="column"]) {
-        transition: transform 0.3s ease, box-shadow 0.3s ease;
-    }
-    
-    .main .block-container > div:has(div[data-testid="column"]):hover {
-        transform: translateY(-4px);
-        box-shadow: 0 8px 16px rgba(0, 0, 0, 0.1), 0 0 15px rgba(161, 103, 221, 0.6);
-    }
-    
-    /* Ensure the sidebar blends with the gradient */
-    section[data-testid="stSidebar"] {
-        background: transparent !important;
-    }
-    
-    /* Make all containers transparent to show the gradient */
-    .main .block-container, 
-    div[data-testid="stVerticalBlock"], 
-    div.stForm,
-    div[data-testid="stExpander"] {
-        background: transparent !important;
-    }
-    
-    /* Ensure inputs and selectors are semi-transparent to show gradient but remain readable */
-    input, select, textarea, div.stTextInput>div>div>input, div.stNumberInput>div>div>input,
-    div.stTextArea>div>div>textarea, div.stSelectbox>div[data-baseweb="select"]>div,
-    div.stMultiselect>div[data-baseweb="select"]>div, div.stDateInput>div>div>input {
-        background-color: rgba(255, 255, 255, 0.15) !important;
-        color: white !important;
-        border-color: rgba(255, 255, 255, 0.3) !important;
-        transition: all 0.3s ease; /* Added transition for smooth effects */
-    }
-    
-    /* Style dataframes and metrics to be semi-transparent */
-    div[data-testid="stDataFrame"], div[data-testid="stMetric"] {
-        background-color: rgba(0, 0, 0, 0.2) !important;
-        border-radius: 5px !important;
-        transition: all 0.3s ease; /* Added transition */
-        box-shadow: 0 0 10px rgba(0, 0, 0, 0.2);
-    }
-    
-    /* Ensure text is visible on the gradient background with glow effect */
-    .stMarkdown, h1, h2, h3, label, p, div, span {
-        color: white !important;
-        text-shadow: 0px 1px 2px rgba(0, 0, 0, 0.3);
-    }
-    
-    /* Add glow to key elements */
-    .stMarkdown strong, .stMetric label, .stMetric .css-16r8m64 {
-        text-shadow: 0 0 10px rgba(161, 103, 221, 0.8);
-        animation: textGlow 3s ease-in-out infinite;
-    }
-    
-    /* Add a pulsing effect to important notifications */
-    div.element-container:has(div[data-baseweb="notification"]) {
-        animation: pulse 2s infinite;
-    }
-    
-    /* Add shimmer effect to metrics */
-    div[data-testid="stMetric"] {
-        position: relative;
-        overflow: hidden;
-        box-shadow: 0 0 10px rgba(161, 103, 221, 0.4);
-    }
-    
-    div[data-testid="stMetric"]::after {
-        content: "";
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(to right, 
-            rgba(255, 255, 255, 0) 0%, 
-            rgba(255, 255, 255, 0.2) 50%, 
-            rgba(255, 255, 255, 0) 100%);
-        background-size: 200% 100%;
-        animation: shimmer 3s infinite;
-    }
-    
-    /* Radio button animations */
-    .stRadio > div > label:hover {
-        transform: translateX(3px);
-        transition: transform 0.2s ease;
-        text-shadow: 0 0 10px rgba(161, 103, 221, 0.8);
-    }
-    
-    /* Checkbox animations */
-    .stCheckbox > div > label:hover {
-        transform: translateX(3px);
-        transition: transform 0.2s ease;
-        text-shadow: 0 0 10px rgba(161, 103, 221, 0.8);
-    }
-    
-    /* Selectbox animations */
-    div[data-baseweb="select"] div {
-        transition: all 0.3s ease;
-    }
-    
-    div[data-baseweb="select"]:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1), 0 0 10px rgba(161, 103, 221, 0.6);
-    }
-    
-    /* Divider animation */
-    hr {
-        position: relative;
-        overflow: hidden;
-        border-color: rgba(255, 255, 255, 0.3);
-        box-shadow: 0 0 10px rgba(161, 103, 221, 0.4);
-    }
-    
-    hr::after {
-        content: "";
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(to right, 
-            rgba(255, 255, 255, 0) 0%, 
-            rgba(255, 255, 255, 0.5) 50%, 
-            rgba(255, 255, 255, 0) 100%);
-        background-size: 200% 100%;
-        animation: shimmer 3s infinite;
-    }
-</style>
-"""
-
 # --- Constants ---
 TASK_STATUS_OPTIONS = ui.TASK_STATUS_OPTIONS
 VENDOR_STATUS_OPTIONS = ui.VENDOR_STATUS_OPTIONS
@@ -329,6 +52,12 @@ GUEST_RSVP_OPTIONS = ui.GUEST_RSVP_OPTIONS
 LOGISTICS_STATUS_OPTIONS = ui.LOGISTICS_STATUS_OPTIONS
 SCHEDULE_STATUS_OPTIONS = ui.SCHEDULE_STATUS_OPTIONS
 
+# Fragments that refresh themselves without rerunning the whole script
+DASHBOARD_REFRESH_SECONDS = 60
+CHAT_REFRESH_SECONDS = 30
+BOOKING_QUEUE_POLL_SECONDS = 15  # Waiting visitors check back on their own, well within bq.WAITING_TTL
+CHAT_TRANSCRIPT_LIMIT = 500  # Most recent messages kept per chat; the transcript only renders what is in view
+
 TASK_PAGE_MAP = {
     "Vendor Management": "render_vendor_page",
     "Guest List Management": "render_guest_page",
@@ -371,10 +100,11 @@ def render_custom_task_page(event_id, user_role, assignment=None):
         st.error("Access denied: You don't have permission to view this event.")
         return
         
-    event_info = be.get_event_by_id(event_id)
-    if not event_info:
+    snapshot = es.get_event_snapshot(event_id)
+    if not snapshot:
         st.error("Selected event not found.")
         return
+    event_info = snapshot.event
     
     task_name = assignment['task_name'] if assignment else "Custom Task"
     
@@ -576,6 +306,8 @@ def render_auth_page():
 
 def logout(expired=False):
     """Logs the user out by clearing session state with security measures."""
+    if 'user_info' in st.session_state:
+        pr.leave(st.session_state['user_info']['user_id'])
     st.session_state['logged_in'] = False
     st.session_state.pop('user_info', None)
     st.session_state.pop('selected_event_id', None)
@@ -590,6 +322,12 @@ def render_dashboard():
     st.title(f"Welcome, {st.session_state['user_info']['full_name']}!")
 
     st.header("Event Overview")
+    render_dashboard_overview()
+
+@st.fragment(run_every=DASHBOARD_REFRESH_SECONDS)
+def render_dashboard_overview():
+    """Event metrics and lists. Runs as a fragment, refreshing on its own without a full rerun."""
+    run_started = time_module.perf_counter()
 
     # --- Get Event Data ---
     all_events = be.get_all_events()  # This now returns events with college info
@@ -684,6 +422,8 @@ def render_dashboard():
         else:
             st.info("No completed events yet.")
 
+    ui.render_run_timing("Dashboard overview", run_started)
+
 def render_create_event_page():
     st.title("Create New Event")
     with st.form("create_event_form"):
@@ -696,6 +436,16 @@ def render_create_event_page():
         event_college = st.text_input("College Name", value=st.session_state['college_info'].get(head_user_id, ''))
         # Add Ticketing Checkbox
         has_tickets = st.checkbox("Enable Ticketing for this Event?", key="event_ticketing_checkbox")
+        ticket_capacity = st.number_input("Ticket Capacity (0 = unlimited)", min_value=0, step=1, value=0,
+                                          key="event_ticket_capacity")
+        # Optional numbered seating (leave at 0 for general admission)
+        seat_col1, seat_col2 = st.columns(2)
+        with seat_col1:
+            seat_rows = st.number_input("Seat Rows (0 = no numbered seating)", min_value=0, step=1, value=0,
+                                        key="event_seat_rows")
+        with seat_col2:
+            seats_per_row = st.number_input("Seats per Row", min_value=0, step=1, value=0,
+                                            key="event_seats_per_row")
         submitted = st.form_submit_button("Create Event")
         if submitted:
             if not event_name:
@@ -706,8 +456,12 @@ def render_create_event_page():
                 # Pass has_tickets flag and college name to backend
                 event_date_str = event_date.isoformat()
                 # Store event college in event metadata
-                event_id = be.create_event(event_name, event_date_str, event_location, has_tickets, college=event_college)
+                event_id = be.create_event(event_name, event_date_str, event_location, has_tickets, college=event_college,
+                                           capacity=int(ticket_capacity) or None)
                 if event_id:
+                    if has_tickets and seat_rows and seats_per_row:
+                        if not be.set_seat_map(event_id, int(seat_rows), int(seats_per_row)):
+                            st.warning("Event created, but the seat map could not be saved.")
                     # Store college info in session state as well for immediate use
                     if 'event_colleges' not in st.session_state:
                         st.session_state['event_colleges'] = {}
@@ -991,11 +745,13 @@ def render_assign_task_page():
 
 def render_task_tracking_page(event_id):
     st.title(f"Task Progress Tracking")
-    event_info = be.get_event_by_id(event_id)
-    if not event_info:
+    snapshot = es.get_event_snapshot(event_id)
+    if not snapshot:
         st.error("Selected event not found.")
         return
+    event_info = snapshot.event
     st.header(f"Event: {event_info['event_name']}")
+    ui.render_presence_strip(event_id, st.session_state['user_info']['user_id'])
 
     assignments = be.get_event_assignments(event_id)
 
@@ -1008,19 +764,30 @@ def render_task_tracking_page(event_id):
     st.subheader("Current Assignment Status")
     st.dataframe(assignments_df[['full_name', 'task_name', 'status']], use_container_width=True)
 
-    # Optionally add charts or summaries
-    status_counts = assignments_df['status'].value_counts()
+    # Summary counts come from the event_stats rollup rather than the assignment list
+    stats = be.get_event_stats(event_id)
+    status_counts = pd.Series({status: stats[f"assignments_{status.lower().replace(' ', '_')}"]
+                               for status in ui.TASK_STATUS_OPTIONS})
     st.subheader("Status Summary")
-    st.bar_chart(status_counts)
+    st.bar_chart(status_counts[status_counts > 0])
 
 def render_reports_page(event_id):
     st.title("Event Reports")
-    event_info = be.get_event_by_id(event_id)
-    if not event_info:
+    snapshot = es.get_event_snapshot(event_id)
+    if not snapshot:
         st.error("Selected event not found.")
         return
+    event_info = snapshot.event
     st.header(f"Event: {event_info['event_name']}")
 
+    # Headline numbers are a single read of the event_stats rollup
+    stats = be.get_event_stats(event_id)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Guests Attending", f"{stats['guests_attending']} / {stats['guests_total']}")
+    col2.metric("Tickets Sold", stats['tickets_sold'])
+    col3.metric("Vendors Booked", f"{stats['vendors_booked']} / {stats['vendors_total']}")
+    col4.metric("Tasks Completed", f"{stats['assignments_completed']} / {stats['assignments_total']}")
+
     st.subheader("Guest RSVP Report")
     guest_report_df = be.get_guest_report(event_id)
     if not guest_report_df.empty:
@@ -1040,40 +807,51 @@ def render_reports_page(event_id):
 
     st.divider()
 
-    # --- Logistics Report ---
-    st.subheader("Logistics Cost Report") # Renamed subheader
-    logistics_items = be.get_logistics_for_event(event_id)
+    # --- Budget ---
+    st.subheader("Logistics Budget")
+    # Running totals are kept up to date by the logistics add/update/delete functions
+    budget = be.get_event_budget(event_id)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Budget", be.format_money(budget['budget_minor']))
+    col2.metric("Committed", be.format_money(budget['committed_minor']))
+    col3.metric("Delivered", be.format_money(budget['delivered_minor']))
+    col4.metric("Remaining", be.format_money(budget['remaining_minor']))
+    if budget['budget_minor'] and budget['remaining_minor'] < 0:
+        st.warning(f"Committed logistics costs exceed the budget by {be.format_money(-budget['remaining_minor'])}.")
+    with st.form(f"budget_form_{event_id}"):
+        new_budget = st.number_input("Set Budget ($)", min_value=0.0, step=100.0, format="%.2f",
+                                     value=float(budget['budget']))
+        if st.form_submit_button("Save Budget"):
+            if be.set_event_budget(event_id, new_budget):
+                st.success("Budget updated.")
+                st.rerun()
+            else:
+                st.error("Failed to update budget.")
 
-    if logistics_items:
-        logistics_df = pd.DataFrame(logistics_items)
+    st.divider()
 
-        # Convert cost and quantity columns to numeric, handling potential errors
-        logistics_df['cost'] = pd.to_numeric(logistics_df['cost'], errors='coerce').fillna(0)
-        logistics_df['quantity'] = pd.to_numeric(logistics_df['quantity'], errors='coerce').fillna(0)
+    # --- Logistics Report ---
+    st.subheader("Logistics Cost Report") # Renamed subheader
+    # Totals are aggregated in SQLite, so this section does not grow with the item list
+    logistics_status_df = be.get_logistics_report(event_id)
 
-        # Calculate total cost per item
-        logistics_df['total_cost'] = logistics_df['cost'] * logistics_df['quantity']
-        
-        # Calculate overall total cost
-        overall_total_logistics_cost = logistics_df['total_cost'].sum()
+    if not logistics_status_df.empty:
+        overall_total_logistics_cost = be.get_logistics_cost_total(event_id)
         st.metric(label="Total Logistics Cost", value=f"${overall_total_logistics_cost:,.2f}")
 
-        # Prepare data for the line chart (using item name as index)
-        # Ensure item names are unique or aggregate if necessary (simple approach assumes unique for now)
-        chart_data = logistics_df.set_index('item_name')['total_cost']
+        # Cost per category (quantity x per-item cost)
+        logistics_category_df = be.get_logistics_category_report(event_id)
+        chart_data = logistics_category_df.set_index('Category')['Total Cost']
         
         if not chart_data.empty:
             st.line_chart(chart_data)
         else:
             st.info("No cost data to display in the chart.")
 
-        # Optional: Display summary table (can be removed if not needed)
-        st.write("Logistics Item Details:")
-        st.dataframe(logistics_df[['item_name', 'quantity', 'cost', 'total_cost', 'status']], use_container_width=True)
-
-        # Remove the status bar chart
-        # status_counts = logistics_df['status'].value_counts()
-        # st.bar_chart(status_counts)
+        st.write("Cost by Category:")
+        st.dataframe(logistics_category_df, hide_index=True, use_container_width=True)
+        st.write("Cost by Status:")
+        st.dataframe(logistics_status_df, hide_index=True, use_container_width=True)
 
     else:
         st.info("No logistics items found for this event to generate a cost report.")
@@ -1083,7 +861,7 @@ def render_reports_page(event_id):
 
     # --- Schedule Report (remains unchanged) ---
     st.subheader("Schedule Report")
-    schedule = be.get_schedule_for_event(event_id)
+    schedule = be.get_schedule_for_event(event_id, profile='report')  # Read-only view; notes are never read
     
     if schedule:
         schedule_df = pd.DataFrame(schedule)
@@ -1091,6 +869,83 @@ def render_reports_page(event_id):
     else:
         st.info("No schedule items found for this event.")
 
+    st.divider()
+    st.subheader("Export Data")
+    ui.render_export_controls(event_id, list(exporter.EXPORT_QUERIES), key_prefix=f"reports_{event_id}")
+
+def render_college_analytics_page():
+    st.title("College Analytics")
+    user_id = st.session_state['user_info']['user_id']
+    user_college = st.session_state['college_info'].get(user_id)
+    if not user_college:
+        st.warning("Your account is not associated with a college. Please update your profile.")
+        return
+    st.header(f"College: {user_college}")
+
+    analytics = be.get_college_analytics(user_college)
+    events_df = analytics['events']
+    if events_df.empty:
+        st.info(f"No events found for {user_college}.")
+        return
+
+    # --- Season Totals ---
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Events", len(events_df))
+    col2.metric("Guests Attending", int(events_df['guests_attending'].sum()))
+    col3.metric("Tickets Sold", int(events_df['tickets_sold'].sum()))
+    col4.metric("Logistics Cost", f"${events_df['logistics_cost_total'].sum():,.2f}")
+
+    st.divider()
+
+    # --- Trends ---
+    st.subheader("Monthly Trends")
+    monthly_df = analytics['monthly']
+    if not monthly_df.empty:
+        st.line_chart(monthly_df[['guests_attending', 'tickets_sold']])
+        st.bar_chart(monthly_df['logistics_cost_total'])
+    ticket_sales_df = analytics['ticket_sales']
+    if not ticket_sales_df.empty:
+        st.write("Tickets booked per day:")
+        st.line_chart(ticket_sales_df.set_index('booking_date')['tickets'])
+
+    st.divider()
+
+    # --- Per-Event KPIs and Rankings ---
+    st.subheader("Event Comparison")
+    kpi_df = events_df[['event_name', 'event_date', 'guests_attending', 'attendance_rate', 'tickets_sold',
+                        'sell_through', 'task_completion', 'vendor_booking_rate', 'logistics_cost_total',
+                        'cost_per_attendee', 'rank_attendance', 'rank_tickets', 'rank_cost_per_attendee']]
+    st.dataframe(
+        kpi_df,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'event_name': "Event",
+            'event_date': st.column_config.DateColumn("Date"),
+            'guests_attending': "Attending",
+            'attendance_rate': st.column_config.ProgressColumn("Attendance Rate", min_value=0, max_value=1),
+            'tickets_sold': "Tickets Sold",
+            'sell_through': st.column_config.ProgressColumn("Sell-through", min_value=0, max_value=1),
+            'task_completion': st.column_config.ProgressColumn("Tasks Done", min_value=0, max_value=1),
+            'vendor_booking_rate': st.column_config.ProgressColumn("Vendors Booked", min_value=0, max_value=1),
+            'logistics_cost_total': st.column_config.NumberColumn("Logistics Cost", format="$%.2f"),
+            'cost_per_attendee': st.column_config.NumberColumn("Cost / Attendee", format="$%.2f"),
+            'rank_attendance': st.column_config.NumberColumn("Attendance Rank", format="%d"),
+            'rank_tickets': st.column_config.NumberColumn("Tickets Rank", format="%d"),
+            'rank_cost_per_attendee': st.column_config.NumberColumn("Cost Rank", format="%d"),
+        }
+    )
+
+    col_top, col_cost = st.columns(2)
+    with col_top:
+        st.write("Top events by attendance rate:")
+        st.dataframe(events_df.nsmallest(5, 'rank_attendance')[['event_name', 'attendance_rate']],
+                     hide_index=True, use_container_width=True)
+    with col_cost:
+        st.write("Lowest cost per attendee:")
+        st.dataframe(events_df.nsmallest(5, 'rank_cost_per_attendee')[['event_name', 'cost_per_attendee']],
+                     hide_index=True, use_container_width=True)
+
 def render_vendor_page(event_id, user_role, assignment=None):
     """Renders the Vendor Management page with enhanced security and validation."""
     # Verify access permissions
@@ -1098,10 +953,11 @@ def render_vendor_page(event_id, user_role, assignment=None):
         st.error("Access denied: You don't have permission to view this event.")
         return
         
-    event_info = be.get_event_by_id(event_id)
-    if not event_info:
+    snapshot = es.get_event_snapshot(event_id)
+    if not snapshot:
         st.error("Selected event not found.")
         return
+    event_info = snapshot.event
         
     st.title(f"Vendor Management: {event_info['event_name']}")
 
@@ -1113,7 +969,13 @@ def render_vendor_page(event_id, user_role, assignment=None):
     st.subheader("Vendor List")
     
     try:
-        vendors = be.get_vendors_for_event(event_id)
+        # Only the current page is loaded; filtering and sorting run in SQL
+        page_prefix = f"vendors_{event_id}"
+        query = ui.render_table_filter_bar(page_prefix, 'status', VENDOR_STATUS_OPTIONS,
+                                           {'vendor_id': "ID", 'name': "Name", 'service_type': "Service",
+                                            'contact_person': "Contact Person", 'status': "Status"})
+        vendor_page = be.get_table_page('vendors', event_id, profile='grid', **query)
+        vendors = vendor_page['rows']
         
         # Define display columns for consistency
         display_columns = ['vendor_id', 'name', 'service_type', 'contact_person', 
@@ -1121,14 +983,14 @@ def render_vendor_page(event_id, user_role, assignment=None):
         
         # Initialize DataFrame
         if not vendors:
-            vendors_df = pd.DataFrame(columns=display_columns)
+            vendors_df = pd.DataFrame(columns=display_columns + ['row_version'])
         else:
             vendors_df = pd.DataFrame(vendors)
             # Ensure all columns exist
             for col in display_columns:
                 if col not in vendors_df.columns:
                     vendors_df[col] = None
-            vendors_df = vendors_df[display_columns]
+            vendors_df = vendors_df[display_columns + ['row_version']]  # row_version is hidden; used to detect concurrent edits
 
         # Define column configuration
         column_config = {
@@ -1139,94 +1001,53 @@ def render_vendor_page(event_id, user_role, assignment=None):
             "contact_email": st.column_config.TextColumn("Email"),
             "contact_phone": st.column_config.TextColumn("Phone"),
             "status": st.column_config.SelectboxColumn("Status", options=VENDOR_STATUS_OPTIONS, required=True),
-            "notes": st.column_config.TextColumn("Notes", width="large")
+            "notes": st.column_config.TextColumn("Notes", width="large"),
+            "row_version": None
         }
         
+        editor_key = ui.paged_editor_key(f"vendor_editor_{event_id}_{user_role}", page_prefix, vendor_page)
+
+        def clean_vendor_rows(rows_df):
+            """Sanitizes and validates only the new/changed vendor rows."""
+            rows_df = rows_df.copy()
+            for col in ['name', 'service_type', 'contact_person', 'contact_email', 'contact_phone', 'notes']:
+                rows_df[col] = rows_df[col].map(sec.sanitize_input, na_action='ignore')
+            emails = rows_df['contact_email'].dropna()
+            invalid_emails = emails[~emails.map(sec.validate_email)]
+            if not invalid_emails.empty:
+                raise ValueError(f"Invalid email format: {invalid_emails.iloc[0]}")
+            phones = rows_df['contact_phone'].dropna()
+            invalid_phones = phones[~phones.map(sec.validate_phone)]
+            if not invalid_phones.empty:
+                raise ValueError(f"Invalid phone format: {invalid_phones.iloc[0]}")
+            return rows_df
+
         # Process vendor updates function for Member role
         def process_vendor_updates(original_df, edited_df):
             if user_role != 'Member':
                 return None
-                
-            original_ids = set(original_df['vendor_id'].dropna().tolist())
-            current_ids = set(edited_df['vendor_id'].dropna().tolist())
-            
-            # Check for deletion attempts (Members can't delete)
-            deleted_in_ui = original_ids - current_ids
-            if deleted_in_ui:
-                st.warning("Members cannot delete vendors. Deletion action ignored.")
+
+            result = ui.save_editor_changes('vendors', event_id, original_df, edited_df, 'vendor_id',
+                                            display_columns[1:], prepare=clean_vendor_rows, editor_key=editor_key)
+            if result is None:
                 return original_df  # Return original to reject changes
-            
-            # Process each row for adds/updates
-            for _, row in edited_df.iterrows():
-                vid = row['vendor_id']
-                
-                # Sanitize all string inputs
-                data = {}
-                for col in display_columns:
-                    if col == 'vendor_id':
-                        continue
-                    if pd.isna(row[col]):
-                        data[col] = None
-                    elif isinstance(row[col], str):
-                        data[col] = sec.sanitize_input(row[col])
-                    else:
-                        data[col] = row[col]
-                
-                # Validate email if present
-                if data['contact_email'] and not sec.validate_email(data['contact_email']):
-                    st.error(f"Invalid email format: {data['contact_email']}")
-                    return original_df
-                
-                # Validate phone if present
-                if data['contact_phone'] and not sec.validate_phone(data['contact_phone']):
-                    st.error(f"Invalid phone format: {data['contact_phone']}")
-                    return original_df
-                
-                try:
-                    if pd.isna(vid):  # Add new vendor
-                        be.add_vendor(
-                            event_id=event_id,
-                            name=data['name'],
-                            service_type=data['service_type'],
-                            contact_person=data['contact_person'],
-                            contact_email=data['contact_email'],
-                            contact_phone=data['contact_phone'],
-                            notes=data['notes']
-                        )
-                    else:  # Update existing vendor
-                        original_row = original_df[original_df['vendor_id'] == vid].iloc[0]
-                        edited_row_series = pd.Series(data)
-                        original_data = {col: original_row[col] for col in data.keys()}
-                        original_row_series = pd.Series(original_data)
-                        
-                        # Only update if data actually changed
-                        if not edited_row_series.equals(original_row_series):
-                            be.update_vendor(
-                                vendor_id=vid,
-                                name=data['name'],
-                                service_type=data['service_type'],
-                                contact_person=data['contact_person'],
-                                contact_email=data['contact_email'],
-                                contact_phone=data['contact_phone'],
-                                status=data['status'],
-                                notes=data['notes']
-                            )
-                except Exception as e:
-                    ui.render_error_trace(f"Error updating vendor: {e}")
-                    return original_df
-            
+            if result['ignored_deletes']:
+                st.warning("Members cannot delete vendors. Deletion action ignored.")
             st.success("Vendor details updated successfully.")
             return None  # Signal success
         
+        ui.render_editor_conflicts(editor_key)
+
         # Use the generic data editor component 
         edited_df = ui.render_data_editor(
             data_df=vendors_df,
-            editor_key=f"vendor_editor_{event_id}_{user_role}",
+            editor_key=editor_key,
             column_config=column_config,
             disabled=(user_role == 'Head'),  # Heads can only view
             on_change_function=process_vendor_updates,
             required_cols=['name']
         )
+        ui.render_page_navigation(page_prefix, vendor_page)
         
         # If changes were processed successfully, refresh the page
         if edited_df is None:  # None means successful processing
@@ -1237,33 +1058,26 @@ def render_vendor_page(event_id, user_role, assignment=None):
 
 def render_guest_page(event_id, user_role, assignment=None):
     """Renders the Guest List Management page for Heads and Members."""
-    event_info = be.get_event_by_id(event_id)
-    if not event_info:
+    snapshot = es.get_event_snapshot(event_id)
+    if not snapshot:
         st.error("Selected event not found.")
         return
+    event_info = snapshot.event
     st.title(f"Guest List Management: {event_info['event_name']}")
 
     # --- Member-Specific Section: Update Task Status ---
     if user_role == 'Member' and assignment:
-        st.subheader("Update Your Task Status")
-        current_status_index = TASK_STATUS_OPTIONS.index(assignment['status']) if assignment['status'] in TASK_STATUS_OPTIONS else 0
-        new_status = st.selectbox(
-            "Mark task as:",
-            options=TASK_STATUS_OPTIONS,
-            index=current_status_index,
-            key=f"guest_status_{assignment['assignment_id']}"
-        )
-        if st.button("Update Status", key=f"update_guest_status_{assignment['assignment_id']}"):
-            if be.update_assignment_status(assignment['assignment_id'], new_status):
-                st.success(f"Task status updated to '{new_status}'.")
-                st.rerun()
-            else:
-                st.error("Failed to update task status.")
-        st.divider()
+        ui.render_status_update(assignment, key_prefix="guest_status")
 
     # --- Display Guests (Editable for Member, View-only for Head) ---
     st.subheader("Guest List")
-    guests = be.get_guests_for_event(event_id)
+    # Only the current page is loaded; filtering and sorting run in SQL
+    page_prefix = f"guests_{event_id}"
+    query = ui.render_table_filter_bar(page_prefix, 'rsvp_status', GUEST_RSVP_OPTIONS,
+                                       {'guest_id': "ID", 'name': "Name", 'email': "Email", 'rsvp_status': "RSVP Status"})
+    guest_page = be.get_table_page('guests', event_id, profile='grid', **query)
+    guests = guest_page['rows']
+    editor_key = ui.paged_editor_key(f"guest_editor_{event_id}_{user_role}", page_prefix, guest_page)
     
     # Define display columns first so it's always available
     guest_display_columns = ['guest_id', 'name', 'email', 'phone', 'rsvp_status', 'notes']
@@ -1271,14 +1085,14 @@ def render_guest_page(event_id, user_role, assignment=None):
     # Initialize empty DataFrame if no guests yet
     if not guests:
          # Use the predefined columns for the empty DataFrame
-         guests_df = pd.DataFrame(columns=guest_display_columns)
+         guests_df = pd.DataFrame(columns=guest_display_columns + ['row_version'])
     else:
         guests_df = pd.DataFrame(guests)
         # Ensure correct order and selection of columns using the predefined list
         for col in guest_display_columns:
              if col not in guests_df.columns:
                   guests_df[col] = None
-        guests_df = guests_df[guest_display_columns]
+        guests_df = guests_df[guest_display_columns + ['row_version']]  # row_version is hidden; used to detect concurrent edits
 
     guest_column_config = {
         "guest_id": st.column_config.NumberColumn("ID", disabled=True),
@@ -1286,50 +1100,39 @@ def render_guest_page(event_id, user_role, assignment=None):
         "email": st.column_config.TextColumn("Email"),
         "phone": st.column_config.TextColumn("Phone"),
         "rsvp_status": st.column_config.SelectboxColumn("RSVP Status", options=GUEST_RSVP_OPTIONS, required=True),
-        "notes": st.column_config.TextColumn("Notes", width="large")
+        "notes": st.column_config.TextColumn("Notes", width="large"),
+        "row_version": None
     }
 
+    ui.render_editor_conflicts(editor_key)
+
     # Disable editing for Head
     edited_guest_df = st.data_editor(
         guests_df,
-        key=f"guest_editor_{event_id}_{user_role}",
+        key=editor_key,
         num_rows="dynamic", # Members can add/delete in UI
         column_config=guest_column_config,
         hide_index=True,
         use_container_width=True,
         disabled=(user_role == 'Head')
     )
+    ui.render_page_navigation(page_prefix, guest_page)
 
     # --- Process Guest Edits/Updates (Only Members) ---
     if user_role == 'Member' and not edited_guest_df.equals(guests_df):
-        original_guest_ids = set(guests_df['guest_id'].tolist())
-        current_guest_ids = set(edited_guest_df['guest_id'].dropna().tolist())
-
         try:
             if edited_guest_df['name'].isnull().any():
                 st.error("Guest Name cannot be empty.")
                 return
 
-            # Member Logic: Add/Update guests
-            for _, row in edited_guest_df.iterrows():
-                gid = row['guest_id']
-                data = {col: (None if pd.isna(row[col]) else row[col]) for col in guest_display_columns if col != 'guest_id'}
-
-                if pd.isna(gid): # Add new row
-                    print(f"Member Adding guest {data['name']}") # Debug
-                    be.add_guest(event_id, data['name'], data['email'], data['phone'], data['notes'])
-                    # Assume 'Pending' RSVP on add is sufficient
-                elif gid in original_guest_ids: # Update existing row
-                    original_row = guests_df[guests_df['guest_id'] == gid].iloc[0]
-                    edited_row_series = row.drop('guest_id')
-                    original_row_series = original_row.drop('guest_id')
-                    if not edited_row_series.equals(original_row_series):
-                        print(f"Member Updating guest {gid}") # Debug
-                        be.update_guest(gid, data['name'], data['email'], data['phone'], data['rsvp_status'], data['notes'])
-            
+            # Member Logic: Add/Update only the guests that changed, in one batch
+            result = ui.save_editor_changes('guests', event_id, guests_df, edited_guest_df, 'guest_id',
+                                            guest_display_columns[1:], editor_key=editor_key)
+            if result is None:
+                return
+
             # Prevent Member Deletes
-            deleted_in_ui = original_guest_ids - current_guest_ids
-            if deleted_in_ui:
+            if result['ignored_deletes']:
                 st.warning("Members cannot delete guests. Deletion action ignored.")
                 st.rerun()
             else:
@@ -1343,45 +1146,39 @@ def render_guest_page(event_id, user_role, assignment=None):
 
 def render_logistics_page(event_id, user_role, assignment=None):
     """Renders the Logistics Management page for Heads and Members."""
-    event_info = be.get_event_by_id(event_id)
-    if not event_info:
+    snapshot = es.get_event_snapshot(event_id)
+    if not snapshot:
         st.error("Selected event not found.")
         return
+    event_info = snapshot.event
     st.title(f"Logistics Management: {event_info['event_name']}")
 
     # --- Member-Specific Section: Update Task Status ---
     if user_role == 'Member' and assignment:
-        st.subheader("Update Your Task Status")
-        current_status_index = TASK_STATUS_OPTIONS.index(assignment['status']) if assignment['status'] in TASK_STATUS_OPTIONS else 0
-        new_status = st.selectbox(
-            "Mark task as:",
-            options=TASK_STATUS_OPTIONS,
-            index=current_status_index,
-            key=f"logistics_status_{assignment['assignment_id']}"
-        )
-        if st.button("Update Status", key=f"update_logistics_status_{assignment['assignment_id']}"):
-            if be.update_assignment_status(assignment['assignment_id'], new_status):
-                st.success(f"Task status updated to '{new_status}'.")
-                st.rerun()
-            else:
-                st.error("Failed to update task status.")
-        st.divider()
+        ui.render_status_update(assignment, key_prefix="logistics_status")
 
     # --- Display Logistics Items (Editable for Member, View-only for Head) ---
     st.subheader("Logistics List")
-    logistics = be.get_logistics_for_event(event_id)
+    # Only the current page is loaded; filtering and sorting run in SQL
+    page_prefix = f"logistics_{event_id}"
+    query = ui.render_table_filter_bar(page_prefix, 'status', LOGISTICS_STATUS_OPTIONS,
+                                       {'logistics_id': "ID", 'item_name': "Item Name", 'category': "Category",
+                                        'status': "Status", 'cost': "Cost"})
+    logistics_page = be.get_table_page('logistics', event_id, profile='grid', **query)
+    logistics = logistics_page['rows']
+    editor_key = ui.paged_editor_key(f"logistics_editor_{event_id}_{user_role}", page_prefix, logistics_page)
     
     # Initialize empty DataFrame if no logistics items yet
     logistics_display_columns = ['logistics_id', 'item_name', 'category', 'quantity', 'status', 'supplier', 'cost', 'notes']
     if not logistics:
-        logistics_df = pd.DataFrame(columns=logistics_display_columns)
+        logistics_df = pd.DataFrame(columns=logistics_display_columns + ['row_version'])
     else:
         logistics_df = pd.DataFrame(logistics)
         # Ensure correct order and selection of columns
         for col in logistics_display_columns:
              if col not in logistics_df.columns:
                   logistics_df[col] = None
-        logistics_df = logistics_df[logistics_display_columns]
+        logistics_df = logistics_df[logistics_display_columns + ['row_version']]  # row_version is hidden; used to detect concurrent edits
 
     logistics_column_config = {
         "logistics_id": st.column_config.NumberColumn("ID", disabled=True),
@@ -1391,51 +1188,40 @@ def render_logistics_page(event_id, user_role, assignment=None):
         "status": st.column_config.SelectboxColumn("Status", options=LOGISTICS_STATUS_OPTIONS, required=True),
         "supplier": st.column_config.TextColumn("Supplier/Source"),
         "cost": st.column_config.NumberColumn("Cost (Per Item)", format="$%.2f"), # Store/edit per item cost
-        "notes": st.column_config.TextColumn("Notes", width="large")
+        "notes": st.column_config.TextColumn("Notes", width="large"),
+        "row_version": None
     }
 
+    ui.render_editor_conflicts(editor_key)
+
     # Disable editing for Head
     edited_logistics_df = st.data_editor(
         logistics_df,
-        key=f"logistics_editor_{event_id}_{user_role}",
+        key=editor_key,
         num_rows="dynamic", # Members can add/delete in UI
         column_config=logistics_column_config,
         hide_index=True,
         use_container_width=True,
         disabled=(user_role == 'Head')
     )
+    ui.render_page_navigation(page_prefix, logistics_page)
 
     # --- Process Logistics Edits/Updates (Only Members) ---
     # Compare with original dataframe (which has per-item cost)
     if user_role == 'Member' and not edited_logistics_df.equals(logistics_df):
-        original_logistics_ids = set(logistics_df['logistics_id'].tolist())
-        current_logistics_ids = set(edited_logistics_df['logistics_id'].dropna().tolist())
-
         try:
             if edited_logistics_df['item_name'].isnull().any():
                 st.error("Item Name cannot be empty.")
                 return
 
-            # Member Logic: Add/Update logistics items
-            for _, row in edited_logistics_df.iterrows():
-                lid = row['logistics_id']
-                # Extract data (cost is now per-item cost)
-                data = {col: (None if pd.isna(row[col]) else row[col]) for col in logistics_display_columns if col != 'logistics_id'}
-
-                if pd.isna(lid): # Add new row
-                    print(f"Member Adding logistics item {data['item_name']}") # Debug
-                    be.add_logistics_item(event_id, data['item_name'], data['category'], data['quantity'], data['supplier'], data['cost'], data['notes'])
-                elif lid in original_logistics_ids: # Update existing row
-                    original_row = logistics_df[logistics_df['logistics_id'] == lid].iloc[0]
-                    edited_row_series = row.drop('logistics_id')
-                    original_row_series = original_row.drop('logistics_id')
-                    if not edited_row_series.equals(original_row_series):
-                        print(f"Member Updating logistics item {lid}") # Debug
-                        be.update_logistics_item(lid, data['item_name'], data['category'], data['quantity'], data['status'], data['supplier'], data['cost'], data['notes'])
+            # Member Logic: Add/Update only the items that changed, in one batch (cost is per-item cost)
+            result = ui.save_editor_changes('logistics', event_id, logistics_df, edited_logistics_df, 'logistics_id',
+                                            logistics_display_columns[1:], editor_key=editor_key)
+            if result is None:
+                return
 
             # Prevent Member Deletes
-            deleted_in_ui = original_logistics_ids - current_logistics_ids
-            if deleted_in_ui:
+            if result['ignored_deletes']:
                 st.warning("Members cannot delete logistics items. Deletion action ignored.")
                 st.rerun()
             else:
@@ -1449,45 +1235,32 @@ def render_logistics_page(event_id, user_role, assignment=None):
 
 def render_schedule_page(event_id, user_role, assignment=None):
     """Renders the Schedule Coordination page for Heads and Members."""
-    event_info = be.get_event_by_id(event_id)
-    if not event_info:
+    snapshot = es.get_event_snapshot(event_id)
+    if not snapshot:
         st.error("Selected event not found.")
         return
+    event_info = snapshot.event
     st.title(f"Schedule Coordination: {event_info['event_name']}")
 
     # --- Member-Specific Section: Update Task Status ---
     if user_role == 'Member' and assignment:
-        st.subheader("Update Your Task Status")
-        current_status_index = TASK_STATUS_OPTIONS.index(assignment['status']) if assignment['status'] in TASK_STATUS_OPTIONS else 0
-        new_status = st.selectbox(
-            "Mark task as:",
-            options=TASK_STATUS_OPTIONS,
-            index=current_status_index,
-            key=f"schedule_status_{assignment['assignment_id']}"
-        )
-        if st.button("Update Status", key=f"update_schedule_status_{assignment['assignment_id']}"):
-            if be.update_assignment_status(assignment['assignment_id'], new_status):
-                st.success(f"Task status updated to '{new_status}'.")
-                st.rerun()
-            else:
-                st.error("Failed to update task status.")
-        st.divider()
+        ui.render_status_update(assignment, key_prefix="schedule_status")
 
     # --- Display Schedule Items (Editable for Member, View-only for Head) ---
     st.subheader("Event Schedule")
-    schedule = be.get_schedule_for_event(event_id)
+    schedule = snapshot.schedule
     
     # Initialize empty DataFrame if no schedule items yet
     schedule_display_columns = ['item_id', 'item_name', 'start_time', 'end_time', 'location', 'responsible_person', 'status', 'notes']
     if not schedule:
-        schedule_df = pd.DataFrame(columns=schedule_display_columns)
+        schedule_df = pd.DataFrame(columns=schedule_display_columns + ['row_version'])
     else:
         schedule_df = pd.DataFrame(schedule)
         # Ensure DataFrame has all columns, even if some are empty in DB
         for col in schedule_display_columns:
             if col not in schedule_df.columns:
                 schedule_df[col] = None
-        schedule_df = schedule_df[schedule_display_columns]
+        schedule_df = schedule_df[schedule_display_columns + ['row_version']]  # row_version is hidden; used to detect concurrent edits
 
     schedule_column_config = {
         "item_id": st.column_config.NumberColumn("ID", disabled=True),
@@ -1497,9 +1270,12 @@ def render_schedule_page(event_id, user_role, assignment=None):
         "location": st.column_config.TextColumn("Location"),
         "responsible_person": st.column_config.TextColumn("Responsible"),
         "status": st.column_config.SelectboxColumn("Status", options=SCHEDULE_STATUS_OPTIONS, required=True),
-        "notes": st.column_config.TextColumn("Notes", width="large")
+        "notes": st.column_config.TextColumn("Notes", width="large"),
+        "row_version": None
     }
 
+    ui.render_editor_conflicts(f"schedule_editor_{event_id}_{user_role}")
+
     # Disable editing for Head
     edited_schedule_df = st.data_editor(
         schedule_df,
@@ -1513,38 +1289,24 @@ def render_schedule_page(event_id, user_role, assignment=None):
 
     # --- Process Schedule Edits/Updates (Only Members) ---
     if user_role == 'Member' and not edited_schedule_df.equals(schedule_df):
-        original_schedule_ids = set(schedule_df['item_id'].tolist())
-        current_schedule_ids = set(edited_schedule_df['item_id'].dropna().tolist())
-
         try:
             if edited_schedule_df['item_name'].isnull().any():
                 st.error("Item/Activity Name cannot be empty.")
                 return
 
-            # Member Logic: Add/Update schedule items
-            for _, row in edited_schedule_df.iterrows():
-                itemid = row['item_id']
-                # Extract data, handling potential NaNs
-                data = {col: (None if pd.isna(row[col]) else row[col]) for col in schedule_display_columns if col != 'item_id'}
-                # Ensure time strings are handled correctly (e.g., empty strings vs None)
-                data['start_time'] = data['start_time'] if data['start_time'] else None
-                data['end_time'] = data['end_time'] if data['end_time'] else None
-
-                if pd.isna(itemid): # Add new row
-                    print(f"Member Adding schedule item {data['item_name']}") # Debug
-                    be.add_schedule_item(event_id, data['item_name'], data['start_time'], data['end_time'], data['location'], data['responsible_person'], data['notes'])
-                    # Assume 'Planned' status on add is sufficient
-                elif itemid in original_schedule_ids: # Update existing row
-                    original_row = schedule_df[schedule_df['item_id'] == itemid].iloc[0]
-                    edited_row_series = pd.Series(data)
-                    original_row_series = original_row.drop('item_id')
-                    if not edited_row_series.equals(original_row_series):
-                        print(f"Member Updating schedule item {itemid}") # Debug
-                        be.update_schedule_item(itemid, data['item_name'], data['start_time'], data['end_time'], data['location'], data['responsible_person'], data['status'], data['notes'])
+            def clean_schedule_rows(rows_df):
+                # Empty time strings are stored as NULL
+                return rows_df.replace({'start_time': {'': None}, 'end_time': {'': None}})
+
+            # Member Logic: Add/Update only the schedule items that changed, in one batch
+            result = ui.save_editor_changes('schedule_items', event_id, schedule_df, edited_schedule_df, 'item_id',
+                                            schedule_display_columns[1:], prepare=clean_schedule_rows,
+                                            editor_key=f"schedule_editor_{event_id}_{user_role}")
+            if result is None:
+                return
 
             # Prevent Member Deletes
-            deleted_in_ui = original_schedule_ids - current_schedule_ids
-            if deleted_in_ui:
+            if result['ignored_deletes']:
                 st.warning("Members cannot delete schedule items. Deletion action ignored.")
                 st.rerun()
             else:
@@ -1563,10 +1325,11 @@ def render_team_chat_page(event_id, user_role, assignment=None):
         st.error("Access denied: You don't have permission to view this event.")
         return
         
-    event_info = be.get_event_by_id(event_id)
-    if not event_info:
+    snapshot = es.get_event_snapshot(event_id)
+    if not snapshot:
         st.error("Selected event not found.")
         return
+    event_info = snapshot.event
     
     st.title(f"Team Chat: {event_info['event_name']}")
     
@@ -1576,12 +1339,11 @@ def render_team_chat_page(event_id, user_role, assignment=None):
             ui.render_status_update(assignment)
         st.divider()
     
-    # Set up auto-refresh using safe meta refresh
-    # This is safer than injecting JavaScript and still provides 
-    # a way to auto-refresh the chat
-    st.markdown("""
+    # The chat panel below refreshes itself every CHAT_REFRESH_SECONDS (a fragment rerun,
+    # not a page reload); the link is a full reload for anyone who wants one
+    st.markdown(f"""
     <div style="text-align: right; margin-bottom: 10px;">
-        <small>Chat refreshes every 30 seconds. 
+        <small>Chat refreshes every {CHAT_REFRESH_SECONDS} seconds. 
         <a href="#" id="refresh-link" onclick="window.location.reload();">
             Refresh Now
         </a>
@@ -1589,9 +1351,74 @@ def render_team_chat_page(event_id, user_role, assignment=None):
     </div>
     """, unsafe_allow_html=True)
     
-    # Add a manual refresh button as well
-    if st.button("Refresh Chat", key="manual_refresh_chat"):
-        st.rerun()
+    render_chat_panel(event_id)
+    render_chat_archive(event_id, user_role)
+
+def render_chat_archive(event_id, user_role):
+    """Search of the event's archived chat, and (for Heads) its retention setting."""
+    with st.expander("Chat History (Archived)", expanded=False):
+        if user_role == 'Head':
+            hot_days = be.get_chat_retention_days(event_id)
+            with st.form(f"chat_retention_form_{event_id}"):
+                new_hot_days = st.number_input("Keep chat here for this many days after the event date, then archive it:",
+                                               min_value=0, max_value=3650, value=hot_days, step=1)
+                if st.form_submit_button("Save Retention"):
+                    if be.set_chat_retention_days(event_id, new_hot_days):
+                        st.success(f"Chat will be archived {new_hot_days} days after the event.")
+                    else:
+                        st.error("Failed to save the retention setting.")
+            metrics = ca.get_archive_metrics()
+            st.caption(f"Archived {metrics['total_archived']} messages in {metrics['total_batches']} batches since the server started "
+                       f"(compression {metrics['compression_ratio']:.1f}x, longest write {metrics['max_lock_ms']:.1f} ms)")
+
+        with st.form(f"chat_archive_search_form_{event_id}"):
+            query = st.text_input("Search archived messages:", placeholder="Leave empty to list the most recent")
+            searched = st.form_submit_button("Search Archive")
+        if searched:
+            # Messages are stored sanitized, so the query is matched in the same form
+            results = ca.search_archived_chat(event_id, sec.sanitize_input(query.strip()) or None)
+            if results:
+                archive_df = pd.DataFrame(results)
+                archive_df['message_text'] = archive_df['message_text'].map(html.unescape)  # Stored escaped
+                st.dataframe(archive_df[['timestamp', 'full_name', 'message_text']],
+                             hide_index=True, use_container_width=True)
+            else:
+                st.info("No archived messages found.")
+
+def load_chat_transcript(event_id):
+    """
+    Returns this session's chat transcript for an event as ui.chat_transcript_row dicts,
+    fetching only the messages newer than the last one it already holds.
+    """
+    state_key = f"chat_messages_{event_id}"
+    transcript = st.session_state.get(state_key)
+    if transcript is None:
+        transcript = []
+        new_messages = be.get_chat_messages(event_id, limit=CHAT_TRANSCRIPT_LIMIT)
+    else:
+        last_id = transcript[-1]['id'] if transcript else 0
+        new_messages = be.get_chat_messages(event_id, limit=CHAT_TRANSCRIPT_LIMIT, after_id=last_id)
+    if new_messages:
+        user_id = st.session_state['user_info']['user_id']
+        transcript = (transcript + [ui.chat_transcript_row(msg, user_id) for msg in new_messages])[-CHAT_TRANSCRIPT_LIMIT:]
+    st.session_state[state_key] = transcript
+    return transcript
+
+@st.fragment(run_every=CHAT_REFRESH_SECONDS)
+def render_chat_panel(event_id):
+    """
+    Chat feed and message form. Runs as a fragment: sending a message, pressing
+    "Refresh Chat" or the periodic refresh reruns only this panel.
+    """
+    run_started = time_module.perf_counter()
+
+    # The periodic refresh doesn't pass through main(), so it keeps this viewer present itself
+    user_info = st.session_state['user_info']
+    pr.heartbeat(event_id, user_info['user_id'], user_info['full_name'], user_info['role'], "Team Chat")
+    ui.render_presence_strip(event_id, user_info['user_id'])
+
+    # Pressing the button reruns the fragment, which reloads the messages
+    st.button("Refresh Chat", key="manual_refresh_chat")
     
     # Chat Interface
     chat_container = st.container()
@@ -1617,62 +1444,65 @@ def render_team_chat_page(event_id, user_role, assignment=None):
             else:
                 user_id = st.session_state['user_info']['user_id']
                 try:
-                    message_sent = be.add_chat_message(event_id, user_id, message_input)
-                    if message_sent:
-                        st.rerun()
-                    else:
+                    send_result = cw.send_chat_message(event_id, user_id, message_input)
+                    if send_result['status'] == 'rate_limited':
+                        st.warning(f"You're sending messages too quickly. Please wait {int(send_result['retry_after']) + 1}s and try again.")
+                    elif send_result['status'] != 'sent':
                         st.error("Failed to send message. Please try again.")
                 except Exception as e:
                     ui.render_error_trace(f"Error sending message: {e}")
     
-    # Display messages
+    # Display messages (one windowed component instead of an element per message)
     with chat_container:
         try:
-            messages = be.get_chat_messages(event_id, limit=100)
+            transcript = load_chat_transcript(event_id)
             
-            if len(messages) == 0:
+            if len(transcript) == 0:
                 st.info("No messages yet. Be the first to say hello!")
             else:
-                for msg in messages:
-                    is_current_user = msg['user_id'] == st.session_state['user_info']['user_id']
-                    
-                    try:
-                        # Format timestamp safely
-                        msg_time = datetime.fromisoformat(msg['timestamp']).strftime("%m/%d %I:%M %p")
-                    except:
-                        msg_time = msg.get('timestamp', 'Unknown time')
-                    
-                    # Create appropriate columns for message layout
-                    cols = st.columns([0.8, 0.2]) if is_current_user else st.columns([0.2, 0.8])
-                    
-                    with cols[1] if is_current_user else cols[0]:
-                        container = st.container(border=True)
-                        with container:
-                            # Safely display user info
-                            sender_name = sec.sanitize_input(msg.get('full_name', 'Unknown'))
-                            role_badge = "👑 " if msg.get('role') == 'Head' else ""
-                            st.caption(f"{role_badge}{sender_name} - {msg_time}")
-                            
-                            # Display the message text (already sanitized by the backend)
-                            st.write(sec.sanitize_input(msg.get('message_text', '')))
+                ui.render_chat_transcript(transcript, key=f"chat_transcript_view_{event_id}")
+                # Everything shown is now read; clears this event's badge in the sidebar
+                be.mark_chat_read(st.session_state['user_info']['user_id'], event_id, transcript[-1]['id'])
         except Exception as e:
             ui.render_error_trace(f"Error displaying chat messages: {e}")
-    
-    # Using st.empty and automatically rerun the app after a delay
-    # This is a more secure alternative to injecting JavaScript
-    if st.session_state.get('chat_last_refresh_time') is None:
-        st.session_state['chat_last_refresh_time'] = time_module.time()
-        
-    # Check if 30 seconds have passed since last refresh
-    current_time = time_module.time()
-    if current_time - st.session_state.get('chat_last_refresh_time', 0) >= 30:
-        st.session_state['chat_last_refresh_time'] = current_time
-        time_module.sleep(0.1)  # Small delay to allow UI to render
-        st.rerun()  # Trigger a page refresh
+
+    ui.render_run_timing("Chat panel", run_started)
 
 # --- Ticket Booking Page ---
+def booking_idempotency_key(event_id, form_data, seat_count):
+    """
+    Idempotency key for a booking submit, derived from the session and the form contents.
+    Submitting the same details again (a double click or replayed rerun) gives the same key,
+    so book_ticket hands back the original ticket; changing any input makes a new booking.
+    """
+    parts = [st.session_state['booking_session_salt'], event_id, form_data['name'], form_data['class'],
+             form_data['roll_no'], form_data['address'], int(seat_count)]
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+@st.fragment(run_every=BOOKING_QUEUE_POLL_SECONDS)
+def render_booking_queue_wait():
+    """
+    "Please wait" view for a visitor queued for the booking form. It polls the queue every
+    BOOKING_QUEUE_POLL_SECONDS with the same token, so a visitor who waits without clicking
+    keeps their place, and reruns the page once they are admitted.
+    """
+    admission = bq.request_admission(st.session_state.get('booking_queue_token'))
+    st.session_state['booking_queue_token'] = admission['token']
+    if admission['admitted']:
+        st.rerun()  # Show the booking form
+
+    wait_minutes = max(1, round(admission['estimated_wait'] / 60))
+    st.info(f"⏳ Booking is very busy right now. Please wait - you are about number {admission['position']} in line (roughly {wait_minutes} min).")
+    st.caption(f"This page checks your place in line every {BOOKING_QUEUE_POLL_SECONDS} seconds.")
+    st.button("Check Again", key="booking_queue_refresh")  # Reruns this fragment
+
+@st.fragment
 def render_book_tickets_page():
-    """Displays the ticket booking interface with enhanced security and validation."""
+    """
+    Displays the ticket booking interface with enhanced security and validation.
+    Runs as a fragment: choosing events and submitting the form rerun only the booking page.
+    """
+    run_started = time_module.perf_counter()
     st.header("Book Event Tickets")
     
     # Display ticket code if booking was successful
@@ -1680,13 +1510,20 @@ def render_book_tickets_page():
         st.success(f"🎉 Ticket booked successfully! Your unique ticket code is: **{st.session_state['booking_ticket_code']}**")
         st.info("Please save this code for entry.")
         st.session_state['booking_ticket_code'] = None  # Clear after displaying once
+
+    # Display waitlist code if the visitor just joined a waitlist
+    if st.session_state.get('booking_waitlist_code'):
+        st.success(f"You are on the waitlist. Your waitlist code is: **{st.session_state['booking_waitlist_code']}**")
+        st.info("Use this code below to check your position or collect your ticket code once a place opens up.")
+        st.session_state['booking_waitlist_code'] = None  # Clear after displaying once
     
-    # Get list of colleges (securely filter from database)
+    # Get colleges and their bookable events from the shared catalogue (no per-session queries)
     try:
-        colleges_data = be.get_all_college_options()
-        colleges = [college for college in colleges_data if college]  # Filter out None/empty values
+        catalogue = be.get_booking_catalogue()
+        colleges = list(catalogue.keys())
     except Exception as e:
         ui.render_error_trace(f"Error fetching colleges: {e}")
+        catalogue = {}
         colleges = []
     
     # College selection
@@ -1702,16 +1539,8 @@ def render_book_tickets_page():
             st.session_state['selected_college'] = sec.sanitize_input(selected_college)
             
             try:
-                # Fetch events for the selected college that have ticketing enabled
-                events = be.get_all_events()
-                # Filter events by college and ticketing enabled
-                if events:
-                    ticketed_events = [
-                        e for e in events 
-                        if e.get('has_tickets') and e.get('college') == selected_college
-                    ]
-                else:
-                    ticketed_events = []
+                # Ticketed upcoming events for the selected college
+                ticketed_events = catalogue.get(selected_college, [])
                     
                 if not ticketed_events:
                     st.info(f"There are currently no events available for booking tickets at {selected_college}.")
@@ -1721,94 +1550,173 @@ def render_book_tickets_page():
         
                     if selected_event_display != "---":
                         selected_event_id = event_dict[selected_event_display]
+                        selected_event = next(e for e in ticketed_events if e['event_id'] == selected_event_id)
                         st.subheader(f"Booking for: {selected_event_display}")
         
-                        with st.form("ticket_booking_form", clear_on_submit=True):
-                            st.write("Please provide your details:")
-                            user_name = st.text_input("Full Name", key="ticket_user_name")
-                            user_class = st.text_input("Class (e.g. F.E, S.E., etc)", key="ticket_user_class")
-                            user_roll_no = st.text_input("Roll Number / ID", key="ticket_user_roll")
-                            user_address = st.text_area("Address (Optional)", key="ticket_user_address")
+                        # Admit sessions to the booking form in arrival order
+                        admission = bq.request_admission(st.session_state.get('booking_queue_token'))
+                        st.session_state['booking_queue_token'] = admission['token']
+
+                        if not admission['admitted']:
+                            render_booking_queue_wait()
+                        else:
+                            # Per-session salt for idempotency keys (see booking_idempotency_key)
+                            if 'booking_session_salt' not in st.session_state:
+                                st.session_state['booking_session_salt'] = uuid.uuid4().hex
+
+                            with st.form("ticket_booking_form", clear_on_submit=True):
+                                st.write("Please provide your details:")
+                                user_name = st.text_input("Full Name", key="ticket_user_name")
+                                user_class = st.text_input("Class (e.g. F.E, S.E., etc)", key="ticket_user_class")
+                                user_roll_no = st.text_input("Roll Number / ID", key="ticket_user_roll")
+                                user_address = st.text_area("Address (Optional)", key="ticket_user_address")
+                                # Seated events book a block of adjacent seats on one ticket
+                                seat_count = 1
+                                if selected_event.get('seats_per_row'):
+                                    seat_count = st.number_input("Number of Seats (seated together)", min_value=1,
+                                                                 max_value=min(10, selected_event['seats_per_row']),
+                                                                 step=1, value=1, key="ticket_seat_count")
         
-                            submitted = st.form_submit_button("Confirm Booking")
+                                submitted = st.form_submit_button("Confirm Booking")
         
-                            if submitted:
-                                # Validate inputs
-                                form_data = {
-                                    "name": sec.sanitize_input(user_name),
-                                    "class": sec.sanitize_input(user_class),
-                                    "roll_no": sec.sanitize_input(user_roll_no),
-                                    "address": sec.sanitize_input(user_address)
-                                }
+                                if submitted:
+                                    # Validate inputs
+                                    form_data = {
+                                        "name": sec.sanitize_input(user_name),
+                                        "class": sec.sanitize_input(user_class),
+                                        "roll_no": sec.sanitize_input(user_roll_no),
+                                        "address": sec.sanitize_input(user_address)
+                                    }
                                 
-                                # Check required fields
-                                is_valid, error_msg = da.validate_form_input(
-                                    form_data, 
-                                    required_fields=["name", "class", "roll_no"]
-                                )
+                                    # Check required fields
+                                    is_valid, error_msg = da.validate_form_input(
+                                        form_data, 
+                                        required_fields=["name", "class", "roll_no"]
+                                    )
                                 
-                                if not is_valid:
-                                    st.warning(error_msg)
-                                else:
-                                    try:
-                                        # Extra validation for roll number
-                                        if not re.match(r'^[a-zA-Z0-9_\-/]+$', form_data["roll_no"]):
-                                            st.error("Roll Number contains invalid characters.")
-                                        else:
-                                            # Call backend function to book ticket
-                                            ticket_code = be.book_ticket(
-                                                selected_event_id,
-                                                form_data["name"],
-                                                form_data["class"],
-                                                form_data["roll_no"],
-                                                form_data["address"]
-                                            )
-                                            
-                                            if ticket_code:
-                                                st.session_state['booking_ticket_code'] = ticket_code
-                                                st.rerun()  # Rerun to display the success message and code
+                                    if not is_valid:
+                                        st.warning(error_msg)
+                                    else:
+                                        try:
+                                            # Extra validation for roll number
+                                            if not re.match(r'^[a-zA-Z0-9_\-/]+$', form_data["roll_no"]):
+                                                st.error("Roll Number contains invalid characters.")
                                             else:
-                                                st.error("Failed to book ticket. Please try again later.")
-                                    except Exception as e:
-                                        ui.render_error_trace(f"Error booking ticket: {e}")
+                                                # Call backend function to book ticket
+                                                booked, result = be.book_ticket(
+                                                    selected_event_id,
+                                                    form_data["name"],
+                                                    form_data["class"],
+                                                    form_data["roll_no"],
+                                                    form_data["address"],
+                                                    idempotency_key=booking_idempotency_key(selected_event_id, form_data, seat_count),
+                                                    seat_count=int(seat_count)
+                                                )
+                                            
+                                                if booked:
+                                                    st.session_state['booking_ticket_code'] = result
+                                                    # Hand the booking slot to the next session in line
+                                                    bq.release_admission(st.session_state.pop('booking_queue_token', None))
+                                                    st.rerun(scope="fragment")  # Rerun to display the success message and code
+                                                elif ((be.get_event_availability(selected_event_id) or {}).get('remaining') == 0
+                                                      and not be.is_roll_number_booked(selected_event_id, form_data["roll_no"])):
+                                                    # Sold out - keep the details so the visitor can join the waitlist
+                                                    st.session_state['waitlist_offer'] = {'event_id': selected_event_id, **form_data}
+                                                else:
+                                                    st.error(result)
+                                        except Exception as e:
+                                            ui.render_error_trace(f"Error booking ticket: {e}")
+
+                            # Sold-out events offer a place on the waitlist instead
+                            waitlist_offer = st.session_state.get('waitlist_offer')
+                            if waitlist_offer and waitlist_offer['event_id'] == selected_event_id:
+                                st.warning("This event is sold out. You can join the waitlist and will receive a ticket automatically if a place opens up.")
+                                if st.button("Join Waitlist", key="join_waitlist_button"):
+                                    waitlist_code = be.join_waitlist(
+                                        selected_event_id,
+                                        waitlist_offer["name"],
+                                        waitlist_offer["class"],
+                                        waitlist_offer["roll_no"],
+                                        waitlist_offer["address"]
+                                    )
+                                    st.session_state.pop('waitlist_offer', None)
+                                    if waitlist_code:
+                                        st.session_state['booking_waitlist_code'] = waitlist_code
+                                        bq.release_admission(st.session_state.pop('booking_queue_token', None))
+                                        st.rerun(scope="fragment")
+                                    else:
+                                        st.error("Could not join the waitlist. This Roll Number may already be on it, or a place has just opened up - please try booking again.")
             except Exception as e:
                 ui.render_error_trace(f"Error loading events: {e}")
         else:
             st.info("Please select your college to view available events.")
     else:
         st.info("No colleges with events available for booking currently.")
+
+    # Waitlist status lookup
+    with st.expander("Check Waitlist Status"):
+        waitlist_code_input = st.text_input("Waitlist Code", key="waitlist_code_lookup")
+        if st.button("Check Status", key="check_waitlist_status"):
+            waitlist_status = be.get_waitlist_status(sec.sanitize_input(waitlist_code_input.strip()))
+            if not waitlist_status:
+                st.error("Waitlist code not found.")
+            elif waitlist_status['status'] == 'Waiting':
+                st.info(f"You are number {waitlist_status['position']} on the waitlist.")
+            elif waitlist_status['status'] == 'Promoted':
+                st.success(f"🎉 A place opened up! Your ticket code is: **{waitlist_status['ticket_code']}**")
+            else:
+                st.warning("This waitlist entry was closed because the Roll Number already holds a ticket.")
                             
     if st.button("Back to Login"):
         st.session_state['auth_view'] = 'login'
         st.session_state['booking_ticket_code'] = None  # Clear ticket code
+        st.session_state.pop('waitlist_offer', None)
+        bq.release_admission(st.session_state.pop('booking_queue_token', None))  # Give up any queue place
         st.session_state['selected_college'] = None  # Clear selected college
-        st.rerun()
+        st.rerun()  # Whole app, to show the login page
+
+    ui.render_run_timing("Booking page", run_started)
         
 # --- Ticket Management Page (for Assigned Members) ---
 def render_ticket_management_page(event_id, user_role, assignment=None):
     """Displays booked tickets for the event - for assigned members."""
-    event_info = be.get_event_by_id(event_id)
-    if not event_info:
+    snapshot = es.get_event_snapshot(event_id)
+    if not snapshot:
         st.error("Selected event not found.")
         return
+    event_info = snapshot.event
     st.title(f"Ticket Management: {event_info['event_name']}")
 
     # Add member task status update section if needed
     if user_role == 'Member' and assignment:
-        st.subheader("Update Your Task Status")
-        current_status_index = TASK_STATUS_OPTIONS.index(assignment['status']) if assignment['status'] in TASK_STATUS_OPTIONS else 0
-        new_status = st.selectbox(
-            "Mark task as:",
-            options=TASK_STATUS_OPTIONS,
-            index=current_status_index,
-            key=f"ticket_status_{assignment['assignment_id']}"
-        )
-        if st.button("Update Status", key=f"update_ticket_status_{assignment['assignment_id']}"):
-            if be.update_assignment_status(assignment['assignment_id'], new_status):
-                st.success(f"Task status updated to '{new_status}'.")
-                st.rerun()
-            else:
-                st.error("Failed to update task status.")
+        ui.render_status_update(assignment, key_prefix="ticket_status")
+
+    # --- Capacity ---
+    availability = be.get_event_availability(event_id)
+    if availability:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Tickets Sold", availability['tickets_sold'])
+        with col2:
+            st.metric("Remaining", "Unlimited" if availability['remaining'] is None else availability['remaining'])
+        with col3:
+            st.metric("Waitlist", availability['waitlist_length'])
+
+        seat_summary = be.get_seat_map_summary(event_id)
+        if seat_summary:
+            st.caption(f"🪑 Seating: {seat_summary['seat_rows']} rows × {seat_summary['seats_per_row']} seats | "
+                       f"{seat_summary['seats_taken']} taken, {seat_summary['seats_free']} free | "
+                       f"Largest block together: {seat_summary['largest_block']}")
+
+        with st.form(f"capacity_form_{event_id}"):
+            new_capacity = st.number_input("Ticket Capacity (0 = unlimited)", min_value=0, step=1,
+                                           value=availability['capacity'] or 0)
+            if st.form_submit_button("Update Capacity"):
+                if be.update_event_capacity(event_id, int(new_capacity) or None):
+                    st.success("Capacity updated. Waitlisted bookings were promoted into any new places.")
+                    st.rerun()
+                else:
+                    st.error("Failed to update capacity.")
         st.divider()
 
     st.subheader("Booked Tickets")
@@ -1816,10 +1724,62 @@ def render_ticket_management_page(event_id, user_role, assignment=None):
 
     if tickets:
         tickets_df = pd.DataFrame(tickets)
-        st.dataframe(tickets_df[['ticket_id', 'ticket_code', 'user_name', 'user_class', 'user_roll_number', 'booking_timestamp']], use_container_width=True)
+        ticket_columns = ['ticket_id', 'ticket_code', 'user_name', 'user_class', 'user_roll_number', 'booking_timestamp']
+        if tickets_df['seats'].notna().any():
+            ticket_columns.insert(5, 'seats')
+        st.dataframe(tickets_df[ticket_columns], use_container_width=True)
+
+        # Cancelling frees the place for the head of the waitlist
+        ticket_options = {f"{t['ticket_code']} - {t['user_name']}": t['ticket_id'] for t in tickets}
+        col_select, col_cancel = st.columns([3, 1])
+        with col_select:
+            selected_ticket = st.selectbox("Select ticket to cancel", options=list(ticket_options.keys()),
+                                           index=None, key=f"cancel_ticket_select_{event_id}")
+        with col_cancel:
+            if st.button("Cancel Ticket", key=f"cancel_ticket_{event_id}", disabled=selected_ticket is None):
+                cancelled, message = be.cancel_ticket(ticket_options[selected_ticket])
+                if cancelled:
+                    st.success(message)
+                    st.rerun()
+                else:
+                    st.error(message)
+
+        with st.expander("Export Tickets", expanded=False):
+            ui.render_export_controls(event_id, ['tickets'], key_prefix=f"tickets_{event_id}")
     else:
         st.info("No tickets have been booked for this event yet.")
 
+    st.subheader("Waitlist")
+    waitlist = be.get_waitlist_for_event(event_id)
+    if waitlist:
+        waitlist_df = pd.DataFrame(waitlist)
+        st.dataframe(waitlist_df[['position', 'waitlist_code', 'user_name', 'user_class', 'user_roll_number', 'joined_timestamp']],
+                     hide_index=True, use_container_width=True)
+    else:
+        st.info("Nobody is on the waitlist for this event.")
+
+    # Live view of the public booking queue (shared by all ticketed events)
+    with st.expander("Booking Queue Status", expanded=False):
+        queue_metrics = bq.get_queue_metrics()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Waiting", queue_metrics['queue_depth'])
+        with col2:
+            st.metric("Booking Now", f"{queue_metrics['active_sessions']} / {queue_metrics['concurrency_limit']}")
+        with col3:
+            st.metric("Avg Wait", f"{queue_metrics['avg_wait_seconds']:.0f}s")
+        st.caption(f"Admitted: {queue_metrics['total_admitted']} | Asked to wait: {queue_metrics['total_shed']} | "
+                   f"Longest wait: {queue_metrics['max_wait_seconds']:.0f}s | Expired: {queue_metrics['total_expired']}")
+
+        # Heads can tune how many visitors use the booking form at once (applies to every event)
+        if user_role == 'Head':
+            with st.form("booking_queue_limit_form"):
+                new_limit = st.number_input("Visitors allowed on the booking form at once:", min_value=1, max_value=1000,
+                                            value=queue_metrics['concurrency_limit'], step=1)
+                if st.form_submit_button("Update Limit"):
+                    bq.set_concurrency_limit(new_limit)
+                    st.success(f"Booking form limit set to {new_limit}.")
+
 # --- Profile Page --- 
 def render_profile_page():
     """Renders the user profile page with secure validation."""
@@ -1927,8 +1887,8 @@ def render_profile_page():
 # --- Main Application ---
 def main():
     """Main function to run the Streamlit app with enhanced security and organization."""
-    # Inject Custom CSS
-    st.markdown(custom_css, unsafe_allow_html=True)
+    # Link the theme stylesheet (served as a static file, cached by the browser)
+    ui.render_stylesheet()
 
     # Initialize security and session state
     sec.init_session_state()
@@ -1945,9 +1905,6 @@ def main():
         render_auth_page()
         return
 
-    # Display any task status success messages
-    ui.display_success_alert()
-
     # User is logged in - get navigation from sidebar
     user_info = st.session_state['user_info']
     nav_result = ui.render_sidebar(user_info)
@@ -1959,6 +1916,7 @@ def main():
     # Process navigation result
     if nav_result['type'] == 'main_page':
         page = nav_result['page']
+        pr.leave(user_info['user_id'])
         
         # Render the appropriate main page
         if page == "Dashboard":
@@ -1972,6 +1930,8 @@ def main():
                 render_create_member_page()
             elif page == "Assign Tasks":
                 render_assign_task_page()
+            elif page == "College Analytics":
+                render_college_analytics_page()
             else:
                 st.error(f"Unknown page: {page}")
                 render_dashboard()
@@ -1985,6 +1945,8 @@ def main():
             st.error("Access denied: You don't have permission to view this event.")
             render_dashboard()
             return
+
+        pr.heartbeat(event_id, user_info['user_id'], user_info['full_name'], user_info['role'], page)
             
         # Handle different page types based on user role
         if user_info['role'] == 'Head':
@@ -2030,4 +1992,5 @@ def main():
                     render_dashboard()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
+    ui.render_run_timing("Full script run", _script_started) 
\ No newline at end of file
@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Constants
+PRESENCE_TTL = 90  # Seconds without a heartbeat before a user stops counting as present
+
+# Lives in process memory so every Streamlit session shares it; nothing is written to the database
+_lock = threading.Lock()
+_viewers = {}  # event_id -> OrderedDict(user_id -> entry), oldest heartbeat first
+_locations = {}  # user_id -> event_id they were last seen on
+
+def _remove(event_id, user_id):
+    """Drops a user from an event. Caller holds _lock."""
+    viewers = _viewers.get(event_id)
+    if viewers is not None:
+        viewers.pop(user_id, None)
+        if not viewers:
+            del _viewers[event_id]
+
+def _expire(event_id, now):
+    """Drops an event's viewers whose last heartbeat is older than PRESENCE_TTL. Caller holds _lock."""
+    viewers = _viewers.get(event_id)
+    while viewers:
+        user_id, entry = next(iter(viewers.items()))
+        if now - entry['last_seen'] <= PRESENCE_TTL:
+            break
+        viewers.popitem(last=False)
+        if _locations.get(user_id) == event_id:
+            del _locations[user_id]
+    if viewers is not None and not viewers:
+        del _viewers[event_id]
+
+def heartbeat(event_id, user_id, full_name, role, page):
+    """
+    Records that a user is looking at a page of an event. A user is present on one
+    event at a time, so this also removes them from the event they were on before.
+    """
+    now = time.monotonic()
+    with _lock:
+        previous = _locations.get(user_id)
+        if previous is not None and previous != event_id:
+            _remove(previous, user_id)
+        _locations[user_id] = event_id
+        viewers = _viewers.setdefault(event_id, OrderedDict())
+        viewers[user_id] = {'user_id': user_id, 'full_name': full_name, 'role': role,
+                            'page': page, 'last_seen': now}
+        viewers.move_to_end(user_id)
+        _expire(event_id, now)
+
+def leave(user_id):
+    """Removes a user from whichever event they were on (e.g. after navigating away or logging out)."""
+    with _lock:
+        event_id = _locations.pop(user_id, None)
+        if event_id is not None:
+            _remove(event_id, user_id)
+
+def get_present_users(event_id):
+    """
+    Returns the users currently on an event's pages, most recently active first.
+
+    Returns:
+        list: dicts with 'user_id', 'full_name', 'role', 'page' and 'idle_seconds'
+    """
+    now = time.monotonic()
+    with _lock:
+        _expire(event_id, now)
+        entries = list(_viewers.get(event_id, {}).values())
+    present = []
+    for entry in reversed(entries):
+        user = dict(entry)
+        user['idle_seconds'] = now - user.pop('last_seen')
+        present.append(user)
+    return present
@@ -0,0 +1,114 @@
+import functools
+import pickle
+import threading
+from collections import OrderedDict
+
+# Constants
+CACHE_MAX_ENTRIES = 1024  # Cached results kept per process
+CACHE_MAX_BYTES = 32 * 1024 * 1024  # Total pickled size of cached results
+CACHE_MAX_ENTRY_BYTES = CACHE_MAX_BYTES // 8  # Larger results are returned but not cached
+
+# Shared by every session in this process. Each table has a generation counter that
+# mutators bump after writing; a cached result is keyed by the generations of the tables
+# it read, so after a write in this process the old result can no longer be found.
+_cache_lock = threading.Lock()
+_generations = {}  # table -> generation
+_entries = OrderedDict()  # key -> (pickled result, tables), least recently used first
+_cache_totals = {'bytes': 0, 'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0, 'uncached': 0}
+
+def _generations_of(tables):
+    return tuple(_generations.get(table, 0) for table in tables)
+
+def _evict():
+    """Drops least recently used entries until both bounds hold. Caller holds the lock."""
+    while _entries and (len(_entries) > CACHE_MAX_ENTRIES or _cache_totals['bytes'] > CACHE_MAX_BYTES):
+        _, (payload, _) = _entries.popitem(last=False)
+        _cache_totals['bytes'] -= len(payload)
+        _cache_totals['evictions'] += 1
+
+def bump(*tables):
+    """Marks tables as written: results read from them are dropped and will be re-read."""
+    with _cache_lock:
+        for table in tables:
+            _generations[table] = _generations.get(table, 0) + 1
+        stale = [key for key, (_, entry_tables) in _entries.items() if not entry_tables.isdisjoint(tables)]
+        for key in stale:
+            payload, _ = _entries.pop(key)
+            _cache_totals['bytes'] -= len(payload)
+        _cache_totals['invalidations'] += len(stale)
+
+def cached(*tables):
+    """
+    Decorator for read functions whose result depends only on their arguments and `tables`.
+
+    Results are stored pickled, so every hit returns a fresh copy the caller may modify.
+    None results are not cached (the backend also returns None when a query failed),
+    and calls with unhashable arguments go straight to the function.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+                hash(key)
+            except TypeError:
+                with _cache_lock:
+                    _cache_totals['uncached'] += 1
+                return func(*args, **kwargs)
+
+            with _cache_lock:
+                generations = _generations_of(tables)
+                entry = _entries.get(key + generations)
+                if entry is not None:
+                    _entries.move_to_end(key + generations)
+                    _cache_totals['hits'] += 1
+                    return pickle.loads(entry[0])
+                _cache_totals['misses'] += 1
+
+            result = func(*args, **kwargs)
+            if result is None:
+                return result
+            try:
+                payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, TypeError, AttributeError):
+                payload = None
+            with _cache_lock:
+                # Skip storing if a table was written while the function ran
+                if payload is None or len(payload) > CACHE_MAX_ENTRY_BYTES or _generations_of(tables) != generations:
+                    _cache_totals['uncached'] += 1
+                    return result
+                _entries[key + generations] = (payload, frozenset(tables))
+                _cache_totals['bytes'] += len(payload)
+                _evict()
+            return result
+
+        wrapper.cache_tables = tables
+        return wrapper
+    return decorator
+
+def invalidates(*tables):
+    """Decorator for mutators: bumps `tables` once the function returns or raises."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                bump(*tables)
+        return wrapper
+    return decorator
+
+def cache_stats():
+    """Returns hit/miss/eviction counters and the current size of the cache."""
+    with _cache_lock:
+        stats = dict(_cache_totals)
+        stats['entries'] = len(_entries)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+def clear_cache():
+    """Drops every cached result (counters are kept)."""
+    with _cache_lock:
+        _entries.clear()
+        _cache_totals['bytes'] = 0
@@ -0,0 +1,126 @@
+def _runs_of(free, length):
+    """
+    Returns a bitset with bit i set when seats i .. i+length-1 are all free.
+    Shifts are doubled each round, so this takes O(log length) big-int operations.
+    """
+    result = free
+    covered = 1
+    while covered < length and result:
+        step = min(covered, length - covered)
+        result &= result >> step
+        covered += step
+    return result
+
+def _longest_run(free):
+    """Returns the length of the longest run of set bits."""
+    longest = 0
+    while free:
+        free &= free >> 1
+        longest += 1
+    return longest
+
+def seat_label(row, start, count):
+    """Human readable seat label, e.g. 'Row 3, Seats 12-15' (row/start are 0-based)."""
+    if count == 1:
+        return f"Row {row + 1}, Seat {start + 1}"
+    return f"Row {row + 1}, Seats {start + 1}-{start + count}"
+
+class SeatMap:
+    """
+    Occupancy of a seated venue.
+
+    Each row is a Python int used as a bitset (bit set = seat taken). The longest
+    free run of every row is kept in buckets keyed by run length, so finding a row
+    that can hold N adjacent seats looks at run lengths rather than at every seat.
+    """
+
+    def __init__(self, rows, seats_per_row):
+        if rows < 1 or seats_per_row < 1:
+            raise ValueError("A seat map needs at least one row and one seat per row")
+        self.rows = rows
+        self.seats_per_row = seats_per_row
+        self._full_row = (1 << seats_per_row) - 1
+        self._taken = [0] * rows
+        self._row_run = [seats_per_row] * rows
+        self._rows_by_run = {seats_per_row: set(range(rows))}
+        self.seats_taken = 0
+
+    @property
+    def capacity(self):
+        return self.rows * self.seats_per_row
+
+    @property
+    def seats_free(self):
+        return self.capacity - self.seats_taken
+
+    @property
+    def largest_block(self):
+        """Largest number of adjacent free seats in any row."""
+        return max(self._rows_by_run) if self._rows_by_run else 0
+
+    def _reindex_row(self, row):
+        """Moves a row to the bucket of its current longest free run."""
+        old_run = self._row_run[row]
+        new_run = _longest_run(~self._taken[row] & self._full_row)
+        if new_run == old_run:
+            return
+        bucket = self._rows_by_run[old_run]
+        bucket.discard(row)
+        if not bucket:
+            del self._rows_by_run[old_run]
+        self._rows_by_run.setdefault(new_run, set()).add(row)
+        self._row_run[row] = new_run
+
+    def _block_mask(self, start, count):
+        return ((1 << count) - 1) << start
+
+    def is_free(self, row, start, count):
+        """Checks whether a block of seats is inside the venue and unoccupied."""
+        if not (0 <= row < self.rows and count >= 1 and 0 <= start and start + count <= self.seats_per_row):
+            return False
+        return not (self._taken[row] & self._block_mask(start, count))
+
+    def occupy(self, row, start, count):
+        """Marks a block of seats as taken."""
+        if not self.is_free(row, start, count):
+            raise ValueError(f"{seat_label(row, start, count)} is not available")
+        self._taken[row] |= self._block_mask(start, count)
+        self.seats_taken += count
+        self._reindex_row(row)
+
+    def release(self, row, start, count):
+        """Frees a block of seats previously taken."""
+        mask = self._block_mask(start, count)
+        if self._taken[row] & mask != mask:
+            raise ValueError(f"{seat_label(row, start, count)} is not occupied")
+        self._taken[row] &= ~mask
+        self.seats_taken -= count
+        self._reindex_row(row)
+
+    def find_block(self, count):
+        """
+        Finds `count` adjacent free seats without taking them.
+
+        Prefers the row whose longest free run fits the group most tightly (front
+        row first on ties), to keep large gaps open for larger groups.
+
+        Returns:
+            tuple or None: (row, start) of the block, or None if no row has room
+        """
+        if count < 1 or count > self.seats_per_row:
+            return None
+        for run_length in range(count, self.seats_per_row + 1):
+            rows = self._rows_by_run.get(run_length)
+            if rows:
+                row = min(rows)
+                runs = _runs_of(~self._taken[row] & self._full_row, count)
+                start = (runs & -runs).bit_length() - 1
+                return row, start
+        return None
+
+    def allocate(self, count):
+        """Finds and takes `count` adjacent seats. Returns (row, start) or None."""
+        block = self.find_block(count)
+        if block:
+            self.occupy(block[0], block[1], count)
+        return block
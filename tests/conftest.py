@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# The app's modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def scratch_db(tmp_path, monkeypatch):
+    """An empty app database in a temporary directory, with backend's in-memory state reset."""
+    monkeypatch.chdir(tmp_path)
+    import database
+    import backend as be
+    import read_cache as rc
+    database.initialize_database()
+    be._seat_maps.clear()
+    be._waitlist_index.clear()
+    rc.clear_cache()
+    return be
@@ -0,0 +1,97 @@
+import importlib
+import random
+import threading
+import time
+
+import pytest
+
+import booking_queue as bq
+
+@pytest.fixture(autouse=True)
+def fresh_queue():
+    """Each test starts with an empty queue and zeroed metrics."""
+    importlib.reload(bq)
+    yield
+
+def test_admits_in_arrival_order():
+    bq.set_concurrency_limit(2)
+    tokens = [bq.request_admission() for _ in range(5)]
+    assert [t['admitted'] for t in tokens] == [True, True, False, False, False]
+    assert [t['position'] for t in tokens[2:]] == [1, 2, 3]
+
+    bq.release_admission(tokens[0]['token'])
+    # Only the head of the line moves into the freed slot
+    polled = [bq.request_admission(t['token']) for t in tokens[2:]]
+    assert [p['admitted'] for p in polled] == [True, False, False]
+    assert all(p['token'] == t['token'] for p, t in zip(polled, tokens[2:]))
+
+def test_polling_keeps_place_past_waiting_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(bq.time, 'time', lambda: clock[0])
+    bq.set_concurrency_limit(1)
+    holder = bq.request_admission()
+    waiter = bq.request_admission()
+    assert not waiter['admitted']
+
+    # A visitor who keeps checking back (the booking page polls) is never expired
+    for _ in range(10):
+        clock[0] += bq.WAITING_TTL / 2
+        bq.request_admission(holder['token'])
+        polled = bq.request_admission(waiter['token'])
+        assert polled['token'] == waiter['token'] and polled['position'] == 1
+
+    # One who stops checking back loses their place
+    clock[0] += bq.WAITING_TTL + 1
+    bq.request_admission(holder['token'])
+    assert bq.request_admission(waiter['token'])['token'] != waiter['token']
+
+def test_rejects_invalid_concurrency_limit():
+    with pytest.raises(ValueError):
+        bq.set_concurrency_limit(0)
+
+def test_thousand_user_rush():
+    limit = 20
+    users = 1000
+    bq.set_concurrency_limit(limit)
+    booked = [False] * users
+    active = {'now': 0, 'max': 0}
+    active_lock = threading.Lock()
+    arrive = threading.Barrier(users)  # Everyone hits the page the moment booking opens
+
+    def visitor(i):
+        arrive.wait()
+        token = None
+        while True:
+            admission = bq.request_admission(token)
+            token = admission['token']
+            if admission['admitted']:
+                break
+            time.sleep(0.005)  # Waiting state: check back later instead of hitting the database
+        with active_lock:
+            active['now'] += 1
+            active['max'] = max(active['max'], active['now'])
+        time.sleep(0.002 + random.random() * 0.006)  # Fill in and submit the booking form
+        booked[i] = True
+        with active_lock:
+            active['now'] -= 1
+        bq.release_admission(token)
+
+    threads = [threading.Thread(target=visitor, args=(i,)) for i in range(users)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    metrics = bq.get_queue_metrics()
+    print(f"\n{users} visitors booked in {elapsed:.2f}s, avg wait {metrics['avg_wait_seconds'] * 1000:.1f} ms, "
+          f"max wait {metrics['max_wait_seconds'] * 1000:.1f} ms, shed {metrics['total_shed']} times")
+    assert all(booked)
+    assert active['max'] <= limit
+    assert metrics['total_joined'] == users
+    assert metrics['total_admitted'] == users
+    assert metrics['total_released'] == users
+    assert metrics['total_expired'] == 0
+    assert metrics['total_shed'] > users - limit  # The rush was queued, not let through
+    assert metrics['queue_depth'] == 0 and metrics['active_sessions'] == 0
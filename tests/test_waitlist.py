@@ -0,0 +1,22 @@
+def ticket_id_for(be, event_id, roll_number):
+    return next(t['ticket_id'] for t in be.get_tickets_for_event(event_id) if t['user_roll_number'] == roll_number)
+
+def test_rejoin_after_promotion_and_cancel(scratch_db):
+    be = scratch_db
+    event_id = be.create_event("Sold Out Show", "2030-01-01", "Hall", True, college="Test", capacity=1)
+    assert be.book_ticket(event_id, "First", "FE", "R1", "")[0]
+
+    code = be.join_waitlist(event_id, "Second", "FE", "R2", "")
+    assert code is not None
+    assert be.join_waitlist(event_id, "Second", "FE", "R2", "") is None  # Already waiting
+
+    assert be.cancel_ticket(ticket_id_for(be, event_id, "R1"))[0]
+    assert be.get_waitlist_status(code)['status'] == 'Promoted'
+
+    assert be.cancel_ticket(ticket_id_for(be, event_id, "R2"))[0]
+    assert be.book_ticket(event_id, "Third", "FE", "R3", "")[0]
+
+    # The promoted (and since cancelled) entry doesn't block a new place in line
+    rejoined = be.join_waitlist(event_id, "Second", "FE", "R2", "")
+    assert rejoined is not None and rejoined != code
+    assert be.get_waitlist_status(rejoined)['status'] == 'Waiting'
@@ -1,9 +1,18 @@
 import streamlit as st
 import pandas as pd
-from datetime import date
+import time
+import os
+import hashlib
+import html
+import streamlit.components.v1 as components
+from datetime import date, datetime
 import security as sec
 import data_access as da
 import backend as be
+import exporter
+import read_cache as rc
+import chat_writer as cw
+import presence as pr
 
 # --- Constants ---
 TASK_STATUS_OPTIONS = ['Assigned', 'In Progress', 'Completed']
@@ -11,6 +20,26 @@ VENDOR_STATUS_OPTIONS = ['Pending', 'Contacted', 'Booked', 'Rejected']
 GUEST_RSVP_OPTIONS = ['Pending', 'Attending', 'Declined', 'Maybe']
 LOGISTICS_STATUS_OPTIONS = ['Required', 'Sourced', 'Delivered', 'Setup', 'Returned']
 SCHEDULE_STATUS_OPTIONS = ['Planned', 'Confirmed', 'Ongoing', 'Completed']
+PAGE_SIZE_OPTIONS = [25, 50, 100, 250]
+CHAT_TRANSCRIPT_HEIGHT = 480  # Pixels; the transcript scrolls inside this
+
+# --- Stylesheet ---
+# The theme lives in static/eventease.css and is served by Streamlit's static file server
+# (server.enableStaticServing in .streamlit/config.toml). Pages only send a short @import;
+# the ?v= content hash lets the browser cache the file until its contents change.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STYLESHEET_FILE = os.path.join(APP_DIR, 'static', 'eventease.css')
+
+def _stylesheet_tag():
+    with open(STYLESHEET_FILE, 'rb') as css_file:
+        version = hashlib.sha256(css_file.read()).hexdigest()[:12]
+    return f'<style>@import url("app/static/eventease.css?v={version}");</style>'
+
+STYLESHEET_TAG = _stylesheet_tag()
+
+def render_stylesheet():
+    """Links the theme stylesheet into the page."""
+    st.markdown(STYLESHEET_TAG, unsafe_allow_html=True)
 
 # --- UI Components ---
 
@@ -20,6 +49,7 @@ def render_sidebar(user_info):
     st.sidebar.write(f"Welcome, {user_info['full_name']} ({user_info['role']})")
     
     if st.sidebar.button("Logout"):
+        pr.leave(user_info['user_id'])
         st.session_state['logged_in'] = False
         st.session_state.pop('user_info', None)
         st.session_state.pop('selected_event_id', None)
@@ -31,18 +61,45 @@ def render_sidebar(user_info):
         st.rerun()
         
     st.sidebar.divider()
+
+    if st.session_state.get('dev_mode'):
+        render_cache_stats()
+        render_chat_writer_stats()
     
     if user_info['role'] == 'Head':
         return render_head_sidebar(user_info)
     else:
         return render_member_sidebar(user_info)
 
+def _open_chat_event_id(event_key, page_key):
+    """Returns the event whose Team Chat page the sidebar radios currently select, if any."""
+    if st.session_state.get(page_key) != "Team Chat":
+        return None
+    label = st.session_state.get(event_key) or ""
+    event_id = label.rpartition("(ID: ")[2].rstrip(")")
+    return int(event_id) if event_id.isdigit() else None
+
+def _chat_unread_counts(user_id, event_ids, open_event_id=None):
+    """
+    Unread team chat messages per event for the sidebar badges. The chat being viewed
+    is marked read by its page after the sidebar renders, so it is reported as 0 here.
+    """
+    counts = be.get_unread_chat_counts(user_id, tuple(event_ids)) or {}
+    counts.pop(open_event_id, None)
+    return counts
+
+def _unread_badge(count):
+    """Suffix for a navigation label with `count` unread messages."""
+    if not count:
+        return ""
+    return f"  🔴 {count if count < 100 else '99+'}"
+
 def render_head_sidebar(user_info):
     """Render sidebar navigation for Head users."""
     st.sidebar.header("Management")
     
     # Main options including Profile
-    main_page_options = ["Dashboard", "Profile", "Create Event", "Create Member", "Assign Tasks", "Events"]
+    main_page_options = ["Dashboard", "Profile", "College Analytics", "Create Event", "Create Member", "Assign Tasks", "Events"]
     selected_main_page = st.sidebar.radio("Go to:", main_page_options, key="main_page_select")
     
     if selected_main_page not in ["Events", "Profile"]:
@@ -54,13 +111,13 @@ def render_head_sidebar(user_info):
         st.session_state.pop('selected_event_id', None)
         return {"type": "main_page", "page": "Profile"}
     else:  # Events selected
-        # Get all events and filter by Head's college
-        events = be.get_all_events()
+        # Events of the Head's college, from the cached navigation model
         user_id = user_info['user_id']
         user_college = st.session_state['college_info'].get(user_id)
+        navigation = be.get_navigation_model(user_id)
         
-        if user_college:
-            filtered_events = [e for e in events if e.get('college') == user_college]
+        if user_college and navigation:
+            filtered_events = navigation['events']
         else:
             filtered_events = []
             
@@ -71,10 +128,13 @@ def render_head_sidebar(user_info):
             return {"type": "main_page", "page": "Dashboard"}
         else:
             event_dict = {f"{e['event_name']} (ID: {e['event_id']})": e['event_id'] for e in filtered_events}
+            unread = _chat_unread_counts(user_id, event_dict.values(),
+                                            _open_chat_event_id("head_event_select", "event_page_select"))
             selected_event_display = st.sidebar.radio(
                 "Select Event:", 
                 options=list(event_dict.keys()), 
                 index=None, 
+                format_func=lambda label: label + _unread_badge(unread.get(event_dict[label])),
                 key="head_event_select"
             )
 
@@ -95,6 +155,7 @@ def render_head_sidebar(user_info):
                 selected_task_page = st.sidebar.radio(
                     "Select Event Page:", 
                     options=task_pages, 
+                    format_func=lambda page: page + _unread_badge(unread.get(event_id) if page == "Team Chat" else 0),
                     key="event_page_select"
                 )
                 
@@ -132,16 +193,10 @@ def render_member_sidebar(user_info):
             st.session_state.pop('selected_event_id', None)
             return {"type": "main_page", "page": "Dashboard"}
         
-        # Get user's assignments
-        assignments = be.get_user_assignments(user_id)
-        assigned_event_ids = sorted(list(set([a['event_id'] for a in assignments])))
-        
-        # Get event details and filter by member's college
-        member_events = []
-        for eid in assigned_event_ids:
-            event_details = be.get_event_by_id(eid)
-            if event_details and event_details.get('college') == member_college:
-                member_events.append(event_details)
+        # Events of the member's college they are assigned to, from the cached navigation model
+        navigation = be.get_navigation_model(user_id)
+        member_events = sorted((e for e in (navigation['events'] if navigation else []) if e['assignments']),
+                               key=lambda e: e['event_id'])
                 
         event_dict = {f"{e['event_name']} (ID: {e['event_id']})": e['event_id'] for e in member_events}
 
@@ -151,10 +206,13 @@ def render_member_sidebar(user_info):
             st.session_state.pop('selected_event_id', None)
             return {"type": "main_page", "page": "Dashboard"}
         
+        unread = _chat_unread_counts(user_id, event_dict.values(),
+                                        _open_chat_event_id("member_event_select", "nav_radio_member_task"))
         selected_event_display = st.sidebar.radio(
             "Select Event:",
             options=list(event_dict.keys()),
             index=None,
+            format_func=lambda label: label + _unread_badge(unread.get(event_dict[label])),
             key="member_event_select"
         )
 
@@ -163,7 +221,7 @@ def render_member_sidebar(user_info):
             st.session_state['selected_event_id'] = event_id
             
             # Get user's assignments for this event
-            event_assignments = [a for a in assignments if a['event_id'] == event_id]
+            event_assignments = next(e['assignments'] for e in member_events if e['event_id'] == event_id)
             task_page_options = [a['task_name'] for a in event_assignments]
             
             # Filter out Head-only pages
@@ -173,7 +231,11 @@ def render_member_sidebar(user_info):
             if "Team Chat" not in task_page_options:
                 task_page_options.append("Team Chat")
             
-            selected_task_page = st.sidebar.radio("Go to Task:", task_page_options, key="nav_radio_member_task")
+            selected_task_page = st.sidebar.radio(
+                "Go to Task:", task_page_options,
+                format_func=lambda page: page + _unread_badge(unread.get(event_id) if page == "Team Chat" else 0),
+                key="nav_radio_member_task"
+            )
             st.session_state['page'] = selected_task_page
             
             # Find the specific assignment if one exists
@@ -190,10 +252,15 @@ def render_member_sidebar(user_info):
             st.session_state.pop('selected_event_id', None)
             return {"type": "main_page", "page": "Dashboard"}
 
-def render_status_update(assignment, success_message=None):
-    """Render task status update component for members."""
+@st.fragment
+def render_status_update(assignment, success_message=None, key_prefix="status"):
+    """
+    Render task status update component for members.
+    Runs as a fragment: pressing "Update Status" reruns only this component, not the page.
+    """
     if not assignment:
         return
+    run_started = time.perf_counter()
         
     st.subheader("Update Your Task Status")
     current_status_index = TASK_STATUS_OPTIONS.index(assignment['status']) if assignment['status'] in TASK_STATUS_OPTIONS else 0
@@ -201,18 +268,16 @@ def render_status_update(assignment, success_message=None):
         "Mark task as:",
         options=TASK_STATUS_OPTIONS,
         index=current_status_index,
-        key=f"status_{assignment['assignment_id']}"
+        key=f"{key_prefix}_{assignment['assignment_id']}"
     )
     
-    if st.button("Update Status", key=f"update_status_{assignment['assignment_id']}"):
+    if st.button("Update Status", key=f"update_{key_prefix}_{assignment['assignment_id']}"):
         if be.update_assignment_status(assignment['assignment_id'], new_status):
-            task_name = assignment.get('task_name', 'Task')
-            st.success(f"Task status updated to '{new_status}'.")
-            st.session_state['task_status_success'] = f"Task '{task_name}' status updated to '{new_status}'."
-            st.rerun()
+            st.success(success_message or f"Task status updated to '{new_status}'.")
         else:
             st.error("Failed to update task status.")
-            
+
+    render_run_timing("Status update", run_started)
     st.divider()
 
 def render_data_editor(data_df, 
@@ -258,6 +323,245 @@ def render_data_editor(data_df,
     
     return None
 
+def diff_editor_rows(original_df, edited_df, id_column, columns):
+    """
+    Works out what changed between the rows given to st.data_editor and what it returned.
+    Rows are compared column-wise over the whole frame rather than one row at a time.
+
+    Returns:
+        dict: 'inserted' (new rows), 'updated' (changed existing rows, with the id column),
+              'changed' (per updated row, which columns changed), 'base' (the original values
+              of the updated rows), 'versions' (their row_version, if the frame has one)
+              and 'deleted_ids' (ids no longer present)
+    """
+    new_mask = edited_df[id_column].isna()
+    inserted = edited_df.loc[new_mask, columns]
+
+    existing = edited_df.loc[~new_mask, [id_column] + columns]
+    existing = existing.set_index(existing[id_column].astype('int64')).drop(columns=id_column)
+    original = original_df.loc[original_df[id_column].notna()]
+    original = original.set_index(original[id_column].astype('int64')).drop(columns=id_column)
+
+    common = existing.index.intersection(original.index)
+    after = existing.loc[common, columns]
+    before = original.loc[common, columns]
+    changed = ~((after == before) | (after.isna() & before.isna()))
+    changed_rows = changed.any(axis=1)
+    changed_ids = changed_rows.index[changed_rows]
+
+    versions = original.loc[changed_ids, 'row_version'] if 'row_version' in original.columns else None
+    return {
+        'inserted': inserted,
+        'updated': after.loc[changed_ids].rename_axis(id_column).reset_index(),
+        'changed': changed.loc[changed_ids],
+        'base': before.loc[changed_ids],
+        'versions': versions,
+        'deleted_ids': original.index.difference(existing.index).tolist(),
+    }
+
+def editor_records(df):
+    """Converts editor rows to plain dicts for the backend (NaN -> None, numpy -> Python types)."""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def _versioned_updates(changes, updated, id_column):
+    """
+    Builds compare-and-swap updates: each sends only its changed columns, the row_version it
+    was read at and the original ('_base') values, so the backend can merge around other edits.
+    """
+    changed_masks = changes['changed'].to_numpy()
+    base_records = editor_records(changes['base'])
+    versions = changes['versions']
+    updates = []
+    for record, mask, base in zip(editor_records(updated), changed_masks, base_records):
+        changed_columns = [column for column, is_changed in zip(changes['changed'].columns, mask) if is_changed]
+        update = {id_column: record[id_column], **{c: record[c] for c in changed_columns}}
+        if versions is not None:
+            update['row_version'] = int(versions.loc[record[id_column]])
+            update['_base'] = {c: base[c] for c in changed_columns}
+        updates.append(update)
+    return updates
+
+def save_editor_changes(table, event_id, original_df, edited_df, id_column, columns,
+                        allow_delete=False, prepare=None, editor_key=None):
+    """
+    Saves only the rows changed in a data editor, through one backend transaction.
+    If original_df has a row_version column, updates are compare-and-swap: changes to
+    columns nobody else touched are merged, and clashing edits come back as conflicts.
+
+    Args:
+        table (str): Backend table name (see be.EDITABLE_TABLES)
+        prepare (callable, optional): Takes the DataFrame of new/changed rows and returns it
+            cleaned; raise ValueError with a user-facing message to reject the edit
+        editor_key (str, optional): Editor widget key; its pending edits are cleared once saved
+            and any conflicts are kept for render_editor_conflicts
+
+    Returns:
+        dict: Backend counts and 'conflicts' plus 'ignored_deletes', or None if nothing was saved
+    """
+    changes = diff_editor_rows(original_df, edited_df, id_column, columns)
+    inserted, updated = changes['inserted'], changes['updated']
+    if prepare is not None:
+        try:
+            inserted = prepare(inserted) if not inserted.empty else inserted
+            updated = prepare(updated) if not updated.empty else updated
+        except ValueError as e:
+            st.error(str(e))
+            return None
+
+    deletes = changes['deleted_ids'] if allow_delete else []
+    result = be.apply_table_changes(table, event_id, inserts=editor_records(inserted),
+                                    updates=_versioned_updates(changes, updated, id_column), deletes=deletes)
+    if result is None:
+        st.error("Failed to save changes.")
+        return None
+    result['ignored_deletes'] = 0 if allow_delete else len(changes['deleted_ids'])
+    if editor_key:
+        # The saved rows now come from the database; keeping the edits would apply them twice
+        st.session_state.pop(editor_key, None)
+        if result['conflicts']:
+            yours = updated.set_index(id_column)
+            st.session_state[f"{editor_key}_conflicts"] = [
+                {'ID': conflict['id'], 'Column': column,
+                 'Your Value': yours.at[conflict['id'], column], 'Saved Value': conflict['current'][column]}
+                for conflict in result['conflicts'] for column in conflict['columns']
+            ]
+    return result
+
+def render_editor_conflicts(editor_key):
+    """Shows (once) the cells a save could not write because someone else changed them first."""
+    conflicts = st.session_state.pop(f"{editor_key}_conflicts", None)
+    if conflicts:
+        st.warning("Some of your changes were not saved because another user edited the same cells first. "
+                   "The table shows their values; re-enter yours if they should win.")
+        st.dataframe(pd.DataFrame(conflicts), hide_index=True, use_container_width=True)
+
+def render_table_filter_bar(key_prefix, status_column, status_options, sort_options):
+    """
+    Render search, status filter, sort and page-size controls for a paged editor.
+
+    Args:
+        sort_options (dict): Column name -> label shown in the sort picker
+
+    Returns:
+        dict: Keyword arguments for be.get_table_page (without table/event_id)
+    """
+    col_search, col_status, col_sort, col_order, col_size = st.columns([3, 2, 2, 1, 1])
+    search = col_search.text_input("Search", key=f"{key_prefix}_search")
+    status = col_status.selectbox("Status", ["All"] + status_options, key=f"{key_prefix}_status_filter")
+    sort_by = col_sort.selectbox("Sort by", list(sort_options), format_func=sort_options.get, key=f"{key_prefix}_sort")
+    order = col_order.selectbox("Order", ["Asc", "Desc"], key=f"{key_prefix}_order")
+    page_size = col_size.selectbox("Rows", PAGE_SIZE_OPTIONS, index=1, key=f"{key_prefix}_page_size")
+
+    # Any change to the filters starts again from the first page
+    query_signature = (search, status, sort_by, order, page_size)
+    if st.session_state.get(f"{key_prefix}_query") != query_signature:
+        st.session_state[f"{key_prefix}_query"] = query_signature
+        st.session_state[f"{key_prefix}_page"] = 1
+
+    return {
+        'page': st.session_state[f"{key_prefix}_page"],
+        'page_size': page_size,
+        'filters': {status_column: status} if status != "All" else None,
+        'search': search.strip() or None,
+        'sort_by': sort_by,
+        'descending': order == "Desc",
+    }
+
+def paged_editor_key(base_key, key_prefix, page_result):
+    """Editor key that changes with the page and filters shown, so pending edits never apply to other rows."""
+    query_signature = "|".join(str(part) for part in st.session_state.get(f"{key_prefix}_query", ()))
+    return f"{base_key}_{page_result['page']}_{query_signature}"
+
+def render_page_navigation(key_prefix, page_result):
+    """Render previous/next buttons and a page indicator for a be.get_table_page result."""
+    def go_to(page):
+        st.session_state[f"{key_prefix}_page"] = page
+
+    page, pages = page_result['page'], page_result['pages']
+    # Keep the stored page in range (e.g. after rows were filtered away)
+    st.session_state[f"{key_prefix}_page"] = page
+    col_prev, col_info, col_next = st.columns([1, 3, 1])
+    col_prev.button("◀ Previous", key=f"{key_prefix}_prev", disabled=page <= 1, on_click=go_to, args=(page - 1,))
+    col_info.caption(f"Page {page} of {pages} · {page_result['total']} rows")
+    col_next.button("Next ▶", key=f"{key_prefix}_next", disabled=page >= pages, on_click=go_to, args=(page + 1,))
+
+def render_export_controls(event_id, datasets, key_prefix):
+    """Render dataset/format pickers and a download button that builds the export on click."""
+    col_dataset, col_format = st.columns(2)
+    dataset = col_dataset.selectbox("Data", datasets, key=f"{key_prefix}_export_dataset")
+    fmt = col_format.selectbox("Format", exporter.available_formats(), key=f"{key_prefix}_export_format",
+                               format_func=lambda f: {'csv': "CSV", 'jsonl': "JSON Lines", 'parquet': "Parquet"}[f])
+    mime, extension = exporter.EXPORT_FORMATS[fmt]
+    # The callable runs only when the button is clicked, so rendering the page does not export anything.
+    # Streamlit keeps the finished file in memory while serving it; `python exporter.py` writes straight to disk.
+    st.download_button(
+        label=f"Download {dataset.title()}",
+        data=lambda: exporter.export_to_bytes(dataset, event_id, fmt),
+        file_name=f"{dataset}_event_{event_id}{extension}",
+        mime=mime,
+        key=f"{key_prefix}_export_download",
+        on_click="ignore"
+    )
+
+def render_cache_stats():
+    """Developer Mode: shows the backend read cache counters in the sidebar."""
+    stats = rc.cache_stats()
+    with st.sidebar.expander("Read Cache"):
+        st.caption(f"{stats['entries']} entries, {stats['bytes'] / 1024:.1f} KiB")
+        st.caption(f"Hits {stats['hits']} / misses {stats['misses']} ({stats['hit_rate']:.0%})")
+        st.caption(f"Evictions {stats['evictions']}, invalidations {stats['invalidations']}, uncached {stats['uncached']}")
+        if st.button("Clear cache", key="dev_clear_read_cache"):
+            rc.clear_cache()
+
+def render_chat_writer_stats():
+    """Developer Mode: shows the chat write limiter and coalescing counters in the sidebar."""
+    metrics = cw.get_writer_metrics()
+    with st.sidebar.expander("Chat Writes"):
+        st.caption(f"Sent {metrics['total_sent']} in {metrics['total_batches']} transactions "
+                   f"(avg {metrics['avg_batch_size']:.1f}, max {metrics['max_batch_size']})")
+        st.caption(f"Coalesced {metrics['total_coalesced']} | Rate limited {metrics['total_rejected']} | "
+                   f"Failed {metrics['total_failed']} | Users tracked {metrics['tracked_users']}")
+
+def render_presence_strip(event_id, current_user_id):
+    """One-line list of who else is on this event's pages, from the in-memory presence registry."""
+    others = [u for u in pr.get_present_users(event_id) if u['user_id'] != current_user_id]
+    if not others:
+        st.caption("🟢 Nobody else is viewing this event right now.")
+        return
+    people = ", ".join(f"{u['full_name']} ({u['page']})" for u in others)
+    st.caption(f"🟢 Also here: {people}")
+
+def render_run_timing(label, started):
+    """Developer Mode: shows how long a script or fragment run took (`started` from time.perf_counter())."""
+    if st.session_state.get('dev_mode'):
+        st.caption(f"⏱ {label}: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+# Windowed chat transcript (components/chat_transcript/index.html). The iframe stays mounted
+# across reruns, so new messages are appended in the browser rather than re-rendered.
+_chat_transcript_component = components.declare_component(
+    "chat_transcript", path=os.path.join(APP_DIR, 'components', 'chat_transcript'))
+
+def chat_transcript_row(msg, current_user_id):
+    """Compacts a be.get_chat_messages row into what the transcript component displays."""
+    try:
+        # Format timestamp safely
+        msg_time = datetime.fromisoformat(msg['timestamp']).strftime("%m/%d %I:%M %p")
+    except (TypeError, ValueError):
+        msg_time = msg.get('timestamp') or 'Unknown time'
+    # Stored text is HTML-escaped; the component renders plain text, so show it as typed
+    return {
+        'id': msg['message_id'],
+        'sender': html.unescape(msg.get('full_name') or 'Unknown'),
+        'head': msg.get('role') == 'Head',
+        'mine': msg['user_id'] == current_user_id,
+        'time': msg_time,
+        'text': html.unescape(msg.get('message_text') or ''),
+    }
+
+def render_chat_transcript(transcript, key, height=CHAT_TRANSCRIPT_HEIGHT):
+    """Renders chat_transcript_row dicts (oldest first) as one scrollable, windowed list."""
+    _chat_transcript_component(messages=transcript, height=height, key=key, default=None)
+
 def render_error_trace(error, include_trace=False):
     """Render error messages safely."""
     st.error(f"Error: {str(error)}")
@@ -265,9 +569,3 @@ def render_error_trace(error, include_trace=False):
         import traceback
         st.warning("Developer Mode: Stack Trace")
         st.code(traceback.format_exc())
-
-def display_success_alert():
-    """Display success message from task status update if it exists."""
-    if 'task_status_success' in st.session_state:
-        st.success(st.session_state['task_status_success'])
-        del st.session_state['task_status_success'] 
\ No newline at end of file